@@ -15,35 +15,48 @@ segfaults = False
 
 import os
 import sys
-from ._version import get_versions
 
-try:
-    import numpy
-    numpyOk = True
-except ImportError:
-    numpyOk = False
+
+def _isInstalled(moduleName):
+    """Helper function that checks whether a module can be imported,
+    without actually importing it (importing numpy is slow)"""
+    try:
+        from importlib.util import find_spec
+    except ImportError:  # Python 2
+        import imp
+        try:
+            imp.find_module(moduleName)
+        except ImportError:
+            return False
+        return True
+    return find_spec(moduleName) is not None
+
+numpyOk = _isInstalled("numpy")
 
 
 # cWriterow is a faster Cython implementation of pyWriterow.
 # Environment variable SAVRW_USE_CWRITEROW can be used to toggle cWriterow
 # 'on' or 'off' (mainly for testing). Crashes if 'on' but no cWriterow.
-try:
-    sys.path.insert(0, os.path.join(os.path.dirname(__file__), "cWriterow"))
-    from cWriterow import cWriterow  # writing 66 % faster
-    cWriterowOK = True
-except ImportError:
-    cWriterowOK = False
+# It is off by default, so it is only imported if the variable is set.
 savrw_use_cWriterow = os.environ.get("SAVRW_USE_CWRITEROW", "").lower()
-if savrw_use_cWriterow in ("", "0", "off", "false"):
-    cWriterowOK = False
-elif savrw_use_cWriterow in ("1", "on", "true"):
-    cWriterowOK = True
+cWriterowOK = False
+if savrw_use_cWriterow not in ("", "0", "off", "false"):
+    try:
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__),
+                                        "cWriterow"))
+        from cWriterow import cWriterow  # writing 66 % faster
+        cWriterowOK = True
+    except ImportError:
+        cWriterowOK = savrw_use_cWriterow in ("1", "on", "true")
 
 
 # author and version info, for e.g. use in fileLabel
 __author__ = "Albert-Jan Roskam" + " " + "@".join(["fomcl", "yahoo.com"])
-__version__ = version = get_versions()["version"].split("-")[0]
-del get_versions
+
+def _getVersion():
+    """Helper function that returns the version (versioneer may run git)"""
+    from ._version import get_versions
+    return get_versions()["version"].split("-")[0]
 
 
 # some constants
@@ -136,6 +149,39 @@ from header import *
 from savReader import *
 from savWriter import *
 from savHeaderReader import *
-from savReaderNp import *
 
-__all__ = ["SavReader", "SavWriter", "SavHeaderReader", "SavReaderNp"]
+# {attribute: module} of attributes that are loaded on first access: they
+# import numpy, multiprocessing or asyncio, which makes "import
+# savReaderWriter" slow
+_lazyAttributes = {"SavReaderNp": "savReaderNp",
+                   "parallel_read": "parallelReader"}
+if sys.version_info >= (3, 6):  # async generators
+    _lazyAttributes["AsyncSavReader"] = "asyncReader"
+
+def __getattr__(name):
+    """Loads the version and the attributes in ``_lazyAttributes`` on
+    first access (PEP 562)"""
+    if name in ("__version__", "version"):
+        value = _getVersion()
+        globals().update(__version__=value, version=value)
+        return value
+    try:
+        moduleName = _lazyAttributes[name]
+    except KeyError:
+        msg = "module %r has no attribute %r" % (__name__, name)
+        raise AttributeError(msg)
+    value = getattr(__import__(moduleName), name)
+    globals()[name] = value
+    return value
+
+if sys.version_info < (3, 7):  # no module __getattr__: load everything now
+    __version__ = version = _getVersion()
+    from savReaderNp import *
+    from parallelReader import parallel_read
+    if sys.version_info >= (3, 6):
+        from asyncReader import AsyncSavReader
+
+__all__ = ["SavReader", "SavWriter", "SavHeaderReader", "SavReaderNp",
+           "parallel_read"]
+if sys.version_info >= (3, 6):
+    __all__.append("AsyncSavReader")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Convert SPSS case data into Apache Arrow record batches (requires the
+pyarrow library)"""
+
+from spssDates import SPSS_EPOCH_OFFSET, timestampFormats, durationFormats
+from py3k import *
+
+
+def importPyarrow():
+    """Returns the pyarrow module, or raises an ImportError"""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Arrow export requires the pyarrow library")
+    return pyarrow
+
+
+class ArrowConverter(object):
+    """Converts lists of unformatted records (as unpacked from the case
+    buffer of <reader>) into ``pyarrow.RecordBatch`` objects.
+
+    * numeric variables become float64 columns; $sysmis becomes null
+    * date and datetime variables become timestamp[us] columns, and time
+      variables (TIME, DTIME) become duration[us] columns
+    * string variables become utf8 columns, without trailing blanks
+    * if <valueLabels> is ``True``, variables with value labels become
+      dictionary-encoded columns of labels. Values without a label are
+      added to the dictionary as strings.
+    """
+
+    def __init__(self, reader, valueLabels=False):
+        self.pa = pa = importPyarrow()
+        self.sysmis = reader.sysmis_
+        self.encoding = "utf-8" if reader.ioUtf8_ else reader.fileEncoding
+        allValueLabels = reader.valueLabels if valueLabels else {}
+        self.converters, fields = [], []
+        for varName in reader.header:
+            varType = reader.varTypes[varName]
+            bareformat = reader.bareformats[varName].upper()
+            if varName in allValueLabels:
+                converter = self._labelConverter(allValueLabels[varName],
+                                                 varType)
+                dataType = pa.dictionary(pa.int32(), pa.string())
+            elif varType:
+                converter, dataType = self._strings, pa.string()
+            elif bareformat in timestampFormats:
+                converter, dataType = self._timestamps, pa.timestamp("us")
+            elif bareformat in durationFormats:
+                converter, dataType = self._durations, pa.duration("us")
+            else:
+                converter, dataType = self._numbers, pa.float64()
+            self.converters.append(converter)
+            fields.append(pa.field(self._decode(varName), dataType))
+        self.schema = pa.schema(fields)
+
+    def _decode(self, value):
+        if isinstance(value, bytes):
+            return value.decode(self.encoding)
+        return value
+
+    def _numbers(self, values):
+        sysmis = self.sysmis
+        return self.pa.array([None if value == sysmis else value
+                              for value in values], self.pa.float64())
+
+    def _timestamps(self, values):
+        sysmis = self.sysmis
+        micros = [None if value == sysmis else
+                  int(round((value - SPSS_EPOCH_OFFSET) * 1e6))
+                  for value in values]
+        return self.pa.array(micros, self.pa.timestamp("us"))
+
+    def _durations(self, values):
+        sysmis = self.sysmis
+        micros = [None if value == sysmis else int(round(value * 1e6))
+                  for value in values]
+        return self.pa.array(micros, self.pa.duration("us"))
+
+    def _strings(self, values):
+        encoding = self.encoding
+        return self.pa.array([value.rstrip().decode(encoding)
+                              for value in values], self.pa.string())
+
+    def _labelConverter(self, valueLabels, varType):
+        """Returns a function that converts values into a dictionary-encoded
+        array of their value labels. The dictionary grows when values without
+        a label are encountered, so indices remain valid across batches"""
+        pa, sysmis = self.pa, self.sysmis
+        dictionary, indices, codes = [], {}, {}
+
+        def add(key, label):
+            # values with the same label share one dictionary entry
+            if label not in indices:
+                indices[label] = len(dictionary)
+                dictionary.append(label)
+            codes[key] = indices[label]
+            return codes[key]
+
+        for value in sorted(valueLabels):
+            key = self._decode(value).rstrip() if varType else value
+            add(key, self._decode(valueLabels[value]))
+
+        def code(value):
+            key = self._decode(value).rstrip() if varType else value
+            try:
+                return codes[key]
+            except KeyError:
+                if varType:
+                    return add(key, key)
+                elif value == sysmis:
+                    return None
+                elif float(value).is_integer():
+                    return add(key, "%d" % value)
+                return add(key, repr(value))
+
+        def convert(values):
+            indices = pa.array([code(value) for value in values], pa.int32())
+            return pa.DictionaryArray.from_arrays(indices,
+                                                  pa.array(dictionary,
+                                                           pa.string()))
+        return convert
+
+    def convert(self, records):
+        """Returns a ``pyarrow.RecordBatch`` of <records>"""
+        columns = [converter([record[i] for record in records])
+                   for i, converter in enumerate(self.converters)]
+        return self.pa.RecordBatch.from_arrays(columns, schema=self.schema)
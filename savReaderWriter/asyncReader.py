@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Read an SPSS data file from asyncio code (requires Python 3.6+)"""
+
+import asyncio
+import collections
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from savReader import SavReader
+
+
+class AsyncSavReader(object):
+    """ Read SPSS system files (.sav, .zsav) without blocking the event
+    loop. All the work, i.e. opening the file, reading cases and formatting
+    them, is done on a dedicated thread, which reads up to <prefetch>
+    batches ahead while the coroutine does something else (e.g. network
+    I/O) with the current batch.
+
+    Parameters
+    ----------
+    savFileName : str
+        the file name of the spss data file
+    prefetch : int
+        the maximum number of batches that are read ahead
+    kwargs :
+        other arguments that are passed to
+        :py:class:`savReaderWriter.SavReader`, such as ``selectVars``,
+        ``rawMode``, ``engine`` or ``where``
+
+    Examples
+    --------
+    .. code-block:: python
+
+        async def ingest(savFileName):
+            async with AsyncSavReader(savFileName) as reader:
+                async for records in reader.batches(10000):
+                    await bulk_load(records)
+    """
+
+    def __init__(self, savFileName, prefetch=2, **kwargs):
+        """ Constructor. The file is opened by ``open`` or ``__aenter__``"""
+        if not isinstance(prefetch, int) or prefetch < 1:
+            raise ValueError("prefetch must be a positive integer, not %r"
+                             % prefetch)
+        self.savFileName = savFileName
+        self.prefetch = prefetch
+        self.kwargs = kwargs
+        self.reader = None
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def _run(self, func, *args, **kwargs):
+        """Helper function that returns an asyncio future of func(*args,
+        **kwargs), called on the reader thread"""
+        func = functools.partial(func, *args, **kwargs)
+        return asyncio.wrap_future(self.executor.submit(func))
+
+    async def open(self):
+        """This function opens the spss data file"""
+        if self.reader is None:
+            self.reader = await self._run(SavReader, self.savFileName,
+                                          **self.kwargs)
+        return self
+
+    async def close(self):
+        """This function closes the spss data file and stops the reader
+        thread"""
+        if self.reader is not None:
+            await self._run(self.reader.close)
+            self.reader = None
+        self.executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, type, value, tb):
+        await self.close()
+
+    def __len__(self):
+        """This function reports the number of cases in the file"""
+        return len(self.reader)
+
+    @property
+    def header(self):
+        """The variable names of the records"""
+        return self.reader.header
+
+    async def batches(self, n=10000):
+        """This function yields lists of (at most) <n> records, formatted in
+        the same way as the records returned by
+        :py:meth:`savReaderWriter.SavReader.iterchunks`. Up to
+        ``prefetch`` batches are read ahead on the reader thread."""
+        if self.reader is None:
+            raise ValueError("The file is not open; use 'async with' or "
+                             "'await reader.open()'")
+        chunks = self.reader.iterchunks(n)
+        pending = collections.deque()
+        try:
+            while True:
+                while len(pending) < self.prefetch:
+                    pending.append(self._run(next, chunks, None))
+                batch = await pending.popleft()
+                if batch is None:
+                    break
+                yield batch
+        finally:
+            for future in pending:  # batches that were not started yet
+                future.cancel()
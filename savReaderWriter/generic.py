@@ -11,10 +11,113 @@ import math
 import locale
 import encodings
 import collections
+import threading
 
 from savReaderWriter import *
 from py3k import *
 
+# ctypes prototypes (argtypes, restype) of the I/O module functions whose
+# signature does not depend on the file. They are declared once per process,
+# when the libraries are loaded (see Generic.loadLibrary). The argtypes of the
+# other functions depend on array sizes, so the callers declare them on private
+# function pointers (see Generic._prototype): the library is shared by threads.
+spssioPrototypes = {
+    # generic
+    "spssOpenRead": ([c_char_p, POINTER(c_int)], c_int),
+    "spssOpenWrite": ([c_char_p, POINTER(c_int)], c_int),
+    "spssOpenAppend": ([c_char_p, POINTER(c_int)], c_int),
+    "spssOpenWriteCopy": ([c_char_p, c_char_p, POINTER(c_int)], c_int),
+    "spssCloseRead": ([c_int], c_int),
+    "spssCloseWrite": ([c_int], c_int),
+    "spssCloseAppend": ([c_int], c_int),
+    "spssGetCompression": ([c_int, POINTER(c_int)], c_int),
+    "spssSetCompression": ([c_int, c_int], c_int),
+    "spssGetCaseSize": ([c_int, POINTER(c_long)], c_int),
+    "spssLowHighVal": ([POINTER(c_double), POINTER(c_double)], c_int),
+    "spssSetLocale": ([c_int, c_char_p], c_char_p),
+    "spssGetFileCodePage": ([c_int, POINTER(c_int)], c_int),
+    "spssIsCompatibleEncoding": ([c_int, POINTER(c_int)], c_bool),
+    "spssIsCompatibleEndoding": ([c_int, POINTER(c_int)], c_bool),  # sic
+    "spssSetInterfaceEncoding": ([c_int], c_int),
+    "spssSeekNextCase": ([c_int, c_long], c_int),
+    "spssWholeCaseOut": ([c_int, c_char_p], c_int),
+    # header
+    "spssGetNumberofCases": ([c_int, POINTER(c_long)], c_int),
+    "spssGetEstimatedNofCases": ([c_int, POINTER(c_long)], c_int),
+    "spssGetNumberofVariables": ([c_int, POINTER(c_int)], c_int),
+    "spssSetVarName": ([c_int, c_char_p, c_int], c_int),
+    "spssSetVarNValueLabel": ([c_int, c_char_p, c_double, c_char_p], c_int),
+    "spssSetVarCValueLabel": ([c_int, c_char_p, c_char_p, c_char_p], c_int),
+    "spssSetVarLabel": ([c_int, c_char_p, c_char_p], c_int),
+    "spssGetVarPrintFormat": ([c_int, c_char_p, POINTER(c_int),
+                               POINTER(c_int), POINTER(c_int)], c_int),
+    "spssSetVarPrintFormat": ([c_int, c_char_p, c_int, c_int, c_int], c_int),
+    "spssSetVarWriteFormat": ([c_int, c_char_p, c_int, c_int, c_int], c_int),
+    "spssGetVarNMissingValues": ([c_int, c_char_p, POINTER(c_int),
+                                  POINTER(c_double), POINTER(c_double),
+                                  POINTER(c_double)], c_int),
+    "spssSetVarNMissingValues": ([c_int, c_char_p, c_int, c_double,
+                                  c_double, c_double], c_int),
+    "spssSetVarCMissingValues": ([c_int, c_char_p, c_int, c_char_p,
+                                  c_char_p, c_char_p], c_int),
+    "spssGetVarMeasureLevel": ([c_int, c_char_p, POINTER(c_int)], c_int),
+    "spssSetVarMeasureLevel": ([c_int, c_char_p, c_int], c_int),
+    "spssGetVarColumnWidth": ([c_int, c_char_p, POINTER(c_int)], c_int),
+    "spssSetVarColumnWidth": ([c_int, c_char_p, c_int], c_int),
+    "spssGetVarAlignment": ([c_int, c_char_p, POINTER(c_int)], c_int),
+    "spssSetVarAlignment": ([c_int, c_char_p, c_int], c_int),
+    "spssGetVariableSets": ([c_int, POINTER(c_char_p)], c_int),
+    "spssSetVariableSets": ([c_int, c_char_p], c_int),
+    "spssGetVarRole": ([c_int, c_char_p, POINTER(c_int)], c_int),
+    "spssSetVarRole": ([c_int, c_char_p, c_int], c_int),
+    "spssGetMultRespDefsEx": ([c_int, POINTER(c_char_p)], c_int),
+    "spssSetMultRespDefs": ([c_int, c_char_p], c_int),
+    "spssSetCaseWeightVar": ([c_int, c_char_p], c_int),
+    "spssSetTextInfo": ([c_int, c_char_p], c_int),
+    "spssSetIdString": ([c_int, c_char_p], c_int),
+    "spssQueryType7": ([c_int, c_int, POINTER(c_int)], c_int),
+    "spssGetDEWInfo": ([c_int, POINTER(c_long), POINTER(c_long)], c_int),
+    "spssGetDEWFirst": ([c_int, POINTER(c_void_p), c_long,
+                         POINTER(c_long)], c_int),
+    "spssGetDEWNext": ([c_int, POINTER(c_void_p), c_long,
+                        POINTER(c_long)], c_int),
+    "spssSetDEWGUID": ([c_int, c_char_p], c_int),
+    # writer
+    "spssConvertDate": ([c_int, c_int, c_int, POINTER(c_double)], c_int),
+    "spssConvertTime": ([c_int, c_int, c_int, c_double,
+                         POINTER(c_double)], c_int)}
+
+# {folder: library}: the I/O module is loaded once per process
+_spssioLibraries = {}
+_spssioLock = threading.Lock()
+
+def declarePrototypes(spssio):
+    """Declares the argtypes and restype of the functions in
+    ``spssioPrototypes`` that are exported by the <spssio> library"""
+    for funcName, (argtypes, restype) in spssioPrototypes.items():
+        try:
+            func = getattr(spssio, funcName)
+        except AttributeError:
+            continue  # e.g. spssIsCompatibleEndoding exists on Windows only
+        func.argtypes, func.restype = argtypes, restype
+
+def ianaToCodec(ianaEncoding):
+    """Returns the name of the Python codec of IANA encoding name
+    <ianaEncoding> (bytes, e.g. b"UTF-8" --> "utf_8"). If there is no
+    such codec, the locale's preferred encoding is returned"""
+    iana_codes = encodings.aliases.aliases
+    rawEncoding = ianaEncoding.lower().decode("utf-8")
+    if rawEncoding.replace("-", "") in iana_codes:
+        iana_code = rawEncoding.replace("-", "")
+    else:
+        iana_code = rawEncoding.replace("-", "_")
+    try:
+        return iana_codes[iana_code]
+    except KeyError:
+        print ("NOTE. IANA coding lookup error. Code %r " % iana_code +
+               "does not map to any Python codec.")
+        return locale.getpreferredencoding()
+
 class Generic(object):
     """
     Class for methods and data used in reading as well as writing
@@ -62,6 +165,13 @@ class Generic(object):
 
     def _loadLibs(self, folder):
         """Helper function that loads I/O libraries in the correct order"""
+        load = WinDLL if sys.platform.lower().startswith("win") else CDLL
+        # PermissionError: are the DLLs on a network share (e.g NAS)?
+        return [load(lib) for lib in self._getLibFileNames(folder)][-1]
+
+    def _getLibFileNames(self, folder):
+        """Helper function that returns the paths of the I/O libraries in
+        <folder>, in the order in which they need to be loaded"""
         # Get a list of all the files in the spssio dir for a given OS
         # Sort the list in the order in which the libs need to be loaded
         # Using regex patterns ought to be more resilient to updates of the
@@ -83,51 +193,69 @@ class Generic(object):
                     \.dll|                 # windows
                     (\.\d+)*\.dylib)$      # mac""" # filter out non-libs
         libs = [lib for lib in libs if re.match(isLib, lib, re.I | re.X)]
-        load = WinDLL if sys.platform.lower().startswith("win") else CDLL
         if libs and debug:
             print(os.path.basename(path).upper().center(79, "-"))
             print("\n".join(libs))
-        # PermissionError: are the DLLs on a network share (e.g NAS)?
-        return [load(os.path.join(path, lib)) for lib in libs][-1]
-             
+        return [os.path.join(path, lib) for lib in libs]
+
     def loadLibrary(self):
         """This function loads and returns the SPSSIO libraries,
-        depending on the platform."""
+        depending on the platform. The libraries are loaded, and the
+        prototypes in ``spssioPrototypes`` declared, once per process"""
+        folder = self._getLibFolder()
+        with _spssioLock:
+            spssio = _spssioLibraries.get(folder)
+            if spssio is None:
+                spssio = self._loadLibs(folder)
+                declarePrototypes(spssio)
+                _spssioLibraries[folder] = spssio
+        return spssio
 
+    def _getLibFolder(self):
+        """Helper function that returns the name of the folder of the I/O
+        libraries of this platform"""
         arch = platform.architecture()[0]
         is_32bit, is_64bit = arch == "32bit", arch == "64bit"
         pf = sys.platform.lower()
 
         # windows
         if pf.startswith("win") and is_32bit:
-            spssio = self._loadLibs("win32")
+            folder = "win32"
         elif pf.startswith("win"):
-            spssio = self._loadLibs("win64")
+            folder = "win64"
 
         # linux
         elif pf.startswith("lin") and is_32bit:
-            spssio = self._loadLibs("lin32")
+            folder = "lin32"
         elif pf.startswith("lin") and is_64bit and os.uname()[-1] == "s390x":
             # zLinux64: Thanks Anderson P. from System z Linux LinkedIn Group!
-            spssio = self._loadLibs("zlinux")
+            folder = "zlinux"
         elif pf.startswith("lin") and is_64bit:
-            spssio = self._loadLibs("lin64")
+            folder = "lin64"
 
         # other
         elif pf.startswith("darwin") or pf.startswith("mac"):
             # Mac: Thanks Rich Sadowsky!
-            spssio = self._loadLibs("macos")
+            folder = "macos"
         elif pf.startswith("aix") and is_64bit:
-            spssio = self._loadLibs("aix64")
+            folder = "aix64"
         elif pf.startswith("hp-ux"):
-            spssio = self._loadLibs("hpux_it")
+            folder = "hpux_it"
         elif pf.startswith("sunos") and is_64bit:
-            spssio = self._loadLibs("sol64")
+            folder = "sol64"
         else:
             msg = "Your platform (%r, %s) is not supported" % (pf, arch)
             raise EnvironmentError(msg)
+        return folder
 
-        return spssio
+    def _prototype(self, funcName, argtypes, restype=c_int):
+        """Returns a private function pointer to function <funcName> of the
+        I/O module, with the given <argtypes> and <restype>. The library is
+        shared by all instances and threads, so argtypes that depend on the
+        file (e.g. array sizes) must never be set on its own functions"""
+        func = self.spssio._FuncPtr((funcName, self.spssio))
+        func.argtypes, func.restype = argtypes, restype
+        return func
 
     def wide2utf8(self, fn):
         """Take a unicode file name string and encode it to a multibyte string
@@ -203,10 +331,8 @@ class Generic(object):
             if not refSavFileName:
                 raise ValueError("You must specify a reference (=donor) file")
             refSavFileName = c_char_py3k(expandfn(refSavFileName))
-            spssOpen.argtypes = [c_char_p, c_char_p, POINTER(c_int)]
             retcode = spssOpen(savFileName, refSavFileName, byref(fh))
         else:
-            spssOpen.argtypes = [c_char_p, POINTER(c_int)]
             retcode = spssOpen(savFileName, byref(fh))
 
         msg = "Problem opening file %r in mode %r" % (savFileName.value, mode)
@@ -221,7 +347,6 @@ class Generic(object):
                      b"wb": self.spssio.spssCloseWrite,
                      b"cp": self.spssio.spssCloseWrite,
                      b"ab": self.spssio.spssCloseAppend}.get(mode)
-        spssClose.argtypes = [c_int]
         retcode = spssClose(fh) if spssClose else 9999
         msg = "Problem closing file in mode %r" % mode
         checkErrsWarns(msg, retcode)
@@ -235,8 +360,8 @@ class Generic(object):
                    "compression scheme code", "big/little-endian code",
                    "character representation code"]
         relInfoArr = (c_int * len(relInfo))()
-        func = self.spssio.spssGetReleaseInfo
-        func.argtypes = [c_int, (c_int * len(relInfo))]
+        func = self._prototype("spssGetReleaseInfo",
+                               [c_int, (c_int * len(relInfo))])
         retcode = func(self.fh, relInfoArr)
         checkErrsWarns("Problem getting ReleaseInfo", retcode)
         info = dict([(item, relInfoArr[i]) for i, item in enumerate(relInfo)])
@@ -291,7 +416,6 @@ class Generic(object):
         compression = {0: b"uncompressed", 1: b"standard", 2: b"zlib"}
         compSwitch = c_int()
         func = self.spssio.spssGetCompression
-        func.argtypes = [c_int, POINTER(c_int)]
         retcode = func(self.fh, byref(compSwitch))
         checkErrsWarns("Problem getting file compression", retcode)
         return compression.get(compSwitch.value)
@@ -301,7 +425,6 @@ class Generic(object):
         compression = {b"uncompressed": 0, b"standard": 1, b"zlib": 2}
         compSwitch = compression.get(compSwitch)
         func = self.spssio.spssSetCompression
-        func.argtypes = [c_int, c_int]
         retcode = func(self.fh, compSwitch)
         invalidSwitch = retcodes.get(retcode) == 'SPSS_INVALID_COMPSW'
         if invalidSwitch and self.spssVersion[0] < 21:
@@ -319,7 +442,7 @@ class Generic(object):
         checkErrsWarns("Problem getting SystemString", retcode)
         return sysName.value
 
-    def getStruct(self, varTypes, varNames, mode=b"rb"):
+    def getStruct(self, varTypes, varNames, mode=b"rb", selectVars=None):
         """This function returns a compiled struct object. The required
         struct format string for the conversion between C and Python
         is created on the basis of varType and byte order.
@@ -327,7 +450,10 @@ class Generic(object):
           chars[]/ strings, where n is always 8 bytes or a multiple thereof.
         --byte order: files are written in the byte order of the host system
           (mode="wb") and read/appended using the byte order information
-          contained in the SPSS data file (mode is "ab" or "rb" or "cp")"""
+          contained in the SPSS data file (mode is "ab" or "rb" or "cp")
+        --selectVars: if specified, the struct only unpacks these variables
+          (in the order of <varNames>). The other variables are skipped
+          using pad bytes, so they are never converted into Python objects"""
         if mode in (b"ab", b"rb", b"cp"):   # derive endianness from file
             endianness = "<" if self.byteorder == "little" else ">"
         elif mode == b"wb":                 # derive endianness from host
@@ -339,21 +465,28 @@ class Generic(object):
                 endianness = "@"
         structFmt = [endianness]
         ceil = math.ceil
+        selectVars = None if selectVars is None else set(selectVars)
+        padding = 0
         for varName in varNames:
             varType = varTypes[varName]
+            nbytes = 8 if varType == 0 else int(ceil(int(varType) / 8.0) * 8)
+            if selectVars is not None and varName not in selectVars:
+                padding += nbytes
+                continue
+            elif padding:
+                structFmt.append("%dx" % padding)
+                padding = 0
             if varType == 0:
                 structFmt.append("d")
             else:
-                fmt = str(int(ceil(int(varType) / 8.0) * 8))
-                structFmt.append(fmt + "s")
-        return struct.Struct("".join(structFmt))
+                structFmt.append(str(nbytes) + "s")
+        return struct.Struct("".join(structFmt))  # trailing padding omitted
 
     def getCaseBuffer(self):
         """This function returns a buffer and a pointer to that buffer. A whole
         case will be read into this buffer."""
         caseSize = c_long()
         func = self.spssio.spssGetCaseSize
-        func.argtypes = [c_int, POINTER(c_long)]
         retcode = func(self.fh, byref(caseSize))
         caseBuffer = create_string_buffer(caseSize.value)
         checkErrsWarns("Problem getting case buffer", retcode)
@@ -369,8 +502,7 @@ class Generic(object):
         try:
             self._sysmis = -1 * sys.float_info[0]  # Python 2.6 and higher.
         except AttributeError:
-            self.spssio.spssSysmisVal.restype = c_float
-            self._sysmis = self.spssio.spssSysmisVal()
+            self._sysmis = self._prototype("spssSysmisVal", [], c_float)()
         return self._sysmis
 
     @property
@@ -382,7 +514,6 @@ class Generic(object):
         at any time."""
         lowest, highest = c_double(), c_double()
         func = self.spssio.spssLowHighVal
-        func.argtypes = [POINTER(c_double), POINTER(c_double)] 
         retcode = func(byref(lowest), byref(highest))
         checkErrsWarns("Problem getting min/max missing values", retcode)
         ranges = (lowest.value, highest.value)
@@ -421,8 +552,6 @@ class Generic(object):
         if not localeName:
             localeName = locale.setlocale(locale.LC_CTYPE)  # see also issue #26
         func = self.spssio.spssSetLocale
-        func.argtypes = [c_int, c_char_p]
-        func.restype = c_char_p
         self.setLocale = func(locale.LC_ALL, c_char_py3k(localeName))
         if self.setLocale is None:
             raise ValueError("Invalid ioLocale: %r" % localeName)
@@ -433,7 +562,6 @@ class Generic(object):
         applicable to a file."""
         nCodePage = c_int()
         func = self.spssio.spssGetFileCodePage
-        func.argtypes = [c_int, POINTER(c_int)] 
         retcode = func(self.fh, byref(nCodePage))
         checkErrsWarns("Problem getting file codepage", retcode)
         return nCodePage.value
@@ -446,8 +574,6 @@ class Generic(object):
             func = self.spssio.spssIsCompatibleEndoding
         except AttributeError:
             func = self.spssio.spssIsCompatibleEncoding
-        func.argtypes = [c_int, POINTER(c_int)] 
-        func.restype = c_bool
         isCompatible = c_int()
         retcode = func(self.fh, byref(isCompatible))
         msg = "Error testing encoding compatibility: %r" % isCompatible.value
@@ -482,7 +608,6 @@ class Generic(object):
     def ioUtf8(self, ioUtf8):
         try:
             func = self.spssio.spssSetInterfaceEncoding
-            func.argtypes = [c_int]
             retcode = func(int(ioUtf8))
             if retcode > 0 and not self.encoding_and_locale_set:
                 # not self.encoding_and_locale_set --> nested context managers
@@ -499,23 +624,11 @@ class Generic(object):
         ISO-8859-1, which is then converted to the corresponding Python
         codec name. If the file contains no file encoding, the locale's
         preferred encoding is returned"""
-        try:
-            pszEncoding = create_string_buffer(20)  # is 20 enough??
-            func = self.spssio.spssGetFileEncoding
-            retcode = func(c_int(self.fh), byref(pszEncoding))
-            checkErrsWarns("Problem getting file encoding", retcode)
-            iana_codes = encodings.aliases.aliases
-            rawEncoding = pszEncoding.value.lower().decode("utf-8")
-            if rawEncoding.replace("-", "") in iana_codes:
-                iana_code = rawEncoding.replace("-", "")
-            else:
-                iana_code = rawEncoding.replace("-", "_")
-            fileEncoding = iana_codes[iana_code]
-            return fileEncoding
-        except KeyError:
-            print ("NOTE. IANA coding lookup error. Code %r " % iana_code +
-                   "does not map to any Python codec.")
-            return locale.getpreferredencoding()
+        pszEncoding = create_string_buffer(20)  # is 20 enough??
+        func = self.spssio.spssGetFileEncoding
+        retcode = func(c_int(self.fh), byref(pszEncoding))
+        checkErrsWarns("Problem getting file encoding", retcode)
+        return ianaToCodec(pszEncoding.value)
 
     @property
     def record(self):
@@ -534,7 +647,6 @@ class Generic(object):
         except struct.error:
             msg = "Use ioUtf8=True to write unicode strings [%s]"
             raise TypeError(msg % sys.exc_info()[1])
-        self.wholeCaseOut.argtypes = [c_int, c_char_p]
         retcode = self.wholeCaseOut(self.fh, c_char_py3k(self.caseBuffer.raw))
         if retcode:
             checkErrsWarns("Problem writing row\n" + record, retcode)
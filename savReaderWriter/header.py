@@ -14,7 +14,16 @@ import gc
 from savReaderWriter import *
 from generic import *
 
-__version__ = version
+def copyMetadata(item):
+    """Returns a copy of metadata <item> in which all dicts and lists,
+    including nested ones, are new objects. Cached metadata is returned as
+    such a copy, so callers can change it without changing the cache"""
+    if isinstance(item, dict):
+        return dict([(k, copyMetadata(v)) for k, v in item.items()])
+    elif isinstance(item, list):
+        return [copyMetadata(v) for v in item]
+    return item
+
 
 class Header(Generic):
 
@@ -29,7 +38,6 @@ class Header(Generic):
     def __init__(self, savFileName, mode, refSavFileName, ioUtf8=False, ioLocale=None):
         """Constructor"""
         super(Header, self).__init__(savFileName, ioUtf8, ioLocale)
-        self.spssio = self.loadLibrary()
         self.fh = super(Header, self).openSavFile(savFileName, mode,
                                                   refSavFileName)
         self.varNames, self.varTypes = self.varNamesTypes
@@ -65,6 +73,37 @@ class Header(Generic):
             return uresult
         return wrapper
 
+    def cached(func):
+        """Decorator for metadata getters. The result is stored in the
+        ``metadata_`` dict under the name of the getter, so subsequent calls
+        do not query the I/O module. Each call returns a copy (see
+        `copyMetadata`), as the getters always returned new objects. The
+        matching setter removes it (see `invalidates`)"""
+        name = func.__name__
+        @functools.wraps(func)
+        def wrapper(self):
+            metadata = self.__dict__.setdefault("metadata_", {})
+            if name not in metadata:
+                metadata[name] = func(self)
+            return copyMetadata(metadata[name])
+        return wrapper
+
+    def invalidates(func):
+        """Decorator for metadata setters. Removes the cached result of the
+        getter with the same name. Changing the variables (`varNamesTypes`)
+        invalidates all cached metadata"""
+        name = func.__name__
+        @functools.wraps(func)
+        def wrapper(self, value):
+            try:
+                return func(self, value)
+            finally:
+                metadata = self.__dict__.get("metadata_", {})
+                if name == "varNamesTypes":
+                    metadata.clear()
+                metadata.pop(name, None)
+        return wrapper
+
     def encode(self, item):
         """Counter part of decode helper function, does the opposite of that
         function (but is not a decorator)"""
@@ -90,6 +129,20 @@ class Header(Generic):
         if retcode:
             checkErrsWarns("Problem freeing memory using %s" % funcName, retcode)
 
+    @property
+    def meta(self):
+        """Per-variable access to the metadata. For example:
+
+        .. code-block:: python
+
+            with SavHeaderReader(savFileName) as header:
+                labels = header.meta["salary"].valueLabels
+                label = header.meta[b"salary"].varLabels
+
+        Each kind of metadata is retrieved (for all variables) on first
+        access, and cached. See :py:class:`VariableMeta`"""
+        return MetaData(self)
+
     @property
     def numberofCases(self):
         """This function reports the number of cases present in a data file.
@@ -105,11 +158,9 @@ class Header(Generic):
             (nrows, ncols) ntuple"""
         nCases = c_long()
         func = self.spssio.spssGetNumberofCases
-        func.argtypes = [c_int, POINTER(c_long)] 
         retcode = func(self.fh, nCases)
         if nCases.value == -1:
             func = self.spssio.spssGetEstimatedNofCases
-            func.argtypes = [c_int, POINTER(c_long)] 
             retcode = func(self.fh, nCases)
         if retcode:
             checkErrsWarns("Problem getting number of cases", retcode)
@@ -126,7 +177,6 @@ class Header(Generic):
             (nrows, ncols) ntuple"""
         numVars = c_int()
         func = self.spssio.spssGetNumberofVariables
-        func.argtypes = [c_int, POINTER(c_int)]
         retcode = func(self.fh, numVars)
         if retcode:
             checkErrsWarns("Problem getting number of variables", retcode)
@@ -152,10 +202,10 @@ class Header(Generic):
         varTypesArr = POINTER(c_int * numVars)()
 
         # get variable names
-        func = self.spssio.spssGetVarNames
-        func.argtypes = [c_int, POINTER(c_int), 
-                         POINTER(POINTER(c_char_p * numVars)),
-                         POINTER(POINTER(c_int * numVars))]
+        argtypes = [c_int, POINTER(c_int),
+                    POINTER(POINTER(c_char_p * numVars)),
+                    POINTER(POINTER(c_int * numVars))]
+        func = self._prototype("spssGetVarNames", argtypes)
         retcode = func(self.fh, numVars_, varNamesArr, varTypesArr)
         if retcode:
             checkErrsWarns("Problem getting variable names & types", retcode)
@@ -173,6 +223,7 @@ class Header(Generic):
         return varNames, dict(zip(varNames, varTypes))
 
     @varNamesTypes.setter
+    @invalidates
     def varNamesTypes(self, varNamesVarTypes):
         badLengthMsg = ("Empty or longer than %s chars" %
                         (MAXLENGTHS['SPSS_MAX_VARNAME'][0]))
@@ -187,7 +238,6 @@ class Header(Generic):
             6: ('SPSS_NAME_BADFIRST', 'Invalid initial char (otherwise OK)')}
         validate = self.spssio.spssValidateVarname
         func = self.spssio.spssSetVarName
-        func.argtypes = [c_int, c_char_p, c_int]
         for varName in self.varNames:
             varLength = self.varTypes[varName]
             retcode = validate(c_char_py3k(varName))
@@ -201,6 +251,7 @@ class Header(Generic):
                 checkErrsWarns(msg, retcode)
 
     @property
+    @cached
     @decode
     def valueLabels(self):
         """Get/Set `VALUE LABELS`. Takes a dictionary of the form 
@@ -220,9 +271,6 @@ class Header(Generic):
                 return (POINTER(c_double * size))(), labelsArr
             return (POINTER(c_char_p * size))(), labelsArr
 
-        funcN = self.spssio.spssGetVarNValueLabels
-        funcC = self.spssio.spssGetVarCValueLabels        
-
         valueLabels = {}
         for varName in self.varNames:
             vName = self.vNames[varName]
@@ -231,34 +279,36 @@ class Header(Generic):
             # step 1a: get array size (numeric values)
             if self.varTypes[varName] == 0:
                 valuesArr, labelsArr = initArrays(True)
-                func = funcN
-                func.argtypes = [c_int, c_char_p, 
-                                 POINTER(POINTER(c_double * 0)),
-                                 POINTER(POINTER(c_char_p * 0)),
-                                 POINTER(c_int)]  
+                argtypes = [c_int, c_char_p,
+                            POINTER(POINTER(c_double * 0)),
+                            POINTER(POINTER(c_char_p * 0)),
+                            POINTER(c_int)]
+                func = self._prototype("spssGetVarNValueLabels", argtypes)
                 retcode = func(self.fh, c_char_py3k(vName),
                                valuesArr, labelsArr, numLabels)
                 valuesArr, labelsArr = initArrays(True, numLabels.value)
-                func.argtypes = [c_int, c_char_p,
-                                 POINTER(POINTER(c_double * numLabels.value)),
-                                 POINTER(POINTER(c_char_p * numLabels.value)),
-                                 POINTER(c_int)]
+                argtypes = [c_int, c_char_p,
+                            POINTER(POINTER(c_double * numLabels.value)),
+                            POINTER(POINTER(c_char_p * numLabels.value)),
+                            POINTER(c_int)]
+                func = self._prototype("spssGetVarNValueLabels", argtypes)
 
             # step 1b: get array size (string values)
             else:
                 valuesArr, labelsArr = initArrays(False)
-                func = funcC
-                func.argtypes = [c_int, c_char_p, 
-                                 POINTER(POINTER(c_char_p * 0)),
-                                 POINTER(POINTER(c_char_p * 0)), 
-                                 POINTER(c_int)]  
+                argtypes = [c_int, c_char_p,
+                            POINTER(POINTER(c_char_p * 0)),
+                            POINTER(POINTER(c_char_p * 0)),
+                            POINTER(c_int)]
+                func = self._prototype("spssGetVarCValueLabels", argtypes)
                 retcode = func(self.fh, c_char_py3k(vName),
                                valuesArr, labelsArr, numLabels)
                 valuesArr, labelsArr = initArrays(False, numLabels.value)
-                func.argtypes = [c_int, c_char_p,
-                                 POINTER(POINTER(c_char_p * numLabels.value)),
-                                 POINTER(POINTER(c_char_p * numLabels.value)),
-                                 POINTER(c_int)] 
+                argtypes = [c_int, c_char_p,
+                            POINTER(POINTER(c_char_p * numLabels.value)),
+                            POINTER(POINTER(c_char_p * numLabels.value)),
+                            POINTER(c_int)]
+                func = self._prototype("spssGetVarCValueLabels", argtypes)
 
             # step 2: get labels with array of proper size
             retcode = func(self.fh, c_char_py3k(vName), 
@@ -285,14 +335,13 @@ class Header(Generic):
         return valueLabels
 
     @valueLabels.setter
+    @invalidates
     def valueLabels(self, valueLabels):
         if not valueLabels:
             return
   
         valLabN = self.spssio.spssSetVarNValueLabel
-        valLabN.argtypes = [c_int, c_char_p, c_double, c_char_p]
         valLabC = self.spssio.spssSetVarCValueLabel
-        valLabC.argtypes = [c_int, c_char_p, c_char_p, c_char_p]
   
         valueLabels = self.encode(valueLabels)
         for varName, valueLabelsX in valueLabels.items():
@@ -309,6 +358,7 @@ class Header(Generic):
                     checkErrsWarns(msg % varName, retcode)
 
     @property
+    @cached
     @decode
     def varLabels(self):
         """Get/set `VARIABLE LABELS`.
@@ -323,9 +373,9 @@ class Header(Generic):
         lenBuff = MAXLENGTHS['SPSS_MAX_VARLABEL'][0]
         varLabel = create_string_buffer(lenBuff)
 
-        func = self.spssio.spssGetVarLabelLong
-        func.argtypes = [c_int, c_char_p, POINTER(c_char * lenBuff), 
-                         c_int, POINTER(c_int)]
+        argtypes = [c_int, c_char_p, POINTER(c_char * lenBuff),
+                    c_int, POINTER(c_int)]
+        func = self._prototype("spssGetVarLabelLong", argtypes)
 
         varLabels = {}
         for varName in self.varNames:
@@ -339,12 +389,12 @@ class Header(Generic):
         return varLabels
 
     @varLabels.setter
+    @invalidates
     def varLabels(self, varLabels):
         if not varLabels:
             return
 
         func = self.spssio.spssSetVarLabel
-        func.argtypes = [c_int, c_char_p, c_char_p]
 
         varLabels = self.encode(varLabels)
         for varName, varLabel in varLabels.items():
@@ -356,6 +406,7 @@ class Header(Generic):
                 checkErrsWarns(msg, retcode)
 
     @property
+    @cached
     @decode
     def formats(self):
         """Get the `PRINT FORMATS`, set `PRINT FORMATS` and `WRITE FORMATS`.
@@ -367,15 +418,10 @@ class Header(Generic):
             {b'salary': b'DOLLAR8', 
              b'gender': b'A1',
              b'educ': b'F8.2'}"""
-        if hasattr(self, "formats_"):
-            return self.formats_
-
         func = self.spssio.spssGetVarPrintFormat
-        func.argtypes = [c_int, c_char_p, POINTER(c_int),
-                         POINTER(c_int), POINTER(c_int)]
 
         printFormat_, printDec_, printWid_ = c_int(), c_int(), c_int()
-        self.formats_ = {}
+        formats = {}
         for varName in self.varNames:
             vName = self.vNames[varName]
             retcode = func(self.fh, c_char_py3k(vName),
@@ -391,8 +437,8 @@ class Header(Generic):
                 format_ += (b"." + bytez(str(printDec_.value)))
             if format_.endswith(b".0"):
                 format_ = format_[:-2]
-            self.formats_[varName] = format_
-        return self.formats_
+            formats[varName] = format_
+        return formats
 
     def _splitformats(self):
         """This function returns the 'bare' formats + variable widths,
@@ -409,6 +455,7 @@ class Header(Generic):
         return bareformats, varWids
 
     @formats.setter
+    @invalidates
     def formats(self, formats):
         if not formats:
             return
@@ -420,9 +467,7 @@ class Header(Generic):
         isAnyVar = re.compile(regex, re.IGNORECASE)
 
         funcP = self.spssio.spssSetVarPrintFormat  # print type
-        funcP.argtypes = [c_int, c_char_p, c_int, c_int, c_int]
         funcW = self.spssio.spssSetVarWriteFormat  # write type
-        funcW.argtypes = funcP.argtypes
   
         for varName, format_ in self.encode(formats).items():
             format_ = format_.upper()
@@ -467,18 +512,14 @@ class Header(Generic):
         Range definitions are only possible for numerical variables."""
         if self.varTypes[varName] == 0:
             func = self.spssio.spssGetVarNMissingValues
-            func.argtypes = [c_int, c_char_p, POINTER(c_int),
-                             POINTER(c_double), 
-                             POINTER(c_double),
-                             POINTER(c_double)]
             args = (c_double(), c_double(), c_double())
         else:
             lenBuff = 9  # char miss vals: max 9 bytes. Newer versions also?
-            func = self.spssio.spssGetVarCMissingValues
-            func.argtypes = [c_int, c_char_p, POINTER(c_int),
-                             POINTER(c_char * lenBuff), 
-                             POINTER(c_char * lenBuff), 
-                             POINTER(c_char * lenBuff)]
+            argtypes = [c_int, c_char_p, POINTER(c_int),
+                        POINTER(c_char * lenBuff),
+                        POINTER(c_char * lenBuff),
+                        POINTER(c_char * lenBuff)]
+            func = self._prototype("spssGetVarCMissingValues", argtypes)
             args = (create_string_buffer(lenBuff), create_string_buffer(lenBuff),
                     create_string_buffer(lenBuff))
 
@@ -570,16 +611,12 @@ class Header(Generic):
         # numerical vars
         if varType == 0 and args:
             func = self.spssio.spssSetVarNMissingValues
-            func.argtypes = [c_int, c_char_p, c_int,
-                             c_double, c_double, c_double]
             args = map(float, args)
         # string vars
         else:
             if args is None:
                 raise ValueError("Illegal keyword for character variable")
             func = self.spssio.spssSetVarCMissingValues
-            func.argtypes = [c_int, c_char_p, c_int,
-                             c_char_p, c_char_p, c_char_p]
 
         retcode = func(self.fh, varName, userMissingValues[missingFmt], *args)
         if retcode:
@@ -587,6 +624,7 @@ class Header(Generic):
             checkErrsWarns(msg, retcode)
 
     @property
+    @cached
     @decode
     def missingValues(self):
         """Get/Set MISSING VALUES.
@@ -619,6 +657,7 @@ class Header(Generic):
         return missingValues
 
     @missingValues.setter
+    @invalidates
     def missingValues(self, missingValues):
         if missingValues:
             for varName, kwargs in missingValues.items():
@@ -626,6 +665,7 @@ class Header(Generic):
 
     # measurelevel, colwidth and alignment must all be set or not at all.
     @property
+    @cached
     @decode
     def measureLevels(self):
         """Get/Set `VARIABLE LEVEL` (measurement level).
@@ -634,7 +674,6 @@ class Header(Generic):
         "ratio", "flag", "typeless". This is used in SPSS procedures such as
         `CTABLES`."""
         func = self.spssio.spssGetVarMeasureLevel
-        func.argtypes = [c_int, c_char_p, POINTER(c_int)]
 
         levels = {0: b"unknown", 1: b"nominal", 2: b"ordinal", 3: b"scale",
                   3: b"ratio", 4: b"flag", 5: b"typeless"}
@@ -651,11 +690,11 @@ class Header(Generic):
         return varMeasureLevels
 
     @measureLevels.setter
+    @invalidates
     def measureLevels(self, varMeasureLevels):
         if not varMeasureLevels:
             return
         func = self.spssio.spssSetVarMeasureLevel
-        func.argtypes = [c_int, c_char_p, c_int]
 
         levels = {b"unknown": 0, b"nominal": 1, b"ordinal": 2, b"scale": 3,
                   b"ratio": 3, b"flag": 4, b"typeless": 5}
@@ -670,6 +709,7 @@ class Header(Generic):
                 checkErrsWarns(msg % varName.decode(), retcode)
 
     @property
+    @cached
     @decode
     def columnWidths(self):
         """Get/Set `VARIABLE WIDTH` (display width).
@@ -679,7 +719,6 @@ class Header(Generic):
         variable alignment, measurement level and column width all needs to
         be set."""
         func = self.spssio.spssGetVarColumnWidth
-        func.argtypes = [c_int, c_char_p, POINTER(c_int)]
 
         varColumnWidth = c_int()
         varColumnWidths = {}
@@ -693,11 +732,11 @@ class Header(Generic):
         return varColumnWidths
 
     @columnWidths.setter
+    @invalidates
     def columnWidths(self, varColumnWidths):
         if not varColumnWidths:
             return
         func = self.spssio.spssSetVarColumnWidth
-        func.argtypes = [c_int, c_char_p, c_int]
 
         for varName, varColumnWidth in varColumnWidths.items():
             retcode = func(self.fh, c_char_py3k(varName), varColumnWidth)
@@ -721,6 +760,7 @@ class Header(Generic):
         self.alignments = dict([(v, b"left") for v in self.varNames])
 
     @property
+    @cached
     @decode
     def alignments(self):
         """Get/Set `VARIABLE ALIGNMENT`. Returns/Takes a dictionary of the 
@@ -730,7 +770,6 @@ class Header(Generic):
        .. warning:: *measureLevels, columnWidths, alignments must all three 
            be set, if used*"""
         func = self.spssio.spssGetVarAlignment
-        func.argtypes = [c_int, c_char_p, POINTER(c_int)]
  
         alignments = {0: b"left", 1: b"right", 2: b"center"}
         alignment_ = c_int()
@@ -746,11 +785,11 @@ class Header(Generic):
         return varAlignments
 
     @alignments.setter
+    @invalidates
     def alignments(self, varAlignments):
         if not varAlignments:
             return
         func = self.spssio.spssSetVarAlignment
-        func.argtypes = [c_int, c_char_p, c_int]
 
         alignments = {b"left": 0, b"right": 1, b"center": 2,
                        "left": 0,  "right": 1,  "center": 2}
@@ -764,6 +803,7 @@ class Header(Generic):
                 checkErrsWarns(msg % varName.decode(), retcode)
 
     @property
+    @cached
     @decode
     def varSets(self):
         """Get/Set `VARIABLE SET` information.
@@ -776,7 +816,6 @@ class Header(Generic):
              b'DEMOGR': [b'gender', b'minority', b'educ']}
         """
         func = self.spssio.spssGetVariableSets
-        func.argtypes = [c_int, POINTER(c_char_p)]
 
         varSets = c_char_p()
         retcode = func(self.fh, varSets)
@@ -797,12 +836,12 @@ class Header(Generic):
         return varSets_
 
     @varSets.setter
+    @invalidates
     def varSets(self, varSets):
         if not varSets:
             return
 
         func = self.spssio.spssSetVariableSets
-        func.argtypes = [c_int, c_char_p]   
 
         varSets_ = []
         for varName, varSet in varSets.items():
@@ -817,6 +856,7 @@ class Header(Generic):
             checkErrsWarns(msg, retcode)
 
     @property
+    @cached
     @decode
     def varRoles(self):
         """Get/Set `VARIABLE ROLES`.
@@ -824,7 +864,6 @@ class Header(Generic):
         varRoles may be any of the following: 'both', 'frequency', 'input',
         'none', 'partition', 'record ID', 'split', 'target'"""
         func = self.spssio.spssGetVarRole
-        func.argtypes = [c_int, c_char_p, POINTER(c_int)]
 
         roles = {0: b"input", 1: b"target", 2: b"both", 3: b"none", 4: b"partition",
                  5: b"split", 6: b"frequency", 7: b"record ID"}
@@ -841,6 +880,7 @@ class Header(Generic):
         return varRoles
 
     @varRoles.setter
+    @invalidates
     def varRoles(self, varRoles):
         if not varRoles:
             return
@@ -851,7 +891,6 @@ class Header(Generic):
         roles.update(uroles)
 
         func = self.spssio.spssSetVarRole
-        func.argtypes = [c_int, c_char_p, c_int] 
 
         for varName, varRole in varRoles.items():
             varRole = roles.get(varRole)
@@ -861,6 +900,7 @@ class Header(Generic):
                 checkErrsWarns(msg % (varRole, varName), retcode)
 
     @property
+    @cached
     @decode
     def varAttributes(self):
         """Get/Set `VARIABLE ATTRIBUTES`.
@@ -875,11 +915,11 @@ class Header(Generic):
         """
         # specify default array + argtypes (zero requests size)
         DEFAULT_ARRAY_SIZE = 0
-        func = self.spssio.spssGetVarAttributes
-        func.argtypes = [c_int, c_char_p,
-                         POINTER(POINTER(c_char_p * DEFAULT_ARRAY_SIZE)),
-                         POINTER(POINTER(c_char_p * DEFAULT_ARRAY_SIZE)), 
-                         POINTER(c_int)]
+        argtypes = [c_int, c_char_p,
+                    POINTER(POINTER(c_char_p * DEFAULT_ARRAY_SIZE)),
+                    POINTER(POINTER(c_char_p * DEFAULT_ARRAY_SIZE)),
+                    POINTER(c_int)]
+        func = self._prototype("spssGetVarAttributes", argtypes)
 
         # initialize arrays
         attrNamesArr = (POINTER(c_char_p * DEFAULT_ARRAY_SIZE))()
@@ -902,10 +942,11 @@ class Header(Generic):
             nAttr = c_int(nAttr.value)
             attrNamesArr = (POINTER(c_char_p * nAttr.value))()
             attrValuesArr = (POINTER(c_char_p * nAttr.value))()
-            func.argtypes = [c_int, c_char_p, 
-                             POINTER(POINTER(c_char_p * nAttr.value)),
-                             POINTER(POINTER(c_char_p * nAttr.value)),
-                             POINTER(c_int)]
+            argtypes = [c_int, c_char_p,
+                        POINTER(POINTER(c_char_p * nAttr.value)),
+                        POINTER(POINTER(c_char_p * nAttr.value)),
+                        POINTER(c_int)]
+            func = self._prototype("spssGetVarAttributes", argtypes)
             retcode = func(self.fh, c_char_py3k(vName),
                            byref(attrNamesArr), byref(attrValuesArr),
                            byref(nAttr))
@@ -927,10 +968,10 @@ class Header(Generic):
         return attributes
 
     @varAttributes.setter
+    @invalidates
     def varAttributes(self, varAttributes):
         if not varAttributes:
             return
-        func = self.spssio.spssSetVarAttributes
         for varName in self.varNames:
             attributes = varAttributes.get(varName)
             if not attributes:
@@ -939,8 +980,9 @@ class Header(Generic):
             attrNames = (c_char_p * nAttr)(*list(attributes.keys()))
             attrValues = (c_char_p * nAttr)(*list(attributes.values()))
 
-            func.argtypes = [c_int, c_char_p, POINTER(c_char_p * nAttr), 
-                             POINTER(c_char_p * nAttr), c_int]
+            argtypes = [c_int, c_char_p, POINTER(c_char_p * nAttr),
+                        POINTER(c_char_p * nAttr), c_int]
+            func = self._prototype("spssSetVarAttributes", argtypes)
             retcode = func(self.fh, c_char_py3k(varName),
                            attrNames, attrValues, nAttr)
             if retcode:
@@ -948,6 +990,7 @@ class Header(Generic):
                 checkErrsWarns(msg % varName, retcode)
 
     @property
+    @cached
     @decode
     def fileAttributes(self):
         """Get/Set `DATAFILE ATTRIBUTES`.
@@ -964,11 +1007,11 @@ class Header(Generic):
         start with 1"""
         # abbreviation for readability
         DEFAULT_ARRAY_SIZE = 0
-        func = self.spssio.spssGetFileAttributes
-        func.argtypes = [c_int, 
-                         POINTER(POINTER(c_char_p * DEFAULT_ARRAY_SIZE)),
-                         POINTER(POINTER(c_char_p * DEFAULT_ARRAY_SIZE)),
-                         POINTER(c_int)]
+        argtypes = [c_int,
+                    POINTER(POINTER(c_char_p * DEFAULT_ARRAY_SIZE)),
+                    POINTER(POINTER(c_char_p * DEFAULT_ARRAY_SIZE)),
+                    POINTER(c_int)]
+        func = self._prototype("spssGetFileAttributes", argtypes)
 
         # step 1: get array size (zero requests size)
         attrNamesArr = (POINTER(c_char_p * DEFAULT_ARRAY_SIZE))()
@@ -981,10 +1024,11 @@ class Header(Generic):
         nAttr = c_int(nAttr.value)
         attrNamesArr = (POINTER(c_char_p * nAttr.value))()
         attrValuesArr = (POINTER(c_char_p * nAttr.value))()
-        func.argtypes = [c_int, 
-                         POINTER(POINTER(c_char_p * nAttr.value)),
-                         POINTER(POINTER(c_char_p * nAttr.value)),
-                         POINTER(c_int)]
+        argtypes = [c_int,
+                    POINTER(POINTER(c_char_p * nAttr.value)),
+                    POINTER(POINTER(c_char_p * nAttr.value)),
+                    POINTER(c_int)]
+        func = self._prototype("spssGetFileAttributes", argtypes)
         retcode = func(self.fh, byref(attrNamesArr),
                        byref(attrValuesArr), byref(nAttr))
         if retcode:
@@ -1003,6 +1047,7 @@ class Header(Generic):
         return attributes
 
     @fileAttributes.setter
+    @invalidates
     def fileAttributes(self, fileAttributes):
         if not fileAttributes:
             return
@@ -1010,9 +1055,9 @@ class Header(Generic):
         attrNames = (c_char_p * nAttr)(*list(fileAttributes.keys()))
         attrValues = (c_char_p * nAttr)(*list(fileAttributes.values()))
 
-        func = self.spssio.spssSetFileAttributes
-        func.argtypes = [c_int, POINTER(c_char_p * nAttr), 
-                         POINTER(c_char_p * nAttr), c_int]
+        argtypes = [c_int, POINTER(c_char_p * nAttr),
+                    POINTER(c_char_p * nAttr), c_int]
+        func = self._prototype("spssSetFileAttributes", argtypes)
         retcode = func(self.fh, attrNames, attrValues, nAttr)
         if retcode:
             checkErrsWarns("Problem setting file attributes", retcode)
@@ -1118,6 +1163,7 @@ class Header(Generic):
                           "varNames": varNames}}
 
     @property
+    @cached
     @decode
     def multRespDefs(self):
         """Get/Set `MRSETS` (multiple response) sets.
@@ -1174,7 +1220,6 @@ class Header(Generic):
 
         ## Extended Multiple response definitions
         func = self.spssio.spssGetMultRespDefsEx
-        func.argtypes = [c_int, POINTER(c_char_p)]
         mrDefsEx = c_char_p()
         retcode = func(self.fh, mrDefsEx)
         if retcode:
@@ -1195,26 +1240,27 @@ class Header(Generic):
         return multRespDefsEx
 
     @multRespDefs.setter
+    @invalidates
     def multRespDefs(self, multRespDefs):
         if not multRespDefs:
             return
         multRespDefs = self._setMultRespDefs(multRespDefs)
         func = self.spssio.spssSetMultRespDefs
-        func.argtypes = [c_int, c_char_p]   
         retcode = func(self.fh, c_char_py3k(multRespDefs))
         if retcode:
             msg = "Problem setting multiple response definitions"
             checkErrsWarns(msg, retcode)
 
     @property
+    @cached
     @decode
     def caseWeightVar(self):
         """Get/Set WEIGHT variable.
         Takes a valid varName, and returns weight variable, if any, as a
         string."""
         lenBuff = 65
-        func = self.spssio.spssGetCaseWeightVar
-        func.argtypes = [c_int, POINTER(c_char * lenBuff)]
+        argtypes = [c_int, POINTER(c_char * lenBuff)]
+        func = self._prototype("spssGetCaseWeightVar", argtypes)
 
         varNameBuff = create_string_buffer(lenBuff)
         retcode = func(self.fh, varNameBuff)
@@ -1224,12 +1270,12 @@ class Header(Generic):
         return varNameBuff.value
 
     @caseWeightVar.setter
+    @invalidates
     def caseWeightVar(self, varName):
         if not varName:
             return
 
         func = self.spssio.spssSetCaseWeightVar
-        func.argtypes = [c_int, c_char_p] 
 
         retcode = func(self.fh, c_char_py3k(varName))
         if retcode:
@@ -1237,6 +1283,7 @@ class Header(Generic):
             checkErrsWarns(msg, retcode)
 
     @property
+    @cached
     @decode
     def dateVariables(self):  # seems to be okay
         """Get/Set `DATE` information. This function reports the Forecasting
@@ -1244,17 +1291,18 @@ class Header(Generic):
         data files. Entirely untested and not implemented in reader/writer"""
         # step 1: get array size
         DEFAULT_ARRAY_SIZE = 0
-        func = self.spssio.spssGetDateVariables
-        func.argtypes = [c_int, POINTER(c_int), 
-                         POINTER(POINTER(c_long * DEFAULT_ARRAY_SIZE))]
+        argtypes = [c_int, POINTER(c_int),
+                    POINTER(POINTER(c_long * DEFAULT_ARRAY_SIZE))]
+        func = self._prototype("spssGetDateVariables", argtypes)
 
         nElements = c_int()
         dateInfoArr = (POINTER(c_long * DEFAULT_ARRAY_SIZE))()
         retcode = func(self.fh, nElements, dateInfoArr)
 
         # step 2: get date info with array of proper size
-        func.argtypes = [c_int, POINTER(c_int), 
-                         POINTER(POINTER(c_long * nElements.value))]
+        argtypes = [c_int, POINTER(c_int),
+                    POINTER(POINTER(c_long * nElements.value))]
+        func = self._prototype("spssGetDateVariables", argtypes)
         dateInfoArr = (POINTER(c_long * nElements.value))()
         retcode = func(self.fh, nElements, dateInfoArr)
         if retcode:
@@ -1276,6 +1324,7 @@ class Header(Generic):
         return dateInfo
 
     @dateVariables.setter
+    @invalidates
     def dateVariables(self, dateInfo):  # 'SPSS_INVALID_DATEINFO'!
         dateInfo = [dateInfo["fixedDateInfo"]] + dateInfo["otherDateInfo"]
         dateInfo = reduce(list.__add__, dateInfo)  # flatten list
@@ -1288,8 +1337,8 @@ class Header(Generic):
             raise TypeError(msg)
 
         nElements = len(dateInfo)
-        func = self.spssio.spssSetDateVariables
-        func.argtypes = [c_int, c_int, (c_long * nElements)]
+        argtypes = [c_int, c_int, (c_long * nElements)]
+        func = self._prototype("spssSetDateVariables", argtypes)
 
         dateInfoArr = (c_long * nElements)(*dateInfo)
         retcode = func(self.fh, nElements, dateInfoArr)
@@ -1297,6 +1346,7 @@ class Header(Generic):
             checkErrsWarns("Problem setting TRENDS information", retcode)
 
     @property
+    @cached
     @decode
     def textInfo(self):
         """Get/Set text information.
@@ -1304,8 +1354,8 @@ class Header(Generic):
         using SavReaderWriter.py version %s (%s)". This is akin to, but
         *not* equivalent to the SPSS syntax command `DISPLAY DOCUMENTS`"""
         lenBuff = 256
-        func = self.spssio.spssGetTextInfo 
-        func.argtypes = [c_int, POINTER(c_char * lenBuff)]
+        argtypes = [c_int, POINTER(c_char * lenBuff)]
+        func = self._prototype("spssGetTextInfo", argtypes)
 
         textInfo = create_string_buffer(lenBuff)
         retcode = func(self.fh, textInfo)
@@ -1314,7 +1364,9 @@ class Header(Generic):
         return textInfo.value
 
     @textInfo.setter
+    @invalidates
     def textInfo(self, savFileName):
+        from savReaderWriter import __version__
         info = (os.path.basename(savFileName), __version__, time.asctime())
         textInfo = "File '%s' built using savReaderWriter version %s (%s)"
         textInfo = textInfo % info
@@ -1322,21 +1374,21 @@ class Header(Generic):
             textInfo = textInfo.encode("utf-8")
   
         func = self.spssio.spssSetTextInfo
-        func.argtypes = [c_int, c_char_p]
   
         retcode = func(self.fh, c_char_py3k(textInfo[:256]))
         if retcode:
             checkErrsWarns("Problem setting textInfo", retcode)
 
     @property
+    @cached
     @decode
     def fileLabel(self):
         """Get/Set `FILE LABEL` (id string)
         Takes a file label, and returns file label, if any, as
         a byte string."""
         lenBuff = 65
-        func = self.spssio.spssGetIdString  
-        func.argtypes = [c_int, POINTER(c_char * lenBuff)]
+        argtypes = [c_int, POINTER(c_char * lenBuff)]
+        func = self._prototype("spssGetIdString", argtypes)
 
         idStr = create_string_buffer(lenBuff)
         retcode = func(self.fh, idStr)
@@ -1345,6 +1397,7 @@ class Header(Generic):
         return idStr.value
 
     @fileLabel.setter
+    @invalidates
     def fileLabel(self, idStr):
         if idStr is None:
             idStr = ("File created by user %r at %s"[:64] %
@@ -1353,7 +1406,6 @@ class Header(Generic):
             idStr = idStr.encode("utf-8")
 
         func = self.spssio.spssSetIdString
-        func.argtypes = [c_int, c_char_p] 
 
         retcode = func(self.fh, c_char_py3k(idStr))
         if retcode:
@@ -1376,7 +1428,6 @@ class Header(Generic):
                  11: ("Measurement level, column width, and " +
                       "alignment for each variable")}
         func = self.spssio.spssQueryType7
-        func.argtypes = [c_int, c_int, POINTER(c_int)]
 
         type7info = {}
         for subtype, label in subtypes.items():
@@ -1388,6 +1439,7 @@ class Header(Generic):
         return type7info
 
     @property
+    @cached
     def dataEntryInfo(self):
         """Get/Set information that is private to the Data Entry for Windows (DEW)
         product. Returns/takes a dictionary of the form:
@@ -1412,7 +1464,6 @@ class Header(Generic):
 
         # retrieve length of DEW information (in bytes)
         func = self.spssio.spssGetDEWInfo
-        func.argtypes = [c_int, POINTER(c_long), POINTER(c_long)]
 
         pLength, pHashTotal = c_long(), c_long()
         retcode = func(self.fh, pLength, pHashTotal)
@@ -1423,8 +1474,6 @@ class Header(Generic):
         # retrieve first segment of DEW information
         if not retcode:
             func =  self.spssio.spssGetDEWFirst
-            func.argtypes = [c_int, POINTER(c_void_p), 
-                             c_long, POINTER(c_long)]
 
             nData, pData = c_long(), c_void_p()
             retcode = func(self.fh, pData, maxData, nData)
@@ -1433,7 +1482,6 @@ class Header(Generic):
         # retrieve subsequent segments of DEW information
         if not retcode:
             func = self.spssio.spssGetDEWNext
-            func.argtypes = [c_int, POINTER(c_void_p), c_long, POINTER(c_long)]
 
             for i in range(nData.value - 1):
                 nData = c_long()
@@ -1454,6 +1502,7 @@ class Header(Generic):
         return dict(data=dew_information, GUID=asciiGUID.value)
 
     @dataEntryInfo.setter
+    @invalidates
     def dataEntryInfo(self, info):
         data, asciiGUID = info["data"], info["GUID"]
         # input validation
@@ -1499,9 +1548,81 @@ class Header(Generic):
         if not retcode:
             args = self.fh, c_char_py3k(asciiGUID)
             func = self.spssio.spssSetDEWGUID
-            func.argtypes = [c_int, c_char_p]
             retcode = func(*args)
 
         if retcode:
             msg = "Problem setting Data Entry info with function %r"
             checkErrsWarns(msg % func.__name__, retcode)
+
+
+class MetaData(object):
+    """Read-only mapping of variable names to :py:class:`VariableMeta`
+    objects. Variable names may be given as bytes or as unicode strings"""
+
+    def __init__(self, header):
+        self.header = header
+
+    def _varName(self, varName):
+        varTypes = self.header.varTypes
+        if varName in varTypes:
+            return varName
+        try:
+            if isinstance(varName, bytes):
+                other = varName.decode("utf-8")
+            else:
+                other = varName.encode(self.header.fileEncoding)
+        except (UnicodeError, AttributeError):
+            other = None
+        if other is None or other not in varTypes:
+            raise KeyError(varName)
+        return other
+
+    def __getitem__(self, varName):
+        return VariableMeta(self.header, self._varName(varName))
+
+    def __contains__(self, varName):
+        try:
+            self._varName(varName)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(self.header.varNames)
+
+    def __len__(self):
+        return len(self.header.varNames)
+
+
+class VariableMeta(object):
+    """The metadata of variable <varName>. Attributes are looked up in the
+    (cached) metadata of <header> on first access, so unused kinds of
+    metadata are never retrieved. Variables without e.g. value labels
+    return ``None``"""
+
+    attributes = ("varTypes", "formats", "varLabels", "valueLabels",
+                  "missingValues", "measureLevels", "columnWidths",
+                  "alignments", "varRoles", "varAttributes")
+
+    def __init__(self, header, varName):
+        self.header = header
+        self.varName = varName
+
+    def __getattr__(self, name):
+        if name not in VariableMeta.attributes:
+            raise AttributeError(name)
+        # look up the cached metadata itself, rather than a copy of it
+        metadata = self.header.__dict__.get("metadata_", {})
+        if name in metadata:
+            values = metadata[name]
+        else:
+            values = getattr(self.header, name)
+        value = copyMetadata(values.get(self.varName))
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(VariableMeta.attributes) | set(self.__dict__))
+
+    def __repr__(self):
+        return "<%s %r>" % (self.__class__.__name__, self.varName)
@@ -1,7 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-from functools import wraps
+from functools import wraps, partial
+from collections import namedtuple, OrderedDict
 
 def memoized_property(fget):
     """
@@ -18,19 +19,78 @@ def memoized_property(fget):
         return getattr(self, attr_name)
     return property(fget_memoized)
 
-def memoize(f):
-    """Memoization decorator
-    source: http://code.activestate.com/recipes/577219-minimalistic-memoization/"""
-    # see also issue # 22 
-    cache = {}
-    MAXCACHE = 10 ** 7
+CacheInfo = namedtuple("CacheInfo", "hits misses evictions maxsize currsize")
+
+class LRUCache(object):
+    """Bounded cache that evicts the least recently used item once it
+    holds <maxsize> items. It counts hits, misses and evictions"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key, default=None):
+        try:
+            value = self.items.pop(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        self.items[key] = value  # most recently used item is last
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        items = self.items
+        if key not in items and len(items) >= self.maxsize:
+            items.popitem(last=False)
+            self.evictions += 1
+        items[key] = value
+
+    def info(self):
+        """Returns the counters as a CacheInfo namedtuple"""
+        return CacheInfo(self.hits, self.misses, self.evictions,
+                         self.maxsize, len(self.items))
+
+    def clear(self):
+        self.items.clear()
+
+def memoize(f=None, maxsize=2 ** 17):
+    """Memoization decorator for methods. Each instance gets its own
+    LRUCache of at most <maxsize> items per method, in its ``_caches``
+    attribute, so a cache never outlives its instance. The instance
+    itself is not part of the key. Unhashable arguments are not cached.
+    Use either ``@memoize`` or ``@memoize(maxsize=1000)``"""
+    if f is None:
+        return partial(memoize, maxsize=maxsize)
+    name = f.__name__
+    missing = object()
     @wraps(f)
-    def memf(*datetime):
-        if datetime in cache:
-            return cache[datetime]
-        elif len(cache) < MAXCACHE:
-            result = f(*datetime)
-            cache[datetime] = result
-            return result
-        return f(*datetime)
-    return memf 
+    def memf(self, *args):
+        caches = self.__dict__.setdefault("_caches", {})
+        cache = caches.get(name)
+        if cache is None:
+            cache = caches[name] = LRUCache(maxsize)
+        try:
+            result = cache.get(args, missing)
+        except TypeError:  # unhashable
+            return f(self, *args)
+        if result is missing:
+            result = cache[args] = f(self, *args)
+        return result
+    return memf
+
+def cacheInfo(obj):
+    """Returns a dict of {method name: CacheInfo} of the memoize caches of
+    <obj>"""
+    caches = getattr(obj, "_caches", {})
+    return dict((name, cache.info()) for name, cache in caches.items())
+
+def clearCaches(obj):
+    """Releases the memoize caches of <obj>"""
+    for cache in getattr(obj, "_caches", {}).values():
+        cache.clear()
+    obj.__dict__.pop("_caches", None)
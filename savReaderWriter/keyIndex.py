@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Indexes on the id variable of an SPSS data file.
+
+:py:class:`KeyIndex` is a persistent index: a sidecar file next to the .sav
+file that contains a header and a sorted array of fixed-width (key, case
+number) records. It is memory-mapped, so lookups are O(log n) binary
+searches that only touch a handful of pages, and opening an existing index
+costs nothing. :py:class:`HashIndex` is an in-memory dict of the keys."""
+
+import os
+import mmap
+import struct
+import numbers
+import tempfile
+
+from savReaderWriter import *
+from py3k import *
+
+
+class KeyIndex(object):
+    """Sorted, memory-mapped index of the values of an id variable.
+
+    Parameters
+    ----------
+    indexFileName : str
+        the file name of the index
+    savFileName : str
+        the file name of the spss data file that is indexed
+    idVar : bytes
+        the name of the indexed variable
+    keyWidth : int
+        0 if the id variable is numeric, else its length in bytes
+
+    Numeric keys are stored as doubles, string keys as bytes without
+    trailing blanks, padded with NUL bytes to <keyWidth>. Records with equal
+    keys are ordered by case number. The file size and the modification time
+    of the .sav file are stored in the header: :py:meth:`open` returns
+    ``None`` if the index is stale.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        index = KeyIndex.build(fileName, savFileName, b"id", 0, keys)
+        index.positions(4.0)  # --> [3]
+        index.close()
+    """
+
+    magic = b"SRWKIDX1"
+    headerFormat = "<8sqdiq64s"
+
+    def __init__(self, f, keyWidth):
+        self.f = f
+        self.keyWidth = keyWidth
+        self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.headerSize = struct.calcsize(self.headerFormat)
+        self.nKeys = struct.unpack_from(self.headerFormat, self.buffer)[4]
+        self.record = self._getRecordStruct(keyWidth)
+
+    @staticmethod
+    def _getRecordStruct(keyWidth):
+        return struct.Struct("<%sq" % ("%ds" % keyWidth if keyWidth else "d"))
+
+    @staticmethod
+    def _fileStamp(savFileName):
+        st = os.stat(savFileName)
+        return st.st_size, st.st_mtime
+
+    @classmethod
+    def build(cls, indexFileName, savFileName, idVar, keyWidth, keys):
+        """Writes an index of <keys> (the values of <idVar> in case order)
+        to <indexFileName>, and returns it opened"""
+        idVar = cls._encode(idVar)
+        keys = [cls._normalize(key, keyWidth) for key in keys]
+        order = sorted((case for case in xrange(len(keys))
+                        if keys[case] is not None), key=keys.__getitem__)
+        size, mtime = cls._fileStamp(savFileName)
+        header = struct.pack(cls.headerFormat, cls.magic, size, mtime,
+                             keyWidth, len(order), idVar)
+        pack = cls._getRecordStruct(keyWidth).pack
+        # other processes may have the index memory-mapped, so it is never
+        # rewritten in place: it is written under a temporary name and then
+        # renamed (cf. SavHeaderReader._writeCache)
+        dirName = os.path.dirname(os.path.abspath(indexFileName))
+        fd, tempFileName = tempfile.mkstemp(dir=dirName)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                for start in xrange(0, len(order), 10000):
+                    f.write(b"".join([pack(keys[case], case) for case
+                                      in order[start:start + 10000]]))
+            try:
+                os.rename(tempFileName, indexFileName)
+            except OSError:  # Windows: indexFileName exists
+                os.remove(indexFileName)
+                os.rename(tempFileName, indexFileName)
+        except:
+            if os.path.exists(tempFileName):
+                os.remove(tempFileName)
+            raise
+        return cls.open(indexFileName, savFileName, idVar)
+
+    @classmethod
+    def open(cls, indexFileName, savFileName, idVar):
+        """Opens an existing index. Returns ``None`` if the index does not
+        exist, or if it is stale, corrupt or made for another variable"""
+        try:
+            f = open(indexFileName, "rb")
+        except (IOError, OSError):
+            return None
+        idVar = cls._encode(idVar)
+        headerSize = struct.calcsize(cls.headerFormat)
+        try:
+            (magic, size, mtime, keyWidth, nKeys, indexedVar) = \
+                struct.unpack(cls.headerFormat, f.read(headerSize))
+            recordSize = cls._getRecordStruct(keyWidth).size
+            fileSize = os.fstat(f.fileno()).st_size
+        except struct.error:
+            f.close()
+            return None
+        if magic != cls.magic or indexedVar.rstrip(b"\x00") != idVar or \
+           (size, mtime) != cls._fileStamp(savFileName) or \
+           fileSize != headerSize + nKeys * recordSize:
+            f.close()
+            return None
+        return cls(f, keyWidth)
+
+    @staticmethod
+    def _encode(idVar):
+        return idVar if isinstance(idVar, bytes) else idVar.encode("utf-8")
+
+    @staticmethod
+    def _normalize(key, keyWidth):
+        """Returns <key> in the form in which it is stored, or ``None``
+        if <key> cannot occur in the index"""
+        if keyWidth:
+            if not isinstance(key, bytes):
+                return None
+            key = key.rstrip()
+            return key.ljust(keyWidth, b"\x00") if len(key) <= keyWidth \
+                   else None
+        if isinstance(key, bool) or not isinstance(key, numbers.Real):
+            return None
+        return float(key)
+
+    def _key(self, i):
+        return self.record.unpack_from(self.buffer,
+                                       self.headerSize +
+                                       i * self.record.size)[0]
+
+    def _bisect(self, key, right=False):
+        lo, hi = 0, self.nKeys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            midKey = self._key(mid)
+            if midKey < key or (right and midKey == key):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def positions(self, key):
+        """Returns a sorted list of the case numbers for which the id
+        variable is equal to <key>"""
+        key = self._normalize(key, self.keyWidth)
+        if key is None:
+            return []
+        lo = self._bisect(key)
+        hi = self._bisect(key, right=True)
+        unpack_from, size = self.record.unpack_from, self.record.size
+        offset = self.headerSize
+        return [unpack_from(self.buffer, offset + i * size)[1]
+                for i in xrange(lo, hi)]
+
+    def __contains__(self, key):
+        key = self._normalize(key, self.keyWidth)
+        if key is None:
+            return False
+        lo = self._bisect(key)
+        return lo < self.nKeys and self._key(lo) == key
+
+    def __len__(self):
+        return self.nKeys
+
+    def close(self):
+        """Closes the memory map and the index file"""
+        self.buffer.close()
+        self.f.close()
+
+
+class HashIndex(object):
+    """In-memory hash index of the values of an id variable: a dict of
+    {key: [case numbers]}. Lookups are O(1), but unlike :py:class:`KeyIndex`
+    the index is built by each new reader instance.
+
+    Parameters
+    ----------
+    keyWidth : int
+        0 if the id variable is numeric, else its length in bytes
+    keys : iterable
+        the values of the id variable, in case order
+    """
+
+    def __init__(self, keyWidth, keys):
+        self.keyWidth = keyWidth
+        self.index = index = {}
+        normalize = self._normalize
+        for case, key in enumerate(keys):
+            key = normalize(key)
+            if key is not None:
+                index.setdefault(key, []).append(case)
+
+    def _normalize(self, key):
+        """Returns <key> in the form in which it is stored, or ``None``
+        if <key> cannot occur in the index"""
+        if self.keyWidth:
+            return key.rstrip() if isinstance(key, bytes) else None
+        if isinstance(key, bool) or not isinstance(key, numbers.Real):
+            return None
+        return float(key)
+
+    def positions(self, key):
+        """Returns a sorted list of the case numbers for which the id
+        variable is equal to <key>"""
+        return list(self.index.get(self._normalize(key), []))
+
+    def __contains__(self, key):
+        return self._normalize(key) in self.index
+
+    def __len__(self):
+        return sum(len(cases) for cases in self.index.values())
+
+    def close(self):
+        """Releases the index"""
+        self.index = {}
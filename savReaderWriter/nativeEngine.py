@@ -0,0 +1,694 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Pure Python decoder for the case data of SPSS system files (.sav, .zsav).
+
+The dictionary records are parsed directly from the file, and uncompressed,
+bytecode-compressed and zlib-compressed case data are decoded without any
+calls to the I/O module. Cases are produced in the same layout as
+``spssWholeCaseIn`` uses (8 bytes per numeric variable, ceiled multiples of
+8 bytes per string variable), so the decoder can be used as a drop-in
+replacement for it (see the ``engine`` argument of
+:py:class:`savReaderWriter.SavReader`)."""
+
+import os
+import sys
+import struct
+import zlib
+import tempfile
+import collections
+import warnings
+from ctypes import memmove, sizeof
+
+from savReaderWriter import *
+from error import *
+from py3k import *
+
+# compression codes in the file header
+COMPRESSION_NONE, COMPRESSION_BYTECODE, COMPRESSION_ZLIB = 0, 1, 2
+
+# bytecode compression opcodes
+OP_PADDING, OP_END, OP_RAW, OP_SPACES, OP_SYSMIS = 0, 252, 253, 254, 255
+
+# dictionary record types
+REC_VARIABLE, REC_VALUE_LABELS, REC_VALUE_LABEL_VARS = 2, 3, 4
+REC_DOCUMENT, REC_EXTENSION, REC_END = 6, 7, 999
+REC_HEADER = 1
+
+SPSS_FILE_END = -5
+SPSS_INVALID_FILE = 6
+
+# very long strings (> 255 bytes) are stored in segments of 255 bytes,
+# each of which occupies 256 bytes (32 slots) in the case data
+SEGMENT_WIDTH = 255
+EFFECTIVE_SEGMENT_WIDTH = 252
+
+DEFAULT_SYSMIS = -sys.float_info.max
+
+Variable = collections.namedtuple("Variable",
+    "name varType printFormat writeFormat label missingValues slot")
+
+# state of the bytecode decoder at the start of a case: the stream offset
+# of the next unread byte, the current block of 8 opcodes, and the index of
+# the next opcode in that block
+Checkpoint = collections.namedtuple("Checkpoint",
+    "streamOffset opcodes opIndex")
+
+# position of a dictionary record in the file. <subtype> is None for other
+# records than type 7. A type 3 record includes the type 4 record after it
+DictionaryRecord = collections.namedtuple("DictionaryRecord",
+    "recordType subtype offset size")
+
+ZBlock = collections.namedtuple("ZBlock",
+    "uncompressedOffset compressedOffset uncompressedSize compressedSize")
+
+def ceil4(n):
+    """Round <n> up to the nearest multiple of 4"""
+    return int(-(-n // 4) * 4)
+
+def ceil8(n):
+    """Round <n> up to the nearest multiple of 8"""
+    return int(-(-n // 8) * 8)
+
+def nSegments(varType):
+    """Returns the number of segments (dictionary variables) of a string
+    variable that is <varType> bytes wide"""
+    if varType <= SEGMENT_WIDTH:
+        return 1
+    return -(-varType // EFFECTIVE_SEGMENT_WIDTH)
+
+def segmentWidths(varType):
+    """Returns a list of (allocated width, used width) tuples for each
+    segment of a string variable that is <varType> bytes wide"""
+    n = nSegments(varType)
+    if n == 1:
+        return [(varType, varType)]
+    widths = []
+    for segment in range(n):
+        if segment < n - 1:
+            allocated = SEGMENT_WIDTH
+        else:
+            allocated = varType - segment * EFFECTIVE_SEGMENT_WIDTH
+        used = max(0, min(SEGMENT_WIDTH, varType - segment * SEGMENT_WIDTH))
+        widths.append((allocated, used))
+    return widths
+
+
+class SavDictionary(object):
+    """Parses the file header and the dictionary records of an SPSS system
+    file. The file position of <f> is left at the start of the case data
+    (``dataOffset``), and the position of each record is in ``records``
+    (a list of :py:class:`DictionaryRecord`).
+
+    Only the information that is needed to decode the case data is
+    interpreted; other records are kept as raw bytes in ``extensions``
+    (keyed by record subtype) and ``valueLabelRecords`` (see
+    :py:class:`savReaderWriter.nativeHeader.NativeHeader`). The index of
+    the blocks of a .zsav file is read only if <readTrailer> is True."""
+
+    headerFormat = "4s60siiiiid9s8s64s3s"
+
+    def __init__(self, f, readTrailer=True):
+        self.f = f
+        self.variables = []
+        self.valueLabelRecords = []
+        self.documents = []
+        self.extensions = collections.defaultdict(list)
+        self.records = []
+        self._readHeader()
+        self._readDictionary()
+        self.dataOffset = f.tell()
+        self.zlibTrailer = None
+        if self.compression == COMPRESSION_ZLIB and readTrailer:
+            self._readZHeader()
+        self.vlsWidths = self._getVeryLongStrings()
+        self.varNames, self.varTypes, self.segments = self._getLayout()
+        self.caseSize = sum(ceil8(t) if t else 8 for t in self.varTypes)
+        self.sysmis = self._getSysmis()
+
+    def _read(self, n):
+        data = self.f.read(n)
+        if len(data) != n:
+            raise SPSSIOError("Unexpected end of file in dictionary",
+                              SPSS_INVALID_FILE)
+        return data
+
+    def _unpack(self, fmt):
+        fmt = self.byteorder + fmt
+        return struct.unpack(fmt, self._read(struct.calcsize(fmt)))
+
+    def _readHeader(self):
+        raw = self._read(struct.calcsize("<" + self.headerFormat))
+        if raw[:4] not in (b"$FL2", b"$FL3"):
+            raise SPSSIOError("Not an SPSS system file", SPSS_INVALID_FILE)
+        self.records.append(DictionaryRecord(REC_HEADER, None, 0, len(raw)))
+        layoutCode = struct.unpack("<i", raw[64:68])[0]
+        self.byteorder = "<" if layoutCode in (2, 3) else ">"
+        (self.recordType, self.productName, self.layoutCode,
+         self.nominalCaseSize, self.compression, self.weightIndex,
+         self.nCases, self.bias, self.creationDate, self.creationTime,
+         self.fileLabel, _) = struct.unpack(self.byteorder +
+                                            self.headerFormat, raw)
+        if self.compression not in (COMPRESSION_NONE, COMPRESSION_BYTECODE,
+                                    COMPRESSION_ZLIB):
+            msg = "Unknown compression code %d" % self.compression
+            raise SPSSIOError(msg, SPSS_INVALID_FILE)
+
+    def _readDictionary(self):
+        slot = 0
+        while True:
+            offset, subtype = self.f.tell(), None
+            recordType, = self._unpack("i")
+            if recordType == REC_VARIABLE:
+                variable = self._readVariable(slot)
+                slot += 1
+                if variable is not None:
+                    self.variables.append(variable)
+            elif recordType == REC_VALUE_LABELS:
+                self._readValueLabels()
+            elif recordType == REC_DOCUMENT:
+                nLines, = self._unpack("i")
+                self.documents.append(self._read(80 * nLines))
+            elif recordType == REC_EXTENSION:
+                subtype, size, count = self._unpack("iii")
+                self.extensions[subtype].append(self._read(size * count))
+            elif recordType == REC_END:
+                self._unpack("i")
+                self.slotsPerCase = slot
+            else:
+                msg = "Unknown dictionary record type %d" % recordType
+                raise SPSSIOError(msg, SPSS_INVALID_FILE)
+            size = self.f.tell() - offset
+            self.records.append(DictionaryRecord(recordType, subtype,
+                                                 offset, size))
+            if recordType == REC_END:
+                return
+
+    def _readVariable(self, slot):
+        (varType, hasLabel, nMissing,
+         printFormat, writeFormat, name) = self._unpack("iiiii8s")
+        label = None
+        if hasLabel:
+            length, = self._unpack("i")
+            label = self._read(ceil4(length))[:length]
+        missingValues = b""  # raw: the values of string variables are text
+        if nMissing:
+            missingValues = self._read(8 * abs(nMissing))
+        if varType == -1:
+            return None  # continuation of a (long) string variable
+        return Variable(name.rstrip(), varType, printFormat, writeFormat,
+                        label, (nMissing, missingValues), slot)
+
+    def _readValueLabels(self):
+        nLabels, = self._unpack("i")
+        labels = []
+        for i in range(nLabels):
+            value = self._read(8)
+            length = ord(self._read(1))
+            label = self._read(ceil8(length + 1) - 1)[:length]
+            labels.append((value, label))
+        recordType, nVars = self._unpack("ii")
+        if recordType != REC_VALUE_LABEL_VARS:
+            raise SPSSIOError("Value label record not followed by type 4 "
+                              "record", SPSS_INVALID_FILE)
+        indices = self._unpack("%di" % nVars)
+        self.valueLabelRecords.append((labels, indices))
+
+    def _readZHeader(self):
+        (zheaderOffset, ztrailerOffset,
+         ztrailerLength) = self._unpack("qqq")
+        here = self.f.tell()
+        self.f.seek(ztrailerOffset)
+        bias, zero, blockSize, nBlocks = self._unpack("qqii")
+        self.zlibTrailer = [ZBlock(*self._unpack("qqii"))
+                            for i in range(nBlocks)]
+        self.zlibBlockSize = blockSize
+        self.f.seek(here)
+
+    def _getVeryLongStrings(self):
+        """Returns a dict of {short name: width} for very long strings
+        (record type 7, subtype 14)"""
+        vlsWidths = {}
+        for data in self.extensions.get(14, []):
+            for item in data.split(b"\t"):
+                item = item.strip(b"\x00")
+                if b"=" not in item:
+                    continue
+                name, width = item.split(b"=", 1)
+                vlsWidths[name.rstrip()] = int(width.strip(b"\x00 "))
+        return vlsWidths
+
+    def _getLayout(self):
+        """Maps the dictionary variables (which may be segments of very
+        long strings) to variables as seen by the user. Returns their
+        names, types (0 = numeric, or the string length), and for each
+        variable a list of (slot, used bytes) segments"""
+        varNames, varTypes, segments = [], [], []
+        variables = iter(self.variables)
+        for variable in variables:
+            varType = self.vlsWidths.get(variable.name, variable.varType)
+            parts = [variable]
+            for i in range(nSegments(varType) - 1):
+                parts.append(next(variables))
+            if varType == 0:
+                used = [8]
+            else:
+                used = [u for a, u in segmentWidths(varType)]
+            varNames.append(variable.name)
+            varTypes.append(varType)
+            segments.append([(p.slot, u) for p, u in zip(parts, used)])
+        return varNames, varTypes, segments
+
+    def _getSysmis(self):
+        """Returns the system missing value (record type 7, subtype 4)"""
+        for data in self.extensions.get(4, []):
+            return struct.unpack(self.byteorder + "d", data[:8])[0]
+        return DEFAULT_SYSMIS
+
+    @property
+    def isIdentityLayout(self):
+        """Indicates whether the case layout in the file is identical to
+        the layout of ``spssWholeCaseIn`` (i.e., no very long strings)"""
+        return not self.vlsWidths
+
+
+class CaseIndex(object):
+    """Row-offset index of a compressed SPSS system file: the decoder state
+    at every <interval>-th case, so that any case can be reached by decoding
+    at most <interval> cases.
+
+    An index is tied to a specific version of a file: when it is saved to
+    disk, the size and the modification time of the .sav file are stored
+    with it, and :py:meth:`load` returns ``None`` if they no longer match."""
+
+    magic = b"SRWCIDX1"
+    headerFormat = "<8sqdqq"
+    entryFormat = "<q8sq"
+
+    def __init__(self, interval, checkpoints=None):
+        self.interval = interval
+        self.checkpoints = [] if checkpoints is None else checkpoints
+
+    def __len__(self):
+        return len(self.checkpoints)
+
+    def nearest(self, case):
+        """Returns the (case number, checkpoint) tuple of the last
+        checkpoint at or before case number <case>"""
+        i = min(case // self.interval, len(self.checkpoints) - 1)
+        return i * self.interval, self.checkpoints[i]
+
+    @staticmethod
+    def _fileStamp(savFileName):
+        st = os.stat(savFileName)
+        return st.st_size, st.st_mtime
+
+    def save(self, indexFileName, savFileName):
+        """Writes the index to <indexFileName>. The index is written under a
+        temporary name and then renamed, so concurrent readers (or a crash)
+        never see a partially written index"""
+        size, mtime = self._fileStamp(savFileName)
+        header = struct.pack(self.headerFormat, self.magic, size, mtime,
+                             self.interval, len(self.checkpoints))
+        packEntry = struct.Struct(self.entryFormat).pack
+        dirName = os.path.dirname(os.path.abspath(indexFileName))
+        fd, tempFileName = tempfile.mkstemp(dir=dirName)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                f.write(b"".join([packEntry(c.streamOffset, bytes(c.opcodes),
+                                            c.opIndex)
+                                  for c in self.checkpoints]))
+            try:
+                os.rename(tempFileName, indexFileName)
+            except OSError:  # Windows: indexFileName exists
+                os.remove(indexFileName)
+                os.rename(tempFileName, indexFileName)
+        except:
+            if os.path.exists(tempFileName):
+                os.remove(tempFileName)
+            raise
+
+    @classmethod
+    def load(cls, indexFileName, savFileName):
+        """Reads an index from <indexFileName>. Returns ``None`` if the
+        index does not exist, or if it is stale or corrupt"""
+        try:
+            with open(indexFileName, "rb") as f:
+                data = f.read()
+        except (IOError, OSError):
+            return None
+        headerSize = struct.calcsize(cls.headerFormat)
+        entry = struct.Struct(cls.entryFormat)
+        try:
+            (magic, size, mtime, interval,
+             n) = struct.unpack(cls.headerFormat, data[:headerSize])
+        except struct.error:
+            return None
+        if magic != cls.magic or (size, mtime) != cls._fileStamp(savFileName) \
+           or len(data) != headerSize + n * entry.size:
+            return None
+        checkpoints = []
+        for offset in xrange(headerSize, len(data), entry.size):
+            streamOffset, opcodes, opIndex = entry.unpack_from(data, offset)
+            checkpoints.append(Checkpoint(streamOffset, bytearray(opcodes),
+                                          opIndex))
+        return cls(interval, checkpoints)
+
+
+class NativeEngine(object):
+    """Reads case data from an SPSS system file without the I/O module.
+
+    Parameters
+    ----------
+    savFileName : str
+        the file name of the spss data file
+    bufferSize : int
+        the number of bytes that are read from disk (or decompressed) at once
+    caseIndex : str
+        indicates whether a row-offset index (:py:class:`CaseIndex`) is
+        used to seek cases in compressed files. Valid values are ``None``
+        (default; seeking backwards means decoding from the first case),
+        ``"memory"`` (the index is built when the file is opened) and
+        ``"disk"`` (idem, but the index is also saved next to the .sav file,
+        and re-used by later instances as long as the .sav file does not
+        change). Uncompressed files never need an index.
+    indexInterval : int
+        the number of cases between two entries in the index: seeking a case
+        means decoding at most <indexInterval> cases
+
+    Examples
+    --------
+    The methods ``wholeCaseIn`` and ``seekNextCase`` have the same signature
+    and return codes as their I/O module counterparts:
+
+    .. code-block:: python
+
+        engine = NativeEngine("someFile.sav")
+        caseBuffer = ctypes.create_string_buffer(engine.caseSize)
+        while engine.wholeCaseIn(None, caseBuffer) == 0:
+            process(caseBuffer.raw)
+        engine.close()
+    """
+
+    def __init__(self, savFileName, bufferSize=2 ** 20, caseIndex=None,
+                 indexInterval=1000):
+        if caseIndex not in (None, "memory", "disk"):
+            raise ValueError("caseIndex must be None, 'memory' or 'disk', "
+                             "not %r" % caseIndex)
+        self.savFileName = savFileName
+        self.bufferSize = bufferSize
+        self.f = open(savFileName, "rb")
+        try:
+            self.dictionary = SavDictionary(self.f)
+        except:
+            self.f.close()
+            raise
+        d = self.dictionary
+        self.compression = d.compression
+        self.caseSize = d.caseSize
+        self.slotsPerCase = d.slotsPerCase
+        self.nCases = d.nCases
+        self._opcodeTable = self._getOpcodeTable()
+        self._assemble = self._getAssembler()
+        self.caseIndex = None
+        self.seek(0)
+        if caseIndex and self.compression != COMPRESSION_NONE:
+            self.caseIndex = self._getCaseIndex(caseIndex == "disk",
+                                                indexInterval)
+
+    def close(self):
+        """Closes the file"""
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, tb):
+        self.close()
+
+    def _getOpcodeTable(self):
+        """Returns a list that maps each bytecode to the 8 bytes it
+        represents (``None`` for raw data, ``b""`` for padding)"""
+        d = self.dictionary
+        pack = struct.Struct(d.byteorder + "d").pack
+        table = [pack(code - d.bias) for code in range(256)]
+        table[OP_PADDING] = b""
+        table[OP_END] = table[OP_RAW] = None
+        table[OP_SPACES] = b" " * 8
+        table[OP_SYSMIS] = pack(d.sysmis)
+        return table
+
+    def _getAssembler(self):
+        """Returns a function that converts the file layout of a case to the
+        layout of ``spssWholeCaseIn``, or None if they are identical"""
+        d = self.dictionary
+        if d.isIdentityLayout:
+            return None
+        pieces = []
+        for varType, segments in zip(d.varTypes, d.segments):
+            nbytes = ceil8(varType) if varType else 8
+            for slot, used in segments:
+                pieces.append((slot * 8, slot * 8 + used))
+            padding = nbytes - sum(used for slot, used in segments)
+            if padding:
+                pieces.append((None, padding))
+        def assemble(case):
+            return b"".join([case[start:stop] if start is not None else
+                             b" " * stop for start, stop in pieces])
+        return assemble
+
+    # ------------------------------------------------------------------
+    # data streams
+    # ------------------------------------------------------------------
+
+    def _fileStream(self, offset):
+        """Yields the (compressed) case data from file offset <offset>"""
+        f, bufferSize = self.f, self.bufferSize
+        f.seek(self.dictionary.dataOffset + offset)
+        while True:
+            data = f.read(bufferSize)
+            if not data:
+                return
+            yield data
+
+    def _zlibStream(self, offset):
+        """Yields the decompressed case data from stream offset <offset> of
+        a .zsav file"""
+        f, blocks = self.f, self.dictionary.zlibTrailer
+        if not blocks:
+            return
+        base = blocks[0].uncompressedOffset
+        for block in blocks:
+            start = block.uncompressedOffset - base
+            if start + block.uncompressedSize <= offset:
+                continue
+            f.seek(block.compressedOffset)
+            data = zlib.decompress(f.read(block.compressedSize))
+            if offset > start:
+                data = data[offset - start:]
+            yield data
+
+    def _stream(self, offset):
+        if self.compression == COMPRESSION_ZLIB:
+            return self._zlibStream(offset)
+        return self._fileStream(offset)
+
+    # ------------------------------------------------------------------
+    # decoding
+    # ------------------------------------------------------------------
+
+    def seek(self, case):
+        """Positions the engine so that the next case that is read is case
+        number <case>. The position is a zero-based row index."""
+        if self.compression == COMPRESSION_NONE:
+            offset = case * self.slotsPerCase * 8
+            self._chunks = self._stream(offset)
+            self._buffer, self._pos, self._streamPos = b"", 0, offset
+            self.position = case
+            return
+        position, checkpoint = 0, Checkpoint(0, b"", 8)
+        if self.caseIndex:
+            position, checkpoint = self.caseIndex.nearest(case)
+        self._restore(position, checkpoint)
+        self.skip(case - position)
+
+    def _checkpoint(self):
+        """Returns the state of the bytecode decoder"""
+        return Checkpoint(self._streamPos + self._pos,
+                          bytearray(self._opcodes), self._opIndex)
+
+    def _restore(self, position, checkpoint):
+        """Restores the state of the bytecode decoder at case number
+        <position> from <checkpoint>"""
+        self._chunks = self._stream(checkpoint.streamOffset)
+        self._buffer, self._pos = b"", 0
+        self._streamPos = checkpoint.streamOffset
+        self._opcodes = bytearray(checkpoint.opcodes)
+        self._opIndex = checkpoint.opIndex
+        self._eof = False
+        self.position = position
+        self._fill(72)  # raw data of the remaining opcodes in the block
+
+    def buildIndex(self, interval=1000):
+        """Decodes all cases once and returns a :py:class:`CaseIndex` with
+        a checkpoint at every <interval>-th case. The engine is rewound
+        to the first case."""
+        if self.compression == COMPRESSION_NONE:
+            raise ValueError("Uncompressed files do not need an index")
+        self._restore(0, Checkpoint(0, b"", 8))
+        checkpoints = []
+        while True:
+            checkpoint = self._checkpoint()
+            if not self._decode(interval):
+                break
+            checkpoints.append(checkpoint)
+        index = CaseIndex(interval, checkpoints or [Checkpoint(0, b"", 8)])
+        self._restore(0, index.checkpoints[0])
+        return index
+
+    def _getCaseIndex(self, persist, interval):
+        """Loads the index from disk, or builds (and possibly saves) it"""
+        indexFileName = self.savFileName + ".caseidx"
+        if persist:
+            index = CaseIndex.load(indexFileName, self.savFileName)
+            if index is not None:
+                return index
+        index = self.buildIndex(interval)
+        if persist:
+            try:
+                index.save(indexFileName, self.savFileName)
+            except (IOError, OSError) as e:
+                warnings.warn("Could not save case index to %r (%s)" %
+                              (indexFileName, e), stacklevel=2)
+        return index
+
+    def skip(self, n):
+        """Skips the next <n> cases"""
+        while n > 0:
+            cases = self._decode(min(n, 4096))
+            if not cases:
+                break
+            n -= len(cases)
+
+    def _fill(self, nbytes):
+        """Ensures that at least <nbytes> unread bytes are in the buffer,
+        unless the end of the stream is reached"""
+        buf, pos = self._buffer, self._pos
+        if len(buf) - pos >= nbytes:
+            return
+        parts = [buf[pos:]]
+        available = len(buf) - pos
+        for data in self._chunks:
+            parts.append(data)
+            available += len(data)
+            if available >= nbytes:
+                break
+        self._streamPos += pos
+        self._buffer, self._pos = b"".join(parts), 0
+
+    def _decodeUncompressed(self, n):
+        caseSize = self.slotsPerCase * 8
+        self._fill(n * caseSize)
+        buf, pos = self._buffer, self._pos
+        n = min(n, (len(buf) - pos) // caseSize)
+        cases = [buf[pos + i * caseSize: pos + (i + 1) * caseSize]
+                 for i in range(n)]
+        self._pos = pos + n * caseSize
+        return cases
+
+    def _decodeBytecode(self, n):
+        if self._eof:
+            return []
+        table, slotsPerCase = self._opcodeTable, self.slotsPerCase
+        opcodes, opIndex = self._opcodes, self._opIndex
+        cases, case = [], []
+        append = case.append
+        buf, pos = self._buffer, self._pos
+        while len(cases) < n:
+            if opIndex == 8:
+                if len(buf) - pos < 72:
+                    self._pos = pos
+                    self._fill(72)
+                    buf, pos = self._buffer, self._pos
+                opcodes = bytearray(buf[pos:pos + 8])
+                pos += 8
+                opIndex = 0
+                if len(opcodes) < 8:
+                    self._eof = True
+                    break
+            code = opcodes[opIndex]
+            opIndex += 1
+            value = table[code]
+            if value is None:
+                if code == OP_END:
+                    self._eof = True
+                    break
+                value = buf[pos:pos + 8]
+                pos += 8
+            elif not value:
+                continue
+            append(value)
+            if len(case) == slotsPerCase:
+                cases.append(b"".join(case))
+                case = []
+                append = case.append
+        self._buffer, self._pos = buf, pos
+        self._opcodes, self._opIndex = opcodes, opIndex
+        return cases
+
+    def _decode(self, n):
+        """Returns a list of (at most) <n> cases in file layout"""
+        if self.compression == COMPRESSION_NONE:
+            cases = self._decodeUncompressed(n)
+        else:
+            cases = self._decodeBytecode(n)
+        self.position += len(cases)
+        return cases
+
+    def readCases(self, n):
+        """Returns a list of (at most) <n> cases, as bytes in the layout
+        of ``spssWholeCaseIn``. An empty list means end of file."""
+        if self.nCases >= 0:
+            n = min(n, self.nCases - self.position)
+            if n <= 0:
+                return []
+        cases = self._decode(n)
+        if self._assemble:
+            cases = [self._assemble(case) for case in cases]
+        return cases
+
+    def readCase(self):
+        """Returns the next case as bytes, or None at end of file"""
+        cases = self.readCases(1)
+        return cases[0] if cases else None
+
+    # ------------------------------------------------------------------
+    # I/O module compatible interface
+    # ------------------------------------------------------------------
+
+    def wholeCaseIn(self, fh, caseBuffer):
+        """Reads the next case into <caseBuffer>, a ctypes character buffer
+        (or a ``byref`` to it). The file handle <fh> is ignored. Returns
+        ``SPSS_FILE_END`` (-5) at end of file, and 0 otherwise."""
+        case = self.readCase()
+        if case is None:
+            return SPSS_FILE_END
+        caseBuffer = getattr(caseBuffer, "_obj", caseBuffer)
+        memmove(caseBuffer, case, min(len(case), sizeof(caseBuffer)))
+        return 0
+
+    def seekNextCase(self, fh, caseNumber):
+        """Positions the engine at <caseNumber> (an int or a ctypes
+        integer). The file handle <fh> is ignored. Returns 0."""
+        caseNumber = getattr(caseNumber, "value", caseNumber)
+        if caseNumber == self.position:
+            return 0
+        distance = caseNumber - self.position
+        interval = self.caseIndex.interval if self.caseIndex else None
+        if self.compression != COMPRESSION_NONE and distance > 0 and \
+           (interval is None or distance < interval):
+            self.skip(distance)  # decoding forward is cheaper
+        else:
+            self.seek(caseNumber)
+        return 0
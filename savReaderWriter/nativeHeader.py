@@ -0,0 +1,398 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Pure Python decoder for the data dictionary of SPSS system files (.sav,
+.zsav).
+
+The metadata (variables, formats, labels, missing values, and the extension
+records such as long variable names, very long strings, multiple response
+sets, attributes and the file encoding) are decoded from the dictionary
+records without loading the I/O module and without changing the locale.
+The result has the same form as the return values of the metadata getters
+of :py:class:`savReaderWriter.Header` (see the ``engine`` argument of
+:py:class:`savReaderWriter.SavHeaderReader`)."""
+
+import codecs
+import locale
+import struct
+
+from savReaderWriter import *
+from generic import ianaToCodec
+from nativeEngine import SavDictionary
+from py3k import *
+
+# codes of the variable display parameters (record type 7, subtype 11) and
+# of the $@Role attribute, in the form the I/O module returns them
+measureLevels = {0: b"unknown", 1: b"nominal", 2: b"ordinal", 3: b"ratio",
+                 4: b"flag", 5: b"typeless"}
+alignments = {0: b"left", 1: b"right", 2: b"center"}
+roles = {0: b"input", 1: b"target", 2: b"both", 3: b"none", 4: b"partition",
+         5: b"split", 6: b"frequency", 7: b"record ID"}
+
+
+class NativeHeader(object):
+    """Reads the data dictionary of an SPSS system file without the I/O
+    module. The dictionary records are read with one buffered read (of
+    <bufferSize> bytes) for all but very large dictionaries, and the file is
+    closed again before the constructor returns.
+
+    Parameters
+    ----------
+    savFileName : str
+        the file name of the spss data file
+    ioUtf8 : bool or int
+        ``False`` (default): text is returned as bytes, as it is stored in
+        the file (i.e., encoded in ``fileEncoding``); ``True``: text is
+        returned as unicode strings; ``UNICODE_BMODE``: text is returned as
+        utf-8 encoded bytes
+    bufferSize : int
+        the size of the read buffer
+
+    Examples
+    --------
+    ``metadata`` maps the name of each metadata getter of
+    :py:class:`savReaderWriter.Header` to its value:
+
+    .. code-block:: python
+
+        header = NativeHeader("someFile.sav")
+        print(header.metadata["valueLabels"])
+    """
+
+    def __init__(self, savFileName, ioUtf8=False, bufferSize=2 ** 16):
+        with open(savFileName, "rb", bufferSize) as f:
+            self.dictionary = SavDictionary(f, readTrailer=False)
+        d = self.dictionary
+        self.byteorder = d.byteorder
+        self.fileEncoding = self._getFileEncoding()
+        self.nCases = d.nCases
+        self.numVars = len(d.varNames)
+
+        # the first dictionary variable (segment) of each variable
+        bySlot = dict((variable.slot, variable) for variable in d.variables)
+        self.variables = [bySlot[segments[0][0]] for segments in d.segments]
+        self.varNames = self._getVarNames()
+        self.varTypes = dict(zip(self.varNames, d.varTypes))
+        self.nameBySlot = {}
+        for varName, segments in zip(self.varNames, d.segments):
+            for slot, used in segments:
+                self.nameBySlot[slot] = varName
+
+        varAttributes, varRoles = self._getVarAttributes()
+        metadata = {
+            "varNames": self.varNames,
+            "varTypes": self.varTypes,
+            "valueLabels": self._getValueLabels(),
+            "varLabels": self._getVarLabels(),
+            "formats": self._getFormats(),
+            "missingValues": self._getMissingValues(),
+            "varSets": self._getVarSets(),
+            "varRoles": varRoles,
+            "varAttributes": varAttributes,
+            "fileAttributes": self._getFileAttributes(),
+            "fileLabel": d.fileLabel.rstrip(b" "),
+            "multRespDefs": self._getMultRespDefs(),
+            "caseWeightVar": self.nameBySlot.get(d.weightIndex - 1, b""),
+            "textInfo": self._getText(10)}
+        (metadata["measureLevels"], metadata["columnWidths"],
+         metadata["alignments"]) = self._getDisplayParameters()
+        if ioUtf8:
+            encode = ioUtf8 == UNICODE_BMODE
+            metadata = self._recode(metadata, encode)
+            self.varNames = metadata["varNames"]
+            self.varTypes = metadata["varTypes"]
+        self.metadata = metadata
+
+    def _getFileEncoding(self):
+        """Returns the Python codec of the character encoding record (record
+        type 7, subtype 20) or, in older files, of the code page in the
+        machine integer info record (subtype 3)"""
+        encoding = self._getText(20)
+        if encoding:
+            return ianaToCodec(encoding)
+        for data in self.dictionary.extensions.get(3, []):
+            codePage = struct.unpack(self.byteorder + "8i", data[:32])[-1]
+            if codePage == 65001:
+                return "utf_8"
+            elif codePage > 3:  # 1-3: EBCDIC, 7-bit ASCII, 8-bit ASCII
+                try:
+                    return codecs.lookup("cp%d" % codePage).name
+                except LookupError:
+                    pass
+        return locale.getpreferredencoding()
+
+    def _getText(self, subtype):
+        """Returns the contents of the (first) extension record of type
+        <subtype>, or an empty byte string"""
+        for data in self.dictionary.extensions.get(subtype, []):
+            return data.rstrip(b"\x00")
+        return b""
+
+    def _recode(self, item, encode):
+        """Returns <item> with all its byte strings (including dictionary
+        keys and list items) decoded from the file encoding, and, if
+        <encode> is True, encoded to utf-8"""
+        if isinstance(item, bytes):
+            item = item.decode(self.fileEncoding, "replace")
+            return item.encode("utf-8") if encode else item
+        elif isinstance(item, list):
+            return [self._recode(value, encode) for value in item]
+        elif isinstance(item, dict):
+            return dict([(self._recode(k, encode), self._recode(v, encode))
+                         for k, v in item.items()])
+        return item
+
+    def _unpackFrom(self, fmt, data, offset):
+        """Helper function that returns the values of struct format <fmt>
+        at <offset> of <data>, and the offset after them"""
+        fmt = self.byteorder + fmt
+        return (struct.unpack_from(fmt, data, offset),
+                offset + struct.calcsize(fmt))
+
+    def _unpackString(self, data, offset):
+        """Helper function that returns a length-prefixed string at <offset>
+        of <data>, and the offset after it"""
+        (length,), offset = self._unpackFrom("i", data, offset)
+        return data[offset:offset + length], offset + length
+
+    # ------------------------------------------------------------------
+    # variables
+    # ------------------------------------------------------------------
+
+    def _getVarNames(self):
+        """Returns the (long) variable names (record type 7, subtype 13).
+        Files without long names have upper case short names, which are
+        returned in lower case, as the I/O module does"""
+        shortNames = self.dictionary.varNames
+        if 13 not in self.dictionary.extensions:
+            return [shortName.lower() for shortName in shortNames]
+        longNames = {}
+        for item in self._getText(13).split(b"\t"):
+            if b"=" in item:
+                shortName, longName = item.split(b"=", 1)
+                longNames[shortName] = longName
+        return [longNames.get(shortName, shortName)
+                for shortName in shortNames]
+
+    def _getVarLabels(self):
+        return dict([(varName, variable.label or b"") for varName, variable
+                     in zip(self.varNames, self.variables)])
+
+    def _getFormats(self):
+        """Returns the print formats, e.g. b'F8.2', b'DOLLAR8' or b'A100'"""
+        formats = {}
+        for varName, variable in zip(self.varNames, self.variables):
+            printFormat = variable.printFormat
+            formatType = (printFormat >> 16) & 0xff
+            width, decimals = (printFormat >> 8) & 0xff, printFormat & 0xff
+            varType = self.varTypes[varName]
+            if varType > 255:  # very long string: the format of a segment
+                width = varType
+            format_ = allFormats.get(formatType, (b"SPSS_FMT_F",))[0]
+            format_ = format_.split(b"_")[-1] + bytez(str(width))
+            if varType == 0 and decimals:
+                format_ += b"." + bytez(str(decimals))
+            formats[varName] = format_
+        return formats
+
+    def _getValueLabels(self):
+        """Returns the value labels of numeric and short string variables
+        (record types 3 and 4) and of long string variables (record type 7,
+        subtype 21)"""
+        valueLabels = {}
+        unpackDouble = struct.Struct(self.byteorder + "d").unpack
+        for labels, indices in self.dictionary.valueLabelRecords:
+            for index in indices:
+                varName = self.nameBySlot[index - 1]
+                varType = self.varTypes[varName]
+                if varType == 0:
+                    values = [unpackDouble(value)[0]
+                              for value, label in labels]
+                else:
+                    values = [value[:varType] for value, label in labels]
+                valueLabels.setdefault(varName, {}).update(
+                    zip(values, [label for value, label in labels]))
+        for data in self.dictionary.extensions.get(21, []):
+            offset = 0
+            while offset < len(data):
+                varName, offset = self._unpackString(data, offset)
+                (width, nLabels), offset = self._unpackFrom("ii", data, offset)
+                labels = valueLabels.setdefault(varName, {})
+                for i in range(nLabels):
+                    value, offset = self._unpackString(data, offset)
+                    labels[value], offset = self._unpackString(data, offset)
+        return valueLabels
+
+    def _getMissingValues(self):
+        """Returns the user missing values of numeric and short string
+        variables (record type 2) and of long string variables (record type
+        7, subtype 22)"""
+        missingValues = {}
+        for varName, variable in zip(self.varNames, self.variables):
+            nMissing, raw = variable.missingValues
+            varType = self.varTypes[varName]
+            if varType == 0:
+                values = list(struct.unpack(self.byteorder + "%dd" %
+                                            abs(nMissing), raw))
+            else:
+                values = [raw[i:i + 8][:varType]
+                          for i in range(0, len(raw), 8)]
+            if nMissing < 0:  # range, or range and a discrete value
+                missing = {u"lower": values[0], u"upper": values[1]}
+                if nMissing == -3:
+                    missing[u"value"] = values[2]
+            else:
+                missing = {u"values": values} if values else {}
+            missingValues[varName] = missing
+        for data in self.dictionary.extensions.get(22, []):
+            offset = 0
+            while offset < len(data):
+                varName, offset = self._unpackString(data, offset)
+                nMissing = ord(data[offset:offset + 1])
+                (length,), offset = self._unpackFrom("i", data, offset + 1)
+                values = [data[offset + i * length:offset + (i + 1) * length]
+                          for i in range(nMissing)]
+                offset += nMissing * length
+                missingValues[varName] = {u"values": values}
+        return missingValues
+
+    def _getDisplayParameters(self):
+        """Returns the measurement levels, column widths and alignments
+        (record type 7, subtype 11). Older files have one set of display
+        parameters per segment of a very long string, and some have no
+        column widths"""
+        d = self.dictionary
+        params = []
+        for data in d.extensions.get(11, []):
+            params = struct.unpack(self.byteorder + "%di" % (len(data) // 4),
+                                   data)
+        rows = []
+        for n in (len(self.varNames), len(d.variables)):
+            if n and len(params) in (2 * n, 3 * n):
+                size = len(params) // n
+                rows = [params[i:i + size]
+                        for i in range(0, len(params), size)]
+                if n != len(self.varNames):  # per segment
+                    positions = dict((variable.slot, i) for i, variable
+                                     in enumerate(d.variables))
+                    rows = [rows[positions[variable.slot]]
+                            for variable in self.variables]
+                break
+        levels, widths, aligns = {}, {}, {}
+        for i, varName in enumerate(self.varNames):
+            if rows:
+                row = rows[i]
+                level, width, alignment = row if len(row) == 3 else \
+                                          (row[0], 0, row[1])
+            else:
+                level, width = 0, 0
+                alignment = 1 if self.varTypes[varName] == 0 else 0
+            levels[varName] = measureLevels.get(level)
+            widths[varName] = width
+            aligns[varName] = alignments.get(alignment)
+        return levels, widths, aligns
+
+    def _getVarSets(self):
+        """Returns the variable sets (record type 7, subtype 5)"""
+        varSets = {}
+        for line in self._getText(5).split(b"\n"):
+            if b"=" in line:
+                setName, varNames = line.split(b"=", 1)
+                varSets[setName.strip()] = varNames.split()
+        return varSets
+
+    # ------------------------------------------------------------------
+    # attributes
+    # ------------------------------------------------------------------
+
+    def _parseAttributes(self, text, offset=0):
+        """Parses attributes of the form name('value 1'\\n'value 2'\\n)
+        that start at <offset> of <text>, up to a slash or the end of
+        <text>. Returns a dict of the form {name: value} or, for attribute
+        arrays, {name[1]: value 1, name[2]: value 2}, and the offset after
+        the last attribute. Empty attributes and the attributes that the
+        I/O module reserves for itself (names starting with '$@') are
+        returned separately, as a dict of the form {name: [values]}"""
+        attributes, reserved = {}, {}
+        while offset < len(text) and text[offset:offset + 1] != b"/":
+            parenthesis = text.index(b"(", offset)
+            name, values = text[offset:parenthesis], []
+            offset = parenthesis + 1
+            while text[offset:offset + 1] == b"'":
+                end = text.index(b"'\n", offset + 1)
+                values.append(text[offset + 1:end])
+                offset = end + 2
+            offset += 1  # closing parenthesis
+            if name.startswith(b"$@") or not any(values):
+                reserved[name] = values
+            elif len(values) == 1:
+                attributes[name] = values[0]
+            else:
+                digits = len(str(len(values)))
+                for i, value in enumerate(values, 1):
+                    index = bytez(str(i).zfill(digits))
+                    attributes[name + b"[" + index + b"]"] = value
+        return attributes, reserved, offset
+
+    def _getVarAttributes(self):
+        """Returns the variable attributes and roles (record type 7,
+        subtype 18). Roles are stored as the '$@Role' attribute"""
+        text = self._getText(18)
+        varAttributes, varRoles, offset = {}, {}, 0
+        while offset < len(text):
+            colon = text.index(b":", offset)
+            varName = text[offset:colon]
+            attributes, reserved, offset = self._parseAttributes(text,
+                                                                 colon + 1)
+            offset += 1  # slash
+            if attributes:
+                varAttributes[varName] = attributes
+            role = reserved.get(b"$@Role", [b"0"])[0]
+            varRoles[varName] = roles.get(int(role or 0), b"input")
+        for varName in self.varNames:
+            varRoles.setdefault(varName, b"input")
+        return varAttributes, varRoles
+
+    def _getFileAttributes(self):
+        """Returns the data file attributes (record type 7, subtype 17)"""
+        return self._parseAttributes(self._getText(17))[0]
+
+    # ------------------------------------------------------------------
+    # multiple response sets
+    # ------------------------------------------------------------------
+
+    def _getMultRespDefs(self):
+        """Returns the multiple response sets (record type 7, subtypes 7 and
+        19) in the form of :py:meth:`savReaderWriter.Header.multRespDefs`.
+        The definitions refer to the short variable names, which are
+        replaced by the long names"""
+        longNames = dict(zip([name.lower() for name in
+                              self.dictionary.varNames], self.varNames))
+        multRespDefs = {}
+        for subtype in (7, 19):
+            for line in self._getText(subtype).split(b"\n"):
+                if b"=" not in line:
+                    continue
+                setName, definition = line.split(b"=", 1)
+                setType, rest = definition[:1], definition[1:]
+                multRespDef = {b"setType": setType}
+                if setType == b"E":
+                    flags, rest = rest.lstrip(b" ").split(b" ", 1)
+                    multRespDef[b"firstVarIsLabel"] = flags == b"11"
+                if setType in (b"D", b"E"):
+                    countedValue, rest = self._splitCounted(rest)
+                    multRespDef[b"countedValue"] = countedValue
+                multRespDef[b"label"], rest = self._splitCounted(rest)
+                multRespDef[b"varNames"] = [
+                    name if name in self.varTypes else
+                    longNames.get(name.lower(), name) for name in rest.split()]
+                multRespDefs[setName.lstrip(b"$")] = multRespDef
+        return multRespDefs
+
+    def _splitCounted(self, text):
+        """Helper function for _getMultRespDefs that splits <text> of the
+        form '<length> <string of that length><rest>' into the string and
+        the rest"""
+        length, rest = text.lstrip(b" ").split(b" ", 1)
+        length = int(length)
+        return rest[:length], rest[length:]
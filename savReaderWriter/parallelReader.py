@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Read an SPSS data file with several processes, one row range per task"""
+
+import multiprocessing
+
+from savReader import SavReader
+
+
+def _readRange(task):
+    """Helper function for parallel_read that runs in a worker process. It
+    opens its own reader, seeks to the start of its row range, and returns
+    a list of func(batch) for each batch in the range"""
+    savFileName, start, stop, func, chunksize, kwargs = task
+    reader = SavReader(savFileName, **kwargs)
+    try:
+        batches = reader._chunks(start, stop, chunksize,
+                                 accept=reader.accept)
+        if func is None:
+            return list(batches)
+        return [func(batch) for batch in batches]
+    finally:
+        reader.close()
+
+def _splitRange(nCases, nTasks, chunksize):
+    """Helper function that splits [0, nCases) into at most <nTasks> row
+    ranges, each of which is a multiple of <chunksize> (except the last)"""
+    chunksPerTask = max(1, -(-nCases // (chunksize * nTasks)))
+    taskSize = chunksPerTask * chunksize
+    return [(start, min(start + taskSize, nCases)) for start
+            in range(0, nCases, taskSize)]
+
+def parallel_read(savFileName, n_workers=None, func=None, chunksize=10000,
+                  **kwargs):
+    """Reads <savFileName> with <n_workers> processes. The rows are split
+    into ranges; each worker process opens the file, seeks to the start of
+    its range and reads it in batches of <chunksize> records. The function
+    yields func(batch) for each batch (or the batch itself if <func> is
+    ``None``), in the order of the rows in the file.
+
+    Parameters
+    ----------
+    savFileName : str
+        the file name of the spss data file
+    n_workers : int
+        the number of worker processes (default: the number of CPUs)
+    func : callable
+        function that is called in the worker processes with each batch (a
+        list of records) as its argument. It must be picklable, i.e. defined
+        at the top level of a module, and so must its return value
+    chunksize : int
+        the (maximum) number of records in a batch
+    kwargs :
+        other arguments that are passed to
+        :py:class:`savReaderWriter.SavReader`, such as ``selectVars``,
+        ``rawMode``, ``engine`` or ``where`` (a callable <where> must be
+        picklable)
+
+    Examples
+    --------
+    .. code-block:: python
+
+        def total_salary(records):
+            return sum(record[5] for record in records)
+
+        if __name__ == "__main__":  # required on Windows
+            totals = parallel_read("someFile.sav", 8, total_salary)
+            print(sum(totals))
+    """
+    for name in ("returnHeader", "chunksize", "idVar"):
+        if name in kwargs:
+            raise ValueError("%r cannot be used with parallel_read" % name)
+    n_workers = n_workers or multiprocessing.cpu_count()
+    reader = SavReader(savFileName, **kwargs)
+    try:
+        reader._checkChunksize(chunksize)
+        nCases = len(reader)
+    finally:
+        reader.close()
+    ranges = _splitRange(nCases, 4 * n_workers, chunksize)  # load balancing
+    tasks = [(savFileName, start, stop, func, chunksize, kwargs)
+             for start, stop in ranges]
+    return _imap(tasks, min(n_workers, len(tasks) or 1))
+
+def _imap(tasks, n_workers):
+    """Helper function for parallel_read that yields the results of the
+    tasks in order"""
+    pool = multiprocessing.Pool(n_workers)
+    try:
+        for results in pool.imap(_readRange, tasks):
+            for result in results:
+                yield result
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Convert SPSS data files into Parquet files (requires the pyarrow library).
+The data are streamed, one row group at a time, so memory use does not
+depend on the size of the input file. The SPSS dictionary is stored as JSON
+in the key-value metadata of the Parquet file, under ``spss.dictionary``.
+
+Usage from the command line::
+
+    sav2parquet someFile.sav [someFile.parquet] [--row-group-size 100000]
+                [--value-labels] [--compression snappy] [--engine native]
+"""
+
+import os
+import json
+import argparse
+
+from savReaderWriter import SavReader
+from arrowExport import ArrowConverter, importPyarrow
+from py3k import *
+
+METADATA_KEY = b"spss.dictionary"
+
+
+def _jsonable(obj, encoding):
+    """Helper function that converts bytes into unicode and dictionary keys
+    into strings, so that the SPSS dictionary can be serialized as JSON"""
+    if isinstance(obj, bytes):
+        return obj.decode(encoding, "replace")
+    elif isinstance(obj, dict):
+        return dict((_jsonable(key, encoding) if isinstance(key, (bytes,
+                     unicode)) else repr(key), _jsonable(value, encoding))
+                    for key, value in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        return [_jsonable(item, encoding) for item in obj]
+    return obj
+
+def getDictionary(reader):
+    """Returns the variable labels, value labels, formats and missing values
+    of the selected variables of <reader> as a JSON-serializable dict"""
+    selected = set(reader.header)
+    encoding = "utf-8" if reader.ioUtf8_ else reader.fileEncoding
+    dictionary = {}
+    for name, items in (("varLabels", reader.varLabels),
+                        ("valueLabels", reader.valueLabels),
+                        ("formats", reader.formats),
+                        ("missingValues", reader.missingValues)):
+        items = dict((varName, value) for varName, value in items.items()
+                     if varName in selected)
+        dictionary[name] = _jsonable(items, encoding)
+    return dictionary
+
+def sav2parquet(savFileName, parquetFileName, rowGroupSize=100000,
+                valueLabels=False, compression="snappy", **kwargs):
+    """Converts <savFileName> into <parquetFileName>, one row group of (at
+    most) <rowGroupSize> rows at a time.
+
+    Parameters
+    ----------
+    savFileName : str
+        the file name of the spss data file
+    parquetFileName : str
+        the file name of the Parquet file
+    rowGroupSize : int
+        the (maximum) number of rows in a Parquet row group. Memory use is
+        proportional to this number
+    valueLabels : bool
+        indicates whether variables with value labels should become
+        dictionary-encoded columns of labels (see
+        :py:class:`savReaderWriter.arrowExport.ArrowConverter`)
+    compression : str
+        the Parquet compression codec (e.g. ``"snappy"``, ``"zstd"``,
+        ``"none"``)
+    kwargs :
+        other arguments that are passed to
+        :py:class:`savReaderWriter.SavReader`, such as ``selectVars``,
+        ``ioUtf8`` or ``engine``
+
+    Examples
+    --------
+    .. code-block:: python
+
+        sav2parquet("someFile.sav", "someFile.parquet", engine="native")
+        metadata = pyarrow.parquet.read_schema("someFile.parquet").metadata
+        dictionary = json.loads(metadata[b"spss.dictionary"])
+    """
+    pa = importPyarrow()
+    import pyarrow.parquet as pq
+    reader = SavReader(savFileName, **kwargs)
+    try:
+        converter = ArrowConverter(reader, valueLabels)
+        metadata = {METADATA_KEY: json.dumps(getDictionary(reader))}
+        schema = converter.schema.with_metadata(metadata)
+        writer = pq.ParquetWriter(parquetFileName, schema,
+                                  compression=compression)
+        try:
+            for batch in reader._recordBatches(converter, rowGroupSize):
+                writer.write_table(pa.Table.from_batches([batch], schema))
+        finally:
+            writer.close()
+    finally:
+        reader.close()
+
+def main(argv=None):
+    """Entry point of the ``sav2parquet`` command"""
+    parser = argparse.ArgumentParser(prog="sav2parquet",
+        description="Convert an SPSS data file (.sav, .zsav) into a "
+                    "Parquet file")
+    parser.add_argument("savFileName", help="the SPSS data file")
+    parser.add_argument("parquetFileName", nargs="?", help="the Parquet "
+                        "file (default: the SPSS file name, with the "
+                        ".parquet extension)")
+    parser.add_argument("--row-group-size", type=int, default=100000,
+                        help="the number of rows per row group "
+                        "(default: %(default)s)")
+    parser.add_argument("--value-labels", action="store_true",
+                        help="store value labels instead of values")
+    parser.add_argument("--compression", default="snappy",
+                        help="compression codec (default: %(default)s)")
+    parser.add_argument("--engine", choices=["spssio", "native"],
+                        default="spssio", help="how to read the case data "
+                        "(default: %(default)s)")
+    args = parser.parse_args(argv)
+    parquetFileName = args.parquetFileName or \
+        os.path.splitext(args.savFileName)[0] + ".parquet"
+    sav2parquet(args.savFileName, parquetFileName, args.row_group_size,
+                args.value_labels, args.compression, engine=args.engine)
+
+if __name__ == "__main__":
+    main()
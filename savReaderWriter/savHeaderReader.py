@@ -4,9 +4,14 @@
 import os
 import collections
 import locale
+import hashlib
+import marshal
+import tempfile
+import warnings
 
 from savReaderWriter import *
 from header import *
+from nativeHeader import NativeHeader
 
 @implements_to_string
 class SavHeaderReader(Header):
@@ -28,6 +33,31 @@ class SavHeaderReader(Header):
         indicates the locale of the I/O module. Cf. `SET LOCALE`. 
         (default = None, which corresponds to 
         ``locale.setlocale(locale.LC_CTYPE)``)
+    cacheDir : str, optional
+        directory in which ``dataDictionary`` stores the data dictionary.
+        A later reader of the same file finds it there before the file is
+        opened, so it neither loads the I/O module nor sets the locale; as
+        with the native engine, only the items of ``dataDictionary``,
+        ``textInfo``, ``numberofCases``, ``numberofVariables`` and
+        ``fileEncoding`` are then available. The cache key consists of the
+        absolute path, the size and the modification time of the file, the
+        engine, ``ioUtf8`` and the version: the savReaderWriter version
+        and, with the spssio engine, the names, sizes and modification
+        times of the I/O library files (so an upgrade of either invalidates
+        the cache without the I/O module being loaded). The directory is
+        created if needed. The cache files hold plain data (written with
+        ``marshal``, never ``pickle``), and files that are not owned by the
+        current user are ignored. Default: no caching
+    engine : str
+        indicates how the dictionary is read. Valid values are ``"spssio"``
+        (default; the I/O module) and ``"native"`` (a pure Python decoder,
+        see :py:class:`savReaderWriter.nativeHeader.NativeHeader`). The
+        native engine does not load the I/O module and does not set the
+        locale, which makes it much faster to open many files. It decodes
+        the items of ``dataDictionary`` and ``textInfo``; in codepage mode,
+        text is returned as it is stored in the file, i.e. encoded in
+        ``fileEncoding``. Other metadata (e.g. ``dateVariables``) and all
+        setters require the I/O module.
 
     Examples
     --------
@@ -40,13 +70,35 @@ class SavHeaderReader(Header):
             print(str(header))
             report = header.reportSpssDataDictionary(header.all(False))
 
+    Metadata only, for many files::
+
+        for savFileName in savFileNames:
+            with SavHeaderReader(savFileName, engine="native") as header:
+                catalog[savFileName] = header.dataDictionary()
+
    See also
    --------
    savReaderWriter.Header : for more options to retrieve individual 
        metadata items"""
 
-    def __init__(self, savFileName, ioUtf8=False, ioLocale=None):
+    def __init__(self, savFileName, ioUtf8=False, ioLocale=None,
+                 cacheDir=None, engine="spssio"):
         """ Constructor. Initializes all vars that can be recycled """
+        if engine not in ("spssio", "native"):
+            raise ValueError("engine must be 'spssio' or 'native', not %r"
+                             % engine)
+        self.engine = engine
+        self.cacheDir = cacheDir
+        self.nativeHeader = None
+        self.cacheHit = False
+        if cacheDir is not None:
+            self.cacheFileName, self.cacheKey = \
+                self._getCacheKey(savFileName, ioUtf8)
+            if self._initCached(savFileName, ioUtf8):
+                return
+        if engine == "native":
+            self._initNative(savFileName, ioUtf8)
+            return
         super(SavHeaderReader, self).__init__(savFileName, b"rb", None,
                                               ioUtf8, ioLocale)
         self.fh = self.openSavFile()
@@ -54,6 +106,75 @@ class SavHeaderReader(Header):
         self.numVars = self.numberofVariables
         self.nCases = self.numberofCases
 
+    def _initNative(self, savFileName, ioUtf8):
+        """Helper function for the constructor that reads the dictionary
+        with the native engine. The metadata getters return the decoded
+        metadata from the ``metadata_`` cache, so the I/O module is never
+        called"""
+        self.savFileName = savFileName
+        self.ioUtf8_ = ioUtf8
+        self.nativeHeader = NativeHeader(savFileName, ioUtf8)
+        self.metadata_ = self.nativeHeader.metadata
+        self.fh = None
+        self.varNames = self.nativeHeader.varNames
+        self.varTypes = self.nativeHeader.varTypes
+        self.vNames = dict(zip(self.varNames, self.encode(self.varNames)))
+        self.numVars = self.nativeHeader.numVars
+        self.nCases = self.nativeHeader.nCases
+
+    def _initCached(self, savFileName, ioUtf8):
+        """Helper function for the constructor that initializes the reader
+        from the cached data dictionary, if there is one. The metadata
+        getters return the cached metadata from the ``metadata_`` cache,
+        so the I/O module is never loaded. Returns True on a cache hit"""
+        cached = self._readCache(self.cacheFileName, self.cacheKey)
+        if cached is None:
+            return False
+        metadata, info = cached
+        self.cacheHit = True
+        self.savFileName = savFileName
+        self.ioUtf8_ = ioUtf8
+        self.metadata_ = dict(metadata, textInfo=info["textInfo"])
+        self.fh = None
+        self.varNames = metadata["varNames"]
+        self.varTypes = metadata["varTypes"]
+        self.vNames = dict(zip(self.varNames, self.encode(self.varNames)))
+        self.numVars = info["numberofVariables"]
+        self.nCases = info["numberofCases"]
+        self.fileEncoding_ = info["fileEncoding"]
+        return True
+
+    @property
+    def numberofCases(self):
+        """This function reports the number of cases present in a data file
+        (see :py:attr:`savReaderWriter.Header.numberofCases`)"""
+        if self.nativeHeader is not None:
+            return self.nativeHeader.nCases
+        elif self.cacheHit:
+            return self.nCases
+        return super(SavHeaderReader, self).numberofCases
+
+    @property
+    def numberofVariables(self):
+        """This function returns the number of variables (columns) in the
+        spss dataset"""
+        if self.nativeHeader is not None:
+            return self.nativeHeader.numVars
+        elif self.cacheHit:
+            return self.numVars
+        return super(SavHeaderReader, self).numberofVariables
+
+    @property
+    def fileEncoding(self):
+        """This function obtains the encoding applicable to a file, as a
+        Python codec name (see
+        :py:attr:`savReaderWriter.Generic.fileEncoding`)"""
+        if self.nativeHeader is not None:
+            return self.nativeHeader.fileEncoding
+        elif self.cacheHit:
+            return self.fileEncoding_
+        return super(SavHeaderReader, self).fileEncoding
+
     def __str__(self):
         """ This function returns a report of the SPSS data dictionary
         (i.e., the header), in the encoding of the spss file"""
@@ -88,6 +209,8 @@ class SavHeaderReader(Header):
 
     def close(self):
         """This function closes the spss data file and does some cleaning."""
+        if self.nativeHeader is not None or self.cacheHit:
+            return  # the file was closed, or never opened
         if not segfaults:
             self.closeSavFile(self.fh, mode=b"rb")
         try:
@@ -100,7 +223,9 @@ class SavHeaderReader(Header):
         a Python dictionary based on the Spss dictionary of the given
         Spss file. This is equivalent to the Spss command 'DISPLAY
         DICTIONARY'. If asNamedtuple=True, this function returns a namedtuple,
-        so one can retrieve metadata like e.g. 'metadata.valueLabels'"""
+        so one can retrieve metadata like e.g. 'metadata.valueLabels'.
+        If the reader was created with a ``cacheDir``, the data dictionary
+        comes from the cache, or is stored in it."""
         items = ["varNames", "varTypes", "valueLabels", "varLabels",
                  "formats", "missingValues", "measureLevels",
                  "columnWidths", "alignments", "varSets", "varRoles",
@@ -109,11 +234,72 @@ class SavHeaderReader(Header):
         if self.ioUtf8:
             items = map(unicode, items)
         metadata = dict([(item, getattr(self, item)) for item in items])
+        if self.cacheDir is not None and not self.cacheHit:
+            info = dict(textInfo=self.textInfo,
+                        numberofCases=self.numberofCases,
+                        numberofVariables=self.numberofVariables,
+                        fileEncoding=self.fileEncoding)
+            self._writeCache(self.cacheFileName, self.cacheKey,
+                             (metadata, info))
         if asNamedtuple:
             Meta = collections.namedtuple("Meta", " ".join(metadata.keys()))
             return Meta(*metadata.values())
         return metadata
 
+    def _getCacheKey(self, savFileName, ioUtf8):
+        """Helper function for the constructor that returns the name of the
+        cache file of the data dictionary and the key that identifies the
+        version of the .sav file it belongs to. The key only needs a stat
+        of the file, so it can be looked up before the file is opened"""
+        from savReaderWriter import __version__
+        savFileName = os.path.abspath(os.path.expanduser(savFileName))
+        st = os.stat(savFileName)
+        version = (__version__,)
+        if self.engine == "spssio":
+            # the I/O libraries are stat-ed, not loaded
+            for lib in self._getLibFileNames(self._getLibFolder()):
+                libStat = os.stat(lib)
+                version += ((os.path.basename(lib), libStat.st_size,
+                             libStat.st_mtime),)
+        key = (savFileName, st.st_size, st.st_mtime, self.engine, ioUtf8,
+               version)
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.cacheDir, digest + ".marshal"), key
+
+    def _readCache(self, cacheFileName, key):
+        """Helper function that returns the cached data dictionary, or None
+        if it is missing, stale or corrupt, or if the cache file is not
+        owned by the current user (e.g. in a shared directory)"""
+        try:
+            with open(cacheFileName, "rb") as f:
+                if hasattr(os, "getuid") and \
+                   os.fstat(f.fileno()).st_uid != os.getuid():
+                    return None
+                cachedKey, cached = marshal.load(f)
+        except Exception:
+            return None
+        return cached if cachedKey == key else None
+
+    def _writeCache(self, cacheFileName, key, cached):
+        """Helper function for dataDictionary that stores the data
+        dictionary in the cache. The file is written under a temporary name
+        and then renamed, so readers never see a partially written file"""
+        try:
+            data = marshal.dumps((key, cached))
+            if not os.path.isdir(self.cacheDir):
+                os.makedirs(self.cacheDir)
+            fd, tempFileName = tempfile.mkstemp(dir=self.cacheDir)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            try:
+                os.rename(tempFileName, cacheFileName)
+            except OSError:  # Windows: cacheFileName exists
+                os.remove(cacheFileName)
+                os.rename(tempFileName, cacheFileName)
+        except (IOError, OSError, ValueError) as e:
+            warnings.warn("Could not write data dictionary cache %r (%s)" %
+                          (cacheFileName, e), stacklevel=3)
+
     def all(self, asNamedtuple=True):
         """Returns all the metadata as a named tuple (cf. SavReader.all)
         Exactly the same as dataDictionary, but with different (nicer?)
@@ -3,15 +3,25 @@
 
 from ctypes import *
 import os
+import sys
 import operator
 import locale
 import datetime
 import collections
 import functools
+import random
+import threading
+import warnings
+try:
+    import queue
+except ImportError:  # Python 2
+    import Queue as queue
 
 from savReaderWriter import *
 from header import *
 from helpers import *
+from nativeEngine import NativeEngine
+from keyIndex import KeyIndex, HashIndex
 
 @rich_comparison
 @implements_to_string
@@ -33,6 +43,17 @@ class SavReader(Header):
     idVar : str
         indicates which variable in the file should be used for use as id
         variable for the 'get' method
+    idIndex : str
+        indicates how ``get``, ``get_many`` and ``__contains__`` look up
+        <idVar> values. If ``None`` (default), an in-memory sorted list of
+        all the values is built when ``get`` is first called. If ``"hash"``,
+        an in-memory hash index
+        (:py:class:`savReaderWriter.keyIndex.HashIndex`) is built from the
+        idVar column only. If ``"disk"``, a persistent sorted index
+        (:py:class:`savReaderWriter.keyIndex.KeyIndex`) is memory-mapped
+        from ``<savFileName>.keyidx``. It is built from the idVar column
+        only, and only if it does not exist or if the .sav file changed, so
+        later instances can do lookups without any warm-up.
     verbose : bool
         indicates whether information about the spss data file (e.g., number
         of cases, variable names, file size) should be printed on the screen.
@@ -59,6 +80,43 @@ class SavReader(Header):
         ``locale.setlocale(locale.LC_CTYPE)``, for example: 
         ``en_US.UTF-8`` (Unix) or ``english`` (Windows).
         See also under :py:meth:`savReaderWriter.Generic.ioLocale`. 
+    chunksize : int
+        if specified, iterating over the reader yields lists of (at most)
+        <chunksize> records instead of individual records. This is much
+        faster than record-by-record iteration for large files.
+        See also under :py:meth:`savReaderWriter.SavReader.iterchunks`.
+    where : str or callable
+        if specified, iterating over the reader only yields the records for
+        which <where> is true. It is tested on the raw values of a case,
+        before any formatting, so the rejected cases cost hardly anything.
+        <where> is either a Python expression in terms of variable names,
+        e.g. ``"salary > 50000 and jobcat == 3"``, of which only the
+        variables that are used are unpacked, or a function that is called
+        with a tuple of the raw values of all variables (in the order of
+        ``varNames``). Raw values are floats (dates: seconds since
+        1582-10-14, $sysmis: the lowest float) and bytes without trailing
+        blanks (in the expression). Only iteration (``__iter__``, ``all``,
+        ``iterchunks``, ``iter_record_batches``, ``to_arrow``) is filtered:
+        ``len``, indexing and ``get`` refer to all the cases in the file.
+    engine : str
+        indicates how the case data are read. Valid values are ``"spssio"``
+        (default; the I/O module) and ``"native"`` (a pure Python decoder,
+        see :py:class:`savReaderWriter.nativeEngine.NativeEngine`). The
+        dictionary is always read with the I/O module.
+    caseIndex : str
+        only with ``engine="native"``: indicates whether a row-offset index
+        is used to seek cases in compressed files. With an index, random
+        access (``__getitem__``, ``get``, slices with a step) decodes at
+        most 1000 cases per seek instead of rescanning the file from the
+        first case. Valid values are ``None`` (default), ``"memory"`` and
+        ``"disk"`` (the index is saved next to the .sav file and re-used).
+        See also :py:class:`savReaderWriter.nativeEngine.CaseIndex`.
+    prefetch : int
+        only with ``engine="spssio"``: if specified, iteration reads the
+        cases on a separate thread, up to <prefetch> blocks of 1000 cases
+        (or of <chunksize> cases) ahead, while the calling thread unpacks
+        and formats them. This overlaps file I/O (e.g. on a network drive)
+        with formatting.
 
     Examples
     --------
@@ -70,12 +128,54 @@ class SavReader(Header):
             header = next(reader)
             for line in reader:
                 process(line)
+
+    Reading only some of the records:
+
+    .. code-block:: python
+
+        with SavReader('somefile.sav', where='salary > 50000') as reader:
+            for line in reader:
+                process(line)
+
+    Reading a file in chunks of 1000 records:
+
+    .. code-block:: python
+
+        with SavReader('somefile.sav', chunksize=1000) as reader:
+            for records in reader:
+                bulk_load(records)
     """
 
     def __init__(self, savFileName, returnHeader=False, recodeSysmisTo=None,
                  verbose=False, selectVars=None, idVar=None, rawMode=False,
-                 ioUtf8=False, ioLocale=None):
+                 ioUtf8=False, ioLocale=None, chunksize=None,
+                 engine="spssio", caseIndex=None, idIndex=None, where=None,
+                 prefetch=None):
         """ Constructor. Initializes all vars that can be recycled """
+        if chunksize is not None:
+            self._checkChunksize(chunksize)
+        if engine not in ("spssio", "native"):
+            raise ValueError("engine must be 'spssio' or 'native', not %r"
+                             % engine)
+        if caseIndex is not None and engine != "native":
+            raise ValueError("caseIndex requires engine='native'")
+        if idIndex not in (None, "hash", "disk"):
+            raise ValueError("idIndex must be None, 'hash' or 'disk', not %r"
+                             % idIndex)
+        if prefetch is not None:
+            if engine != "spssio":
+                raise ValueError("prefetch requires engine='spssio'")
+            if not isinstance(prefetch, int) or prefetch < 1:
+                raise ValueError("prefetch must be a positive integer, "
+                                 "not %r" % prefetch)
+        if not (where is None or callable(where) or
+                isinstance(where, basestring)):
+            raise ValueError("where must be a string or a callable, not %r"
+                             % where)
+        self.nativeEngine = None
+        if engine == "native":
+            self.nativeEngine = NativeEngine(savFileName,
+                                             caseIndex=caseIndex)
         super(SavReader, self).__init__(savFileName, b"rb", None,
                                         ioUtf8, ioLocale)
         self.savFileName = savFileName
@@ -84,7 +184,15 @@ class SavReader(Header):
         self.verbose = verbose
         self.selectVars = selectVars
         self.idVar = idVar
+        self.idIndex = idIndex
+        self.keyIndex = None
+        self._hashIndex = None  # used by get_many if idIndex is None
         self.rawMode = rawMode
+        self.chunksize = chunksize
+        self.engine = engine
+        self.where = where
+        self.prefetch = prefetch
+        self.producer = None
 
         self.header = self.getHeader(self.selectVars)
         self.bareformats, self.varWids = self._splitformats()
@@ -92,14 +200,25 @@ class SavReader(Header):
 
         self.ioUtf8_ = ioUtf8
         self.sysmis_ = self.sysmis
+        self.conversionPlan = self._getConversionPlan()
         self.numVars = self.numberofVariables
         self.nCases = self.numberofCases
 
         self.myStruct = self.getStruct(self.varTypes, self.varNames)
         self.unpack_from = self.myStruct.unpack_from
+        if self.selectVars is not None:
+            # projection: unselected variables are never unpacked
+            projection = self.getStruct(self.varTypes, self.varNames,
+                                        selectVars=self.header)
+            self.unpack_from = projection.unpack_from
+        self.accept = self._getPredicate(where)
         self.seekNextCase = self.spssio.spssSeekNextCase
         self.caseBuffer = self.getCaseBuffer()
 
+        if self.nativeEngine is not None:
+            self.wholeCaseIn = self.nativeEngine.wholeCaseIn
+            self.seekNextCase = self.nativeEngine.seekNextCase
+
     def __enter__(self):
         """ This function opens the spss data file (context manager)."""
         if self.verbose and self.ioUtf8_:
@@ -122,6 +241,13 @@ class SavReader(Header):
 
     def close(self):
         """This function closes the spss data file and does some cleaning."""
+        if self.producer is not None:
+            self._stopProducer()
+        if self.nativeEngine is not None:
+            self.nativeEngine.close()
+        if self.keyIndex is not None:
+            self.keyIndex.close()
+        clearCaches(self)
         if not segfaults:
             self.closeSavFile(self.fh, mode=b"rb")
         del self.spssio
@@ -130,6 +256,17 @@ class SavReader(Header):
         except:
             locale.setlocale(locale.LC_ALL, "")
 
+    def cacheInfo(self):
+        """This function returns the hit, miss and eviction counters of the
+        caches of memoized methods (e.g. ``spss2strDate``), as a dict of
+        {method name: CacheInfo}. The caches belong to this reader, and are
+        released by ``close``. For example::
+
+            with SavReader("someFile.sav") as reader:
+                records = reader.all()
+                print(reader.cacheInfo())"""
+        return cacheInfo(self)
+
     def __len__(self):
         """ This function reports the number of cases (rows) in the spss data
         file. For example: len(SavReader(savFileName))"""
@@ -190,90 +327,391 @@ class SavReader(Header):
         items = [hasDates, hasNfmt, hasRecodeSysmis, self.ioUtf8_]
         return False if any(items) else True
 
-    # TODO: turn this into a decorator
+    def _getConversionPlan(self):
+        """Helper function for formatValues function. Returns a list of
+        (index, converter) tuples: one specialized converter function for
+        each column in the header that actually needs formatting. Columns
+        whose values are returned unchanged are left out of the plan."""
+        sysmis, recodeSysmisTo = self.sysmis_, self.recodeSysmisTo
+        spss2strDate = self.spss2strDate
+
+        def recodeSysmis(value):
+            return value if value > sysmis else recodeSysmisTo
+
+        def nFormatter(varWid, asUnicode):
+            # format N-type values (=numerical with leading zeroes)
+            nfmt = "%%0%dd" % varWid  # 15 x faster than zfill
+            if asUnicode:
+                return lambda value: nfmt % value
+            return lambda value: bytez(nfmt % value)
+
+        def dateFormatter(fmt, isQuarter):
+            # convert SPSS dates to ISO dates
+            if not isQuarter:
+                converter = lambda value: spss2strDate(value, fmt,
+                                                       recodeSysmisTo)
+            else:
+                def converter(value):
+                    # convert month to quarter, e.g. 12 Q 1990 --> 4 Q 1990
+                    # There is no such thing as a %q strftime directive
+                    value = spss2strDate(value, fmt, recodeSysmisTo)
+                    if not value:
+                        return value
+                    try:
+                        return QUARTERS[value[:2]] + value[2:]
+                    except (KeyError, TypeError):
+                        return recodeSysmisTo
+            if numpyOk:  # used by _formatChunk to format whole columns
+                converter.formatColumn = functools.partial(
+                    self._formatDateColumn, fmt=fmt, isQuarter=isQuarter,
+                    converter=converter)
+            return converter
+
+        def stringFormatter(varType, asUnicode):
+            if asUnicode:
+                return lambda value: value[:varType].decode("utf-8")
+            return lambda value: value[:varType]
+
+        plan = []
+        for i, varName in enumerate(self.header):
+            varType = self.varTypes[varName]
+            bareformat_ = self.bareformats[varName]
+            if varType == 0 and bareformat_ in (b"N", u"N"):
+                converter = nFormatter(self.varWids[varName], self.ioUtf8 == 1)
+            elif varType == 0 and bareformat_ in supportedDates:
+                fmt = supportedDates[bareformat_]
+                converter = dateFormatter(fmt, bareformat_ == b"QYR")
+            elif varType == 0:
+                converter = recodeSysmis
+            elif self.ioUtf8_:
+                converter = stringFormatter(varType, True)
+            elif varType % 8:
+                converter = stringFormatter(varType, False)
+            else:
+                continue  # string is already a multiple of 8 bytes
+            plan.append((i, converter))
+        return plan
+
+    def _getPredicate(self, where):
+        """Helper function that compiles the <where> argument into a
+        function that returns whether the case in a case buffer should be
+        kept, or ``None`` if <where> is ``None``. An expression only unpacks
+        the variables that it uses; string values are stripped"""
+        if where is None:
+            return None
+        elif callable(where):
+            unpack_from = self.myStruct.unpack_from
+            return lambda caseBuffer: where(unpack_from(caseBuffer))
+
+        code = compile(where, "<where>", "eval")
+        meta, names = self.meta, {}
+        for name in code.co_names:  # also attribute and function names
+            if name in meta:
+                names[meta._varName(name)] = name
+        used = [varName for varName in self.varNames if varName in names]
+        unpack_from = self.getStruct(self.varTypes, self.varNames,
+                                     selectVars=used).unpack_from
+        names = [names[varName] for varName in used]
+        strings = [i for i, varName in enumerate(used)
+                   if self.varTypes[varName]]
+
+        def accept(caseBuffer):
+            values = list(unpack_from(caseBuffer))
+            for i in strings:
+                values[i] = values[i].rstrip()
+            return eval(code, dict(zip(names, values)))
+        return accept
+
     def formatValues(self, record):
         """This function formats date fields to ISO dates (yyyy-mm-dd), plus
         some other date/time formats. The SPSS N format is formatted to a
         character value with leading zeroes. System missing values are recoded
-        to <recodeSysmisTo>. If rawMode==True, this function does nothing"""
+        to <recodeSysmisTo>. If rawMode==True, this function does nothing.
+        The formatting is done according to the conversion plan that was
+        compiled when the file was opened, see ``_getConversionPlan``"""
         if self.rawMode or self.autoRawMode:
             return record  # 6-7 times faster!
-        for i, value in enumerate(record):
-            varName = self.header[i]
-            varType = self.varTypes[varName]
-            bareformat_ = self.bareformats[varName]
-            varWid = self.varWids[varName]
-            if varType == 0:
-                # recode system missing values, if present and desired
-                if value > self.sysmis_:
-                    pass
-                else:
-                    record[i] = self.recodeSysmisTo
-                # format N-type values (=numerical with leading zeroes)
-                if bareformat_ in (b"N", u"N"):
-                    #record[i] = str(value).zfill(varWid)
-                    nfmt_value = "%%0%dd" % varWid % value  #15 x faster (zfill)
-                    nfmt_value = nfmt_value if self.ioUtf8 == 1 else bytez(nfmt_value)
-                    record[i] = nfmt_value  #15 x faster (zfill)
-                # convert SPSS dates to ISO dates
-                elif bareformat_ in supportedDates:
-                    fmt = supportedDates[bareformat_]
-                    args = (value, fmt, self.recodeSysmisTo)
-                    record[i] = self.spss2strDate(*args)
-                    if bareformat_ == b"QYR" and record[i]:
-                        # convert month to quarter, e.g. 12 Q 1990 --> 4 Q 1990
-                        # There is no such thing as a %q strftime directive
-                        try:
-                            record[i] = QUARTERS[record[i][:2]] + record[i][2:]
-                        except (KeyError, TypeError):
-                            record[i] = self.recodeSysmisTo
-            elif varType > 0:
-                value = value[:varType]
-                if self.ioUtf8_:
-                    record[i] = value.decode("utf-8")
-                else:
-                    record[i] = value
+        for i, converter in self.conversionPlan:
+            record[i] = converter(record[i])
         return record
 
-    def _items(self, start=0, stop=None, step=1, returnHeader=False):
+    def _formatChunk(self, records):
+        """This function applies formatValues to a list of records, one
+        column at a time"""
+        if self.rawMode or self.autoRawMode:
+            return records
+        for i, converter in self.conversionPlan:
+            formatColumn = getattr(converter, "formatColumn", None)
+            if formatColumn is not None and len(records) > 1:
+                column = formatColumn([record[i] for record in records])
+                for record, value in zip(records, column):
+                    record[i] = value
+                continue
+            for record in records:
+                record[i] = converter(record[i])
+        return records
+
+    def _formatDateColumn(self, values, fmt, isQuarter, converter):
+        """Helper function for _formatChunk that formats a whole column of
+        SPSS dates at once, see
+        :py:func:`savReaderWriter.spssDates.formatDates`. Values that cannot
+        be formatted in a vectorized way, such as $sysmis, are formatted one
+        by one with <converter>"""
+        import numpy
+        from spssDates import formatDates
+        strings, done = formatDates(numpy.asarray(values, numpy.float64),
+                                    fmt, isQuarter)
+        if self.ioUtf8_ and self.ioUtf8_ != 2:
+            strings = numpy.char.decode(strings, "utf-8")
+        column = strings.tolist()
+        for j in numpy.flatnonzero(~done).tolist():
+            column[j] = converter(values[j])
+        return column
+
+    def _items(self, start=0, stop=None, step=1, returnHeader=False,
+               accept=None):
         """ This is a helper function to implement the __getitem__ and
-        the __iter__ special methods. """
+        the __iter__ special methods. If <accept> is specified (see
+        ``_getPredicate``), cases for which it returns False are skipped"""
 
         if returnHeader:
             yield self.header
 
         used_as_iterator = all([start == 0, stop is None, step == 1])
-        if not used_as_iterator:
-            retcode = self.seekNextCase(c_int(self.fh), c_long(0))  # reset
-            if retcode:
-                checkErrsWarns("Problem seeking first case", retcode)
-
+        if used_as_iterator and self.prefetch:
+            for chunk in self._rawChunks(0, None, 1000, accept=accept):
+                for record in chunk:
+                    yield self.formatValues(list(record))
+            return
+
+        if self.producer is not None:
+            self._stopProducer()  # the file handle is not shared
         stop = self.nCases if stop is None else stop
-        selection = self.selectVars is not None
-        selectOne = len(self.selectVars) == 1 if self.selectVars else None
+        fh = c_int(self.fh)
 
         for case in xrange(start, stop, step):
-            if start or step != 1:
-                # only call this when iterating over part of the records
-                retcode = self.seekNextCase(c_int(self.fh), c_long(case))
+            if not used_as_iterator and (case == start or step != 1):
+                # contiguous ranges only need one seek, followed by
+                # sequential reads. Other ranges are seeked case by case
+                retcode = self.seekNextCase(fh, c_long(case))
                 if retcode:
                     checkErrsWarns("Problem seeking case %d" % case, retcode)
 
-            record = self.record
-            if selection:
-                record = self.selector(record)
-                record = [record] if selectOne else list(record)
-
+            if accept is not None:
+                retcode = self.wholeCaseIn(fh, byref(self.caseBuffer))
+                if retcode:
+                    checkErrsWarns("Problem reading row %d" % case, retcode)
+                if not accept(self.caseBuffer):
+                    continue
+                record = list(self.unpack_from(self.caseBuffer))
+            else:
+                record = self.record  # only the selectVars, if specified
             yield self.formatValues(record)
 
+    def _rawChunks(self, start=0, stop=None, chunksize=1, unpack_from=None,
+                   accept=None):
+        """Helper function for _chunks. Yields lists of at most <chunksize>
+        unformatted records (tuples), as unpacked from the case buffer
+        (by default with ``self.unpack_from``). If <accept> is specified
+        (see ``_getPredicate``), only the accepted cases are unpacked, and
+        empty chunks are not yielded.
+        The per-case work is kept to a minimum: one wholeCaseIn call and
+        one unpack_from call."""
+        if self.producer is not None:
+            self._stopProducer()  # before seeking: the handle is not shared
+        used_as_iterator = start == 0 and stop is None
+        if not used_as_iterator:
+            retcode = self.seekNextCase(c_int(self.fh), c_long(start))
+            if retcode:
+                checkErrsWarns("Problem seeking case %d" % start, retcode)
+
+        stop = self.nCases if stop is None else min(stop, self.nCases)
+        unpack_from = unpack_from or self.unpack_from
+        if self.nativeEngine is not None:
+            # no need to copy the cases into the case buffer
+            readCases = self.nativeEngine.readCases
+            for begin in xrange(start, stop, chunksize):
+                n = min(chunksize, stop - begin)
+                if accept is None:
+                    yield [unpack_from(case) for case in readCases(n)]
+                    continue
+                chunk = [unpack_from(case) for case in readCases(n)
+                         if accept(case)]
+                if chunk:
+                    yield chunk
+            return
+        elif self.prefetch:
+            for cases in self._readAhead(start, stop, chunksize):
+                chunk = [unpack_from(case) for case in cases
+                         if accept is None or accept(case)]
+                if chunk:
+                    yield chunk
+            return
+
+        wholeCaseIn = self.wholeCaseIn
+        caseBuffer = self.caseBuffer
+        args = c_int(self.fh), byref(caseBuffer)
+        for begin in xrange(start, stop, chunksize):
+            chunk = []
+            append = chunk.append
+            for case in xrange(begin, min(begin + chunksize, stop)):
+                retcode = wholeCaseIn(*args)
+                if retcode:
+                    checkErrsWarns("Problem reading row %d" % case, retcode)
+                if accept is None or accept(caseBuffer):
+                    append(unpack_from(caseBuffer))
+            if chunk:
+                yield chunk
+
+    def _readAhead(self, start, stop, blockSize):
+        """Helper function for _rawChunks that reads the cases on a producer
+        thread (ctypes releases the GIL during wholeCaseIn). Yields lists of
+        at most <blockSize> raw cases (bytes); up to ``prefetch`` lists are
+        read ahead"""
+        if self.producer is not None:
+            self._stopProducer()  # an earlier iteration was abandoned
+        blocks = queue.Queue(self.prefetch)
+        stopped = threading.Event()
+        fh, wholeCaseIn = c_int(self.fh), self.wholeCaseIn
+        caseSize = sizeof(self.caseBuffer)
+
+        def put(item):
+            while not stopped.is_set():
+                try:
+                    blocks.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def produce():
+            caseBuffer = create_string_buffer(caseSize)
+            args = fh, byref(caseBuffer)
+            try:
+                for begin in xrange(start, stop, blockSize):
+                    block = []
+                    for case in xrange(begin, min(begin + blockSize, stop)):
+                        retcode = wholeCaseIn(*args)
+                        if retcode:
+                            msg = "Problem reading row %d" % case
+                            checkErrsWarns(msg, retcode)
+                        block.append(caseBuffer.raw)
+                    if not put(block):
+                        return
+                put(None)
+            except Exception:
+                put(sys.exc_info()[1])
+
+        thread = threading.Thread(target=produce, name="SavReader.prefetch")
+        thread.daemon = True
+        producer = self.producer = stopped, thread
+        thread.start()
+        try:
+            while True:
+                try:
+                    block = blocks.get(timeout=0.1)
+                except queue.Empty:
+                    if stopped.is_set():
+                        return  # stopped by close or by a new iteration
+                    continue
+                if block is None:
+                    break
+                elif isinstance(block, Exception):
+                    raise block
+                yield block
+        finally:
+            if self.producer is producer:
+                self._stopProducer()
+
+    def _stopProducer(self):
+        """Helper function that stops the producer thread of _readAhead, so
+        the file handle can be used (or closed) by the calling thread"""
+        stopped, thread = self.producer
+        stopped.set()
+        thread.join()
+        self.producer = None
+
+    def _chunks(self, start=0, stop=None, chunksize=1, returnHeader=False,
+                accept=None):
+        """Helper function to implement iterchunks. Yields lists of at most
+        <chunksize> formatted records"""
+        if returnHeader:
+            yield self.header
+
+        for chunk in self._rawChunks(start, stop, chunksize, accept=accept):
+            records = [list(record) for record in chunk]
+            yield self._formatChunk(records)
+
+    def iterchunks(self, chunksize=None):
+        """This function yields the records in chunks: lists of (at most)
+        <chunksize> records, which are formatted in the same way as the
+        records returned by ``__iter__``. If <chunksize> is not specified,
+        the ``chunksize`` argument of the constructor is used.
+        For example::
+
+            with SavReader("someFile.sav") as reader:
+                for records in reader.iterchunks(10000):
+                    bulk_load(records)"""
+        chunksize = self.chunksize if chunksize is None else chunksize
+        return self._chunks(0, None, self._checkChunksize(chunksize),
+                            accept=self.accept)
+
+    def iter_record_batches(self, batch_size=10000, valueLabels=False):
+        """This function yields the records as ``pyarrow.RecordBatch``
+        objects of (at most) <batch_size> rows. Requires the pyarrow
+        library. Numeric variables become float64 columns (with $sysmis as
+        null), date variables become timestamp columns, and strings become
+        utf8 columns without trailing blanks. If <valueLabels> is ``True``,
+        variables with value labels become dictionary-encoded columns of
+        the labels. See also
+        :py:class:`savReaderWriter.arrowExport.ArrowConverter`.
+        For example::
+
+            with SavReader("someFile.sav") as reader:
+                for batch in reader.iter_record_batches(50000):
+                    sink.write_batch(batch)"""
+        from arrowExport import ArrowConverter
+        converter = ArrowConverter(self, valueLabels)
+        return self._recordBatches(converter, batch_size)
+
+    def _recordBatches(self, converter, batch_size):
+        """Helper function for iter_record_batches and to_arrow"""
+        self._checkChunksize(batch_size)
+        for chunk in self._rawChunks(0, self.nCases, batch_size,
+                                     accept=self.accept):
+            yield converter.convert(chunk)
+
+    def to_arrow(self, batch_size=10000, valueLabels=False):
+        """This function returns all the records as a ``pyarrow.Table``.
+        See :py:meth:`savReaderWriter.SavReader.iter_record_batches`.
+        For example::
+
+            with SavReader("someFile.sav") as reader:
+                table = reader.to_arrow(valueLabels=True)"""
+        from arrowExport import ArrowConverter
+        converter = ArrowConverter(self, valueLabels)
+        batches = list(self._recordBatches(converter, batch_size))
+        return converter.pa.Table.from_batches(batches, converter.schema)
+
+    def _checkChunksize(self, chunksize):
+        """Helper function that validates the <chunksize> argument"""
+        if not isinstance(chunksize, int) or chunksize < 1:
+            raise ValueError("chunksize must be a positive integer, not %r"
+                             % chunksize)
+        return chunksize
+
     def __iter__(self):
-        """x.__iter__() <==> iter(x). Yields records as a list. 
+        """x.__iter__() <==> iter(x). Yields records as a list, or lists of 
+        records if the reader was instantiated with a ``chunksize``.
         For example::
         
             with SavReader("someFile.sav") as reader:
                 for line in reader:
                     process(line)"""
-        return self._items(0, None, 1, self.returnHeader)
+        if self.chunksize:
+            return self._chunks(0, None, self.chunksize, self.returnHeader,
+                                self.accept)
+        return self._items(0, None, 1, self.returnHeader, self.accept)
 
     def __getitem__(self, key):
         """x.__getitem__(y) <==> x[y], where y may be int or slice.
@@ -319,6 +757,7 @@ class SavReader(Header):
         """This is a helper function to implement array slicing with numpy"""
         if not numpyOk:
             raise ImportError("Array slicing requires the numpy library")
+        import numpy
 
         is_index = False
         rstart = cstart = 0
@@ -423,7 +862,7 @@ class SavReader(Header):
             data = SavReader("someFile.sav") 
             print("The last four records look like this: %s" % data.tail(4))
             data.close()"""
-        return self[-abs(n):]
+        return self[max(self.nCases - abs(n), 0):]
 
     def all(self):
         """ This convenience function returns all the records.
@@ -432,7 +871,8 @@ class SavReader(Header):
             data = SavReader("someFile.sav") 
             list_of_lists = data.all()
             data.close()"""
-        return [record for record in iter(self)]
+        records = self._items(0, None, 1, self.returnHeader, self.accept)
+        return [record for record in records]
 
     def __contains__(self, item):
         """ This function implements membership testing and returns True if
@@ -443,6 +883,9 @@ class SavReader(Header):
             reader = SavReader(savFileName, idVar="ssn")
             "987654321" in reader # returns True or False
         """
+        keyIndex = self._getKeyIndex()
+        if keyIndex is not None:
+            return self._idKey(item) in keyIndex
         return bool(self.get(item))
 
     def get(self, key, default=None, full=False):
@@ -475,6 +918,15 @@ class SavReader(Header):
                    "variable as an idVar argument")
             raise NameError(msg)
 
+        keyIndex = self._getKeyIndex()
+        if keyIndex is not None:
+            positions = keyIndex.positions(self._idKey(key))
+            if not positions:
+                return default
+            if full:
+                return [self[position] for position in positions]
+            return self[positions[0]]
+
         #two slightly modified functions from the bisect module
         def bisect_right(a, x, lo=0, hi=None):
             if hi is None:
@@ -504,13 +956,15 @@ class SavReader(Header):
             if self.varTypes[self.idVar] == 0:
                 if not isinstance(key, (int, float)):
                     return default
+                records = self._items(0, None, 1, self.returnHeader)
                 self.recordz = ((record[idPos], i) for i,
-                                record in enumerate(iter(self)))
+                                record in enumerate(records))
             else:
                 if not isinstance(key, basestring):
                     return default
+                records = self._items(0, None, 1, self.returnHeader)
                 self.recordz = ((record[idPos].rstrip(), i) for i,
-                                record in enumerate(iter(self)))
+                                record in enumerate(records))
             self.recordz = sorted(self.recordz)
         insertLPos = bisect_left(self.recordz, key)
         insertRPos = bisect_right(self.recordz, key)
@@ -525,6 +979,190 @@ class SavReader(Header):
             return result
         return default
 
+    def get_many(self, keys, default=None, full=False):
+        """ This function returns a list with, for each key in <keys>, the
+        record for which <idVar> == <key>, or <default> if <key> is not in
+        <savFileName>. Thus, it is a batch version of ``get``: the requested
+        records are sorted by case number and fetched in one forward sweep
+        through the file. If the reader was not instantiated with an
+        ``idIndex``, a private hash index is built (``idIndex`` itself, and
+        thus the behavior of ``get``, is left unchanged).
+
+        Parameters
+        ----------
+        keys : iterable
+            keys for which the corresponding records should be returned
+        default : (value)
+            value that should be returned for keys that are not found
+        full : bool
+            value that indicates whether *all* records for which
+            <idVar> == <key> should be returned (as a list, per key)
+
+        Examples
+        --------
+        For example::
+
+            data = SavReader(savFileName, idVar="ssn", idIndex="hash")
+            records = data.get_many(["987654321", "123456789"])
+            data.close()"""
+
+        if not self.idVar in self.varNames:
+            msg = ("SavReader object must be instantiated with an existing " +
+                   "variable as an idVar argument")
+            raise NameError(msg)
+
+        keyIndex = self._getKeyIndex()
+        if keyIndex is None:
+            if self._hashIndex is None:
+                self._hashIndex = HashIndex(self.varTypes[self.idVar],
+                                            self._idValues())
+            keyIndex = self._hashIndex
+        positions = [keyIndex.positions(self._idKey(key)) for key in keys]
+        if not full:
+            positions = [casesForKey[:1] for casesForKey in positions]
+        wanted = sorted(set(case for casesForKey in positions
+                            for case in casesForKey))
+        records = dict(self._sweep(wanted))
+        if full:
+            return [[records[case] for case in casesForKey] if casesForKey
+                    else default for casesForKey in positions]
+        return [records[casesForKey[0]] if casesForKey else default
+                for casesForKey in positions]
+
+    def sample(self, n, seed=None, strata=None):
+        """ This function returns a random sample of <n> records, in the
+        order of the file. The case numbers are drawn up front, so the
+        records are fetched in one forward sweep through the file (see
+        ``get_many``). The sample is drawn from all the cases in the file,
+        regardless of ``where``.
+
+        Parameters
+        ----------
+        n : int
+            the number of records
+        seed : int
+            seed of the random number generator, for a reproducible sample
+        strata : str
+            name of a (categorical) variable. If specified, the sample is
+            stratified: each value of <strata> gets a share of the <n>
+            records that is proportional to its frequency (largest
+            remainder method). Only the <strata> column is read to find the
+            strata.
+
+        Examples
+        --------
+        For example::
+
+            with SavReader(savFileName) as reader:
+                records = reader.sample(100000, seed=42, strata="region")"""
+        if not isinstance(n, int) or not 0 <= n <= self.nCases:
+            raise ValueError("n must be an integer between 0 and %d, not %r"
+                             % (self.nCases, n))
+        rng = random.Random(seed)
+        if strata is None:
+            cases = rng.sample(xrange(self.nCases), n)
+        else:
+            if strata not in self.varNames:
+                raise ValueError("strata: unknown variable %r" % strata)
+            groups = collections.defaultdict(list)
+            for case, value in enumerate(self._columnValues(strata)):
+                groups[value].append(case)
+            groups = [groups[value] for value in sorted(groups)]
+            exact = [n * len(group) / float(self.nCases) for group in groups]
+            sizes = [int(size) for size in exact]
+            byRemainder = sorted(range(len(groups)),
+                                 key=lambda i: sizes[i] - exact[i])
+            for i in byRemainder[:n - sum(sizes)]:
+                sizes[i] += 1
+            cases = [case for group, size in zip(groups, sizes)
+                     for case in rng.sample(group, size)]
+        return [record for case, record in self._sweep(sorted(cases))]
+
+    def _sweep(self, cases, maxGap=1000):
+        """Helper function for get_many and sample. Yields (case number,
+        record) tuples for the sorted case numbers in <cases>, in one
+        forward pass through the file. Cases between two requested cases
+        that are at most <maxGap> cases apart are read and skipped instead
+        of seeked."""
+        if self.producer is not None:
+            self._stopProducer()  # the file handle is not shared
+        fh, caseBuffer = c_int(self.fh), self.caseBuffer
+        unpack_from = self.unpack_from
+        readThrough = self.nativeEngine is None  # native seeks are cheap
+        nextCase = None
+        for case in cases:
+            if readThrough and nextCase is not None and \
+               case - nextCase <= maxGap:
+                for skipped in xrange(nextCase, case):
+                    retcode = self.wholeCaseIn(fh, byref(caseBuffer))
+                    if retcode:
+                        msg = "Problem reading row %d" % skipped
+                        checkErrsWarns(msg, retcode)
+            else:
+                retcode = self.seekNextCase(fh, c_long(case))
+                if retcode:
+                    checkErrsWarns("Problem seeking case %d" % case, retcode)
+            retcode = self.wholeCaseIn(fh, byref(caseBuffer))
+            if retcode:
+                checkErrsWarns("Problem reading row %d" % case, retcode)
+            nextCase = case + 1
+            yield case, self.formatValues(list(unpack_from(caseBuffer)))
+
+    def _getKeyIndex(self):
+        """Helper function for get, get_many and __contains__. Returns the
+        index of <idVar> (if ``idIndex`` is specified). A persistent index is
+        opened, or built if it does not exist or is stale. Returns None if
+        there is no such index."""
+        if self.idIndex is None or self.idVar not in self.varNames:
+            return None
+        indexFileName = self.savFileName + ".keyidx"
+        if self.keyIndex is None and self.idIndex == "disk":
+            self.keyIndex = KeyIndex.open(indexFileName, self.savFileName,
+                                          self.idVar)
+        if self.keyIndex is not None:
+            return self.keyIndex
+
+        keyWidth = self.varTypes[self.idVar]
+        keys = self._idValues()
+        if self.idIndex == "disk":
+            try:
+                self.keyIndex = KeyIndex.build(indexFileName,
+                                               self.savFileName, self.idVar,
+                                               keyWidth, keys)
+                return self.keyIndex
+            except (IOError, OSError) as e:
+                msg = "Could not write index %r (%s), using a hash index"
+                warnings.warn(msg % (indexFileName, e), stacklevel=3)
+                self.idIndex = "hash"
+        self.keyIndex = HashIndex(keyWidth, keys)
+        return self.keyIndex
+
+    def _idValues(self):
+        """Helper function that returns a list of all the unformatted
+        values of <idVar>. Only this column is unpacked."""
+        return self._columnValues(self.idVar)
+
+    def _columnValues(self, varName):
+        """Helper function that returns a list of all the unformatted
+        values of <varName>. Only this column is unpacked."""
+        projection = self.getStruct(self.varTypes, self.varNames,
+                                    selectVars=[varName])
+        if self.producer is not None:
+            self._stopProducer()  # the file handle is not shared
+        retcode = self.seekNextCase(c_int(self.fh), c_long(0))
+        if retcode:
+            checkErrsWarns("Problem seeking first case", retcode)
+        chunks = self._rawChunks(0, None, 10000, projection.unpack_from)
+        return [value for chunk in chunks for value, in chunk]
+
+    def _idKey(self, key):
+        """Helper function that encodes unicode <key> values of string
+        idVars, so they can be compared with the values in the file"""
+        if isinstance(key, unicode) and self.varTypes[self.idVar]:
+            encoding = "utf-8" if self.ioUtf8_ else self.fileEncoding
+            key = key.encode(encoding)
+        return key
+
     def getSavFileInfo(self):
         """ This function reads and returns some basic information of the open
         spss data file."""
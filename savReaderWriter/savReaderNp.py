@@ -12,6 +12,7 @@ from ctypes import *
 from functools import wraps, partial
 from itertools import chain, islice
 from bisect import bisect
+from collections import OrderedDict
 
 try:
     import numpy as np
@@ -19,10 +20,13 @@ except ImportError:
     print("WARNING: numpy not found, cannot use savReaderNp")
     class np: nan = float("nan")
 
-from savReaderWriter import *
+from savReader import *
 from error import *
 from helpers import *
 from py3k import *
+from spssDates import (spss2datetime64, spss2timedelta64, timestampFormats,
+                       durationFormats)
+from nativeEngine import SavDictionary
 
 # TODO:
 # pytables integration
@@ -59,6 +63,9 @@ class SavReaderNp(SavReader):
         indicates the locale of the I/O module. Cf. `SET LOCALE`. 
         (default = None, which corresponds to `".".join(locale.getlocale()`).
         For example, `en_US.UTF-8`.
+    engine : str
+        ``"spssio"`` (default) or ``"native"``. See under
+        :py:class:`savReaderWriter.SavReader`
 
     Examples
     --------
@@ -81,9 +88,9 @@ class SavReaderNp(SavReader):
         suffix to write uncompressed files"""
 
     def __init__(self, savFileName, recodeSysmisTo=np.nan, rawMode=False, 
-                 ioUtf8=False, ioLocale=None):
+                 ioUtf8=False, ioLocale=None, engine="spssio"):
         super(SavReaderNp, self).__init__(savFileName, 
-           ioUtf8=ioUtf8, ioLocale=ioLocale)
+           ioUtf8=ioUtf8, ioLocale=ioLocale, engine=engine)
 
         self.savFileName = savFileName
         self.recodeSysmisTo = recodeSysmisTo
@@ -105,9 +112,11 @@ class SavReaderNp(SavReader):
             self.to_structured_array = self._uncompressed_to_structured_array  
 
     def _items(self, start, stop, step):
-        """Helper function for __getitem__"""
+        """Helper function for __getitem__. Contiguous ranges only need
+        one seek, followed by sequential reads"""
         for case in xrange(start, stop, step):
-            self.seekNextCase(self.fh, case)
+            if case == start or step != 1:
+                self.seekNextCase(self.fh, case)
             self.wholeCaseIn(self.fh, byref(self.caseBuffer))
             record = np.fromstring(self.caseBuffer, self.struct_dtype)
             yield record
@@ -124,19 +133,13 @@ class SavReaderNp(SavReader):
                 self.do_convert_datetimes):
                 return array
 
-            # calculate count so fromiter can pre-allocate
-            count = self.nrows if not args else -1
-            if len(args) == 1 and isinstance(args[0], slice):
-                start, stop, step = args[0].indices(self.nrows)
-                count = (stop - start) // step
-
-            # now fill the array with datetimes
+            # now fill the array with datetimes, one column at a time
             dt_array = array.astype(self.datetime_dtype)            
+            missing = np.datetime64(datetime.datetime(datetime.MINYEAR, 1, 1))
             for varName in self.uvarNames:
                 if not varName in self.datetimevars:
                     continue
-                datetimes = (self.spss2datetimeDate(dt) for dt in array[varName])
-                dt_array[varName] = np.fromiter(datetimes, "datetime64[us]", count)
+                dt_array[varName] = spss2datetime64(array[varName], missing)
             return dt_array
         return _convert_datetimes
 
@@ -233,13 +236,21 @@ class SavReaderNp(SavReader):
       
     def _init_funcs(self):
         """Helper to initialize C functions of the SPSS I/O module: set their
-        argtypes and _errcheck attributes""" 
-        self.seekNextCase = self.spssio.spssSeekNextCase
+        argtypes and _errcheck attributes. The library is shared by all
+        readers, so private function pointers are used: the argtypes of
+        spssWholeCaseIn depend on the record size of this file""" 
+        self.record_size = sizeof(self.caseBuffer)
+        if self.nativeEngine is not None:
+            self.seekNextCase = self.nativeEngine.seekNextCase
+            self.wholeCaseIn = self.nativeEngine.wholeCaseIn
+            return
+
+        funcPtr = self.spssio._FuncPtr
+        self.seekNextCase = funcPtr(("spssSeekNextCase", self.spssio))
         self.seekNextCase.argtypes = [c_int, c_long]
         self.seekNextCase._errcheck = self._errcheck
 
-        self.record_size = sizeof(self.caseBuffer)
-        self.wholeCaseIn = self.spssio.spssWholeCaseIn
+        self.wholeCaseIn = funcPtr(("spssWholeCaseIn", self.spssio))
         self.wholeCaseIn.argtypes = [c_int, POINTER(c_char * self.record_size)]
         self.wholeCaseIn._errcheck = self._errcheck
 
@@ -435,23 +446,24 @@ class SavReaderNp(SavReader):
         for case in xrange(self.nrows):
             yield self.unpack(self.sav.read(self.record_size))
 
+    @memoized_property
+    def dictionary(self):
+        """Returns the parsed dictionary records of the file (record types
+        1, 2, 3, 4, 6, 7 and 999), see
+        :py:class:`savReaderWriter.nativeEngine.SavDictionary`. Among other
+        things, it gives the position of each record (`records`), the start
+        of the case data (`dataOffset`) and the case layout (`varNames`,
+        `varTypes`, `segments`, `caseSize`, `isIdentityLayout`)"""
+        if self.nativeEngine is not None:
+            return self.nativeEngine.dictionary
+        with open(self.savFileName, "rb") as f:
+            return SavDictionary(f)
+
     @property
     def _offset(self):
-        """Returns the position of the type 999 record, which indicates the 
+        """Returns the position of the end of the type 999 record, i.e. the
         end of the metadata and the start of the case data"""
-        unpack_int = lambda value: struct.unpack("i", value)
-        i = 0
-        while True:
-            self.sav.seek(i)
-            try: 
-                code = unpack_int(self.sav.read(4))
-            except struct.error:
-                pass
-            i += 1
-            end_of_metadata = code == (999,)
-            if end_of_metadata:
-                self.sav.read(4)
-                return self.sav.tell()
+        return self.dictionary.dataOffset
 
     @convert_datetimes
     @convert_missings
@@ -482,6 +494,51 @@ class SavReaderNp(SavReader):
         else:
             array = np.fromfile(self.sav, float, count)
         return array.reshape(self.shape)
+
+    def memmap_view(self, mode="r"):
+        """Return a memory-mapped array over the case data of an
+        uncompressed .sav file itself, without reading or copying it. The
+        pages are loaded on access, and are shared (page cache) by all
+        processes that map the same file.
+
+        Parameters
+        ----------
+        mode : str, optional
+               ``"r"`` (read-only, default) or ``"c"`` (copy-on-write:
+               assignments change the array, but not the file)
+
+        Returns
+        -------
+        array : numpy.memmap
+                A structured array with `struct_dtype`, or a 2-D array of
+                floats if the data are homogeneous. The values are raw:
+                $sysmis is not recoded and datetimes are not converted
+
+        Examples
+        --------
+        For example::
+
+            savFileName = "./test_data/all_numeric_uncompressed.sav"
+            reader_np = SavReaderNp(savFileName)
+            array = reader_np.memmap_view()
+            reader_np.close()
+            mean = array[:, 0].mean()
+
+        See also
+        --------
+        savReaderWriter.SavReaderNp.to_structured_array
+        """
+        if not self._is_uncompressed:
+            raise ValueError("Only uncompressed files can be used")
+        if mode not in ("r", "c"):
+            raise ValueError("mode must be 'r' or 'c', not %r" % mode)
+        if not self.dictionary.isIdentityLayout:
+            raise ValueError("Files with very long strings (> 255 bytes) "
+                             "cannot be mapped")
+        dtype, shape = self.struct_dtype, self.nrows
+        if self.is_homogeneous:
+            shape = self.shape
+        return np.memmap(self.savFileName, dtype, mode, self._offset, shape)
     # ------------------------------------------------------------------------ 
 
     @convert_datetimes
@@ -604,6 +661,158 @@ class SavReaderNp(SavReader):
         else:
             return self.to_structured_array(filename)
 
+    @memoized_property
+    def _record_dtype(self):
+        """Returns a structured dtype with the exact layout of the case
+        buffer (full precision, no titles), regardless of `is_homogeneous`"""
+        byteorder = u"<" if self.byteorder == u"little" else u">"
+        fmt8 = lambda varType: int(ceil(varType / 8.) * 8)
+        varTypes = [self.varTypes[varName] for varName in self.varNames]
+        formats = [u"S%d" % fmt8(t) if t else u"%sd" % byteorder
+                   for t in varTypes]
+        return np.dtype(dict(names=self.uvarNames, formats=formats,
+                             itemsize=self.record_size))
+
+    def _read_records(self, nrows):
+        """Helper function for to_dataframe that reads the first <nrows>
+        records into a structured array, without unpacking the values
+        into Python objects. Uncompressed files take the same fast path as
+        `to_structured_array`: the records are read with ``np.fromfile``"""
+        if self._is_uncompressed and self.dictionary.isIdentityLayout:
+            self.sav.seek(self._offset)
+            return np.fromfile(self.sav, self._record_dtype, nrows)
+        self.seekNextCase(self.fh, 0)
+        if self.nativeEngine is not None:
+            raw = b"".join(self.nativeEngine.readCases(nrows))
+        else:
+            raw = bytearray()
+            for row in xrange(nrows):
+                retcode = self.wholeCaseIn(self.fh, self.caseBuffer)
+                checkErrsWarns("Problem reading row %d" % row, retcode)
+                raw += self.caseBuffer.raw
+        self.seekNextCase(self.fh, 0)
+        return np.frombuffer(raw, self._record_dtype, nrows)
+
+    def _decode(self, value):
+        if isinstance(value, bytes):
+            encoding = "utf-8" if self.ioUtf8_ else self.fileEncoding
+            return value.decode(encoding)
+        return value
+
+    def _categorical(self, pd, values, valueLabels, varType):
+        """Helper function for to_dataframe that converts a column into a
+        ``pandas.Categorical`` of value labels; $sysmis becomes NaN. Each
+        distinct value is looked up only once. Returns ``None`` if some
+        values have no label (e.g. salaries with a label for 0 only)"""
+        if varType:
+            encoding = "utf-8" if self.ioUtf8_ else self.fileEncoding
+            encode = lambda key: key if isinstance(key, bytes) else \
+                                 key.encode(encoding)
+            labels = dict((encode(key).rstrip(), label) for key, label
+                          in valueLabels.items())
+            uniques, codes = np.unique(np.char.rstrip(values),
+                                       return_inverse=True)
+            missing = np.zeros(len(uniques), bool)
+        else:
+            labels = valueLabels
+            uniques, codes = np.unique(values, return_inverse=True)
+            missing = np.isnan(uniques) | (uniques <= -sys.float_info.max)
+        categories, indices, mapping = [], {}, []
+        for value, is_missing in izip(uniques.tolist(), missing):
+            if is_missing:
+                mapping.append(-1)
+                continue
+            try:
+                label = self._decode(labels[value])
+            except KeyError:
+                return None
+            if label not in indices:  # values may share one label
+                indices[label] = len(categories)
+                categories.append(label)
+            mapping.append(indices[label])
+        codes = np.asarray(mapping, np.int32)[codes.ravel()] if mapping \
+                else np.zeros(len(values), np.int32)
+        return pd.Categorical.from_codes(codes, categories)
+
+    def _column(self, pd, values, varName, categoricals):
+        """Helper function for to_dataframe that converts one field of the
+        record array into a column"""
+        varType = self.varTypes[varName]
+        bareformat = self.bareformats[varName].upper()
+        if categoricals and self.valueLabels.get(varName):
+            column = self._categorical(pd, values,
+                                       self.valueLabels[varName], varType)
+            if column is not None:
+                return column
+        if varType:
+            encoding = "utf-8" if self.ioUtf8_ else self.fileEncoding
+            return np.char.decode(np.char.rstrip(values), encoding)
+        elif bareformat in timestampFormats:
+            return spss2datetime64(values)
+        elif bareformat in durationFormats:
+            return spss2timedelta64(values)
+        return np.where(values <= -sys.float_info.max, np.nan, values)
+
+    def to_dataframe(self, usecols=None, nrows=None, categoricals=True):
+        """Return the data in <savFileName> as a ``pandas.DataFrame``
+        (requires the pandas library). The records are read into one
+        structured array, and each column is converted in a single
+        vectorized step, without creating a Python object per value.
+
+        * numerical variables become float64 columns; $sysmis becomes NaN
+        * date and datetime variables become ``datetime64[us]`` columns, and
+          time variables (TIME, DTIME) become ``timedelta64[us]`` columns.
+          Missing values become NaT
+        * string variables become columns of unicode strings, without
+          trailing blanks
+        * if <categoricals> is ``True``, variables with value labels become
+          ``pandas.Categorical`` columns of the labels, provided that all
+          their (non-missing) values have a label
+
+        `rawMode` and `recodeSysmisTo` are ignored.
+
+        Parameters
+        ----------
+        usecols : list, optional
+            the names of the variables to include (default: all variables)
+        nrows : int, optional
+            the number of records to read (default: all records)
+        categoricals : bool
+            indicates whether variables with value labels should be
+            converted into categoricals
+
+        Returns
+        -------
+        dataframe : pandas.DataFrame
+
+        Examples
+        --------
+        For example::
+
+            with SavReaderNp("./test_data/Employee data.sav") as reader_np:
+                df = reader_np.to_dataframe(usecols=["gender", "salary"])
+            df.groupby("gender").salary.mean()
+        """
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("to_dataframe requires the pandas library")
+        if nrows is None:
+            nrows = self.nrows
+        nrows = max(0, min(nrows, self.nrows))
+        if usecols is None:
+            usecols = self.uvarNames
+        usecols = [self._decode(v) for v in usecols]
+        unknown = set(usecols) - set(self.uvarNames)
+        if unknown:
+            raise ValueError("Unknown variable(s): %s" % sorted(unknown))
+        records = self._read_records(nrows)
+        varNames = dict(izip(self.uvarNames, self.varNames))
+        columns = OrderedDict((v, self._column(pd, records[v], varNames[v],
+                                                categoricals))
+                              for v in usecols)
+        return pd.DataFrame(columns, columns=usecols, copy=False)
+
 
 
 if __name__ == "__main__":
@@ -276,7 +276,6 @@ class SavWriter(Header):
         is set to 0:00. To set the time portion if the date variable to another
         value, use convertTime."""
         func = self.spssio.spssConvertDate
-        func.argtypes = [c_int, c_int, c_int, POINTER(c_double)]
         spssDate = c_double()
         retcode = func(day, month, year, spssDate)
         if retcode:
@@ -288,7 +287,6 @@ class SavWriter(Header):
         """This function converts a time given as day, hours, minutes, and
         seconds to the internal SPSS time format."""
         func = self.spssio.spssConvertTime
-        func.argtypes = [c_int, c_int, c_int, c_double, POINTER(c_double)]
         spssTime = c_double()
         retcode = func(day, hour, minute, float(second), spssTime)
         if retcode:
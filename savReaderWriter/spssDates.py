@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Vectorized conversion of SPSS dates (requires the numpy library).
+
+SPSS stores dates as the number of seconds since midnight, Oct 14, 1582 (the
+beginning of the Gregorian calendar), and durations (TIME, DTIME) as a
+number of seconds. The functions in this module convert whole columns of
+such values at once, using integer arithmetic on numpy arrays instead of
+one ``datetime.timedelta`` and one ``strftime`` call per value."""
+
+import re
+import datetime
+
+try:
+    import numpy as np
+except ImportError:
+    pass
+
+from savReaderWriter import supportedDates
+from py3k import *
+
+# seconds between the SPSS epoch (1582-10-14) and the Unix epoch (1970-01-01)
+SPSS_EPOCH_OFFSET = 12219379200
+
+# SPSS date formats whose values are seconds since the SPSS epoch
+timestampFormats = set(supportedDates) - set([b"TIME", b"DTIME",
+                                              b"WKDAY", b"MONTH"])
+# SPSS time formats whose values are durations in seconds
+durationFormats = set([b"TIME", b"DTIME"])
+
+GREGORIAN_EPOCH = datetime.datetime(1582, 10, 14, 0, 0, 0)
+# the range of values that can be represented by datetime.datetime
+MIN_SECONDS = (datetime.datetime.min - GREGORIAN_EPOCH).total_seconds()
+MAX_SECONDS = (datetime.datetime.max - GREGORIAN_EPOCH).total_seconds()
+# the range of durations that fit in a timedelta64[us]
+MAX_DURATION = 9e12
+
+SECOND = 10 ** 6
+DAY = 86400 * SECOND
+
+
+def _micros(seconds):
+    """Helper function that converts finite seconds into int64 microseconds,
+    rounding the fraction in the same way as ``datetime.timedelta``"""
+    whole = np.floor(seconds)
+    fraction = np.round((seconds - whole) * 1e6).astype(np.int64)
+    return whole.astype(np.int64) * SECOND + fraction
+
+def spss2datetime64(values, fill=None):
+    """Converts an array of SPSS dates into a ``datetime64[us]`` array.
+    Values that ``datetime.datetime`` cannot represent (e.g. $sysmis) become
+    <fill> (default: NaT)"""
+    values = np.asarray(values, np.float64)
+    valid = np.isfinite(values) & (values >= MIN_SECONDS) & \
+            (values <= MAX_SECONDS)
+    micros = _micros(np.where(valid, values, 0.0))
+    result = (micros - SPSS_EPOCH_OFFSET * SECOND).view("M8[us]")
+    result[~valid] = np.datetime64("NaT") if fill is None else fill
+    return result
+
+def spss2timedelta64(values, fill=None):
+    """Converts an array of SPSS durations (TIME, DTIME) into a
+    ``timedelta64[us]`` array. $sysmis becomes <fill> (default: NaT)"""
+    values = np.asarray(values, np.float64)
+    valid = np.isfinite(values) & (np.abs(values) <= MAX_DURATION)
+    result = _micros(np.where(valid, values, 0.0)).view("m8[us]")
+    result[~valid] = np.timedelta64("NaT") if fill is None else fill
+    return result
+
+def _digits(values, width):
+    """Helper function that renders non-negative integers as <width>
+    zero-padded ASCII digits. Returns a (len(values), width) uint8 array"""
+    values = values.astype(np.int64)
+    digits = np.empty((len(values), width), np.uint8)
+    for i in range(width - 1, -1, -1):
+        digits[:, i] = values % 10 + 48
+        values = values // 10
+    return digits
+
+def _strings(block):
+    """Helper function that converts a 2-d uint8 array into bytes"""
+    block = np.ascontiguousarray(block)
+    return block.view("S%d" % block.shape[1]).ravel()
+
+def _names(fmt, dates):
+    """Helper function that returns the (locale dependent) strftime names
+    of weekdays or months as a bytes array"""
+    return np.array([bytez(date.strftime(fmt)) for date in dates])
+
+class _Fields(object):
+    """Helper class for _strftime that computes the calendar fields of an
+    array of int64 microseconds since the SPSS epoch, on first access"""
+
+    def __init__(self, micros):
+        self.micros = micros - SPSS_EPOCH_OFFSET * SECOND
+
+    def __getattr__(self, name):
+        value = getattr(self, "_" + name)()
+        setattr(self, name, value)
+        return value
+
+    def _days(self):
+        return self.micros // DAY
+
+    def _date(self):
+        return self.days.astype("M8[D]")
+
+    def _year(self):
+        return self.date.astype("M8[Y]").astype(np.int64) + 1970
+
+    def _month(self):
+        return self.date.astype("M8[M]").astype(np.int64) % 12 + 1
+
+    def _day(self):
+        return (self.date - self.date.astype("M8[M]")).astype(np.int64) + 1
+
+    def _yday(self):
+        return (self.date - self.date.astype("M8[Y]")).astype(np.int64)
+
+    def _weekday(self):  # Monday == 0; Jan 1, 1970 was a Thursday
+        return (self.days + 3) % 7
+
+    def _time(self):
+        return self.micros - self.days * DAY
+
+    def _hour(self):
+        return self.time // (3600 * SECOND)
+
+# directive: (width, function of _Fields) for numerical strftime directives
+_directives = {
+    "Y": (4, lambda f: f.year),
+    "y": (2, lambda f: f.year % 100),
+    "m": (2, lambda f: f.month),
+    "q": (1, lambda f: (f.month - 1) // 3 + 1),  # not strftime: quarter
+    "d": (2, lambda f: f.day),
+    "j": (3, lambda f: f.yday + 1),
+    "W": (2, lambda f: (f.yday + 7 - f.weekday) // 7),
+    "U": (2, lambda f: (f.yday + 7 - (f.weekday + 1) % 7) // 7),
+    "H": (2, lambda f: f.hour),
+    "I": (2, lambda f: (f.hour + 11) % 12 + 1),
+    "M": (2, lambda f: f.time // (60 * SECOND) % 60),
+    "S": (2, lambda f: f.time // SECOND % 60),
+    "f": (6, lambda f: f.time % SECOND)}
+
+# directive: (strftime format, dates, function of _Fields) for name directives
+_weekdays = [datetime.date(2001, 1, day) for day in range(1, 8)]
+_months = [datetime.date(2001, month, 1) for month in range(1, 13)]
+_nameDirectives = {
+    "A": ("%A", _weekdays, lambda f: f.weekday),
+    "a": ("%a", _weekdays, lambda f: f.weekday),
+    "B": ("%B", _months, lambda f: f.month - 1),
+    "b": ("%b", _months, lambda f: f.month - 1),
+    "p": ("%p", [datetime.time(0), datetime.time(12)],
+          lambda f: f.hour // 12)}
+
+def _strftime(micros, fmt):
+    """Helper function for formatDates: a vectorized ``strftime`` for int64
+    microseconds since the SPSS epoch. Returns a bytes array, or ``None``
+    if <fmt> contains a directive that is not supported"""
+    fields, pieces, block = _Fields(micros), [], []
+    for literal, directive in re.findall("([^%]*)(?:%(.)|$)", fmt):
+        if directive == "%":
+            literal, directive = literal + "%", ""
+        if literal:
+            literal = np.frombuffer(bytez(literal), np.uint8)
+            block.append(np.broadcast_to(literal, (len(micros),
+                                                   len(literal))))
+        if not directive:
+            continue
+        elif directive in _directives:
+            width, field = _directives[directive]
+            block.append(_digits(field(fields), width))
+        elif directive in _nameDirectives:
+            nameFmt, dates, field = _nameDirectives[directive]
+            if block:
+                pieces.append(_strings(np.hstack(block)))
+                block = []
+            pieces.append(_names(nameFmt, dates)[field(fields)])
+        else:
+            return None
+    if block:
+        pieces.append(_strings(np.hstack(block)))
+    if not pieces:
+        return np.zeros(len(micros), "S1")
+    result = pieces[0]
+    for piece in pieces[1:]:
+        result = np.char.add(result, piece)
+    return result
+
+def formatDates(values, fmt, isQuarter=False):
+    """Vectorized version of :py:meth:`savReaderWriter.SavReader.spss2strDate`
+    that formats an array of SPSS dates with <fmt> (one of the values of
+    ``supportedDates``). If <isQuarter> is ``True``, the leading month is
+    replaced by the quarter (QYR format).
+
+    Returns a tuple of a bytes array and a boolean array that indicates
+    which values were formatted. The others ($sysmis, dates before 1582,
+    and durations that spss2strDate formats in a special way) are left to
+    spss2strDate."""
+    values = np.asarray(values, np.float64)
+    done = np.isfinite(values) & (values >= 0) & (values <= MAX_SECONDS)
+    micros = _micros(np.where(done, values, 0.0))
+    if isQuarter:
+        if not fmt.startswith("%m"):
+            return np.zeros(len(values), "S1"), np.zeros(len(values), bool)
+        fmt = "%q" + fmt[2:]
+
+    if fmt == "%d %H:%M:%S":  # DTIME: elapsed days, then the time
+        days = micros // DAY
+        done &= (days < 100) & (micros % SECOND == 0)
+        days = _strings(_digits(np.where(done, days, 0), 2))
+        result = np.char.add(np.char.add(days, b" "),
+                             _strftime(micros, "%H:%M:%S"))
+    else:
+        result = _strftime(micros, fmt)
+        if result is None:
+            return np.zeros(len(values), "S1"), np.zeros(len(values), bool)
+        if fmt.startswith("%H:%M:%S"):  # TIME: durations < 1 day
+            short = values < 86400
+            done &= ~short | (micros % SECOND == 0)
+            if short.any():
+                result = np.where(short, _strftime(micros, "%H:%M:%S"),
+                                  result)
+    return result, done
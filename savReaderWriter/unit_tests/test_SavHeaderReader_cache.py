@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Persistent cache of the data dictionary (SavHeaderReader(cacheDir=...))
+##############################################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from savReaderWriter import *
+
+
+class test_SavHeaderReader_cache(unittest.TestCase):
+
+    def setUp(self):
+        self.cacheDir = os.path.join(tempfile.mkdtemp(), "cache")
+        self.savFileName = "test_data/Employee data.sav"
+
+    def tearDown(self):
+        shutil.rmtree(os.path.dirname(self.cacheDir))
+
+    def test_dataDictionary_cached(self):
+        with SavHeaderReader(self.savFileName) as header:
+            metadata_expected = header.dataDictionary()
+        with SavHeaderReader(self.savFileName,
+                             cacheDir=self.cacheDir) as header:
+            metadata_got1 = header.dataDictionary()
+        self.assertEqual(1, len(os.listdir(self.cacheDir)))
+        with SavHeaderReader(self.savFileName,
+                             cacheDir=self.cacheDir) as header:
+            # the I/O module was not loaded
+            self.assertFalse(hasattr(header, "spssio"))
+            self.assertEqual(474, header.numberofCases)
+            metadata_got2 = header.dataDictionary(True)
+        self.assertEqual(metadata_expected, metadata_got1)
+        self.assertEqual(metadata_expected, metadata_got2._asdict())
+
+    def test_dataDictionary_stale_cache(self):
+        with SavHeaderReader(self.savFileName,
+                             cacheDir=self.cacheDir) as header:
+            cacheFileName, key = header.cacheFileName, header.cacheKey
+            header.dataDictionary()
+            self.assertIsNotNone(header._readCache(cacheFileName, key))
+            stale_key = key[:2] + (key[2] - 1,) + key[3:]
+            self.assertIsNone(header._readCache(cacheFileName, stale_key))
+            # e.g. another version of the I/O libraries
+            self.assertTrue(len(key[5]) > 1)
+            other_version = key[:5] + (key[5][:1],)
+            self.assertIsNone(header._readCache(cacheFileName,
+                                                other_version))
+
+    @unittest.skipUnless(hasattr(os, "getuid") and os.getuid() == 0,
+                         "Requires root (to change the owner of a file)")
+    def test_dataDictionary_foreign_cache(self):
+        with SavHeaderReader(self.savFileName,
+                             cacheDir=self.cacheDir) as header:
+            header.dataDictionary()
+            os.chown(header.cacheFileName, 12345, -1)
+            self.assertIsNone(header._readCache(header.cacheFileName,
+                                                header.cacheKey))
+
+if __name__ == "__main__":
+    unittest.main()
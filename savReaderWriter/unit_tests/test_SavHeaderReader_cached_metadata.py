@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Metadata getters are cached; per-variable access with `meta`
+##############################################################################
+
+import unittest
+from savReaderWriter import *
+
+
+class test_SavHeaderReader_cached_metadata(unittest.TestCase):
+
+    def setUp(self):
+        self.savFileName = "test_data/Employee data.sav"
+
+    def test_metadata_cached(self):
+        with SavHeaderReader(self.savFileName) as header:
+            valueLabels = header.valueLabels
+            self.assertEqual(valueLabels, header.valueLabels)
+            self.assertIn("valueLabels", header.metadata_)
+
+    def test_metadata_cached_copy(self):
+        """Changing a getter result does not change the cache"""
+        with SavHeaderReader(self.savFileName) as header:
+            expected = header.dataDictionary()
+            header.valueLabels.pop(b"jobcat")
+            header.valueLabels[b"gender"][b"x"] = b"Other"
+            header.formats[b"salary"] = b"F8.2"
+            self.assertIsNot(header.formats, header.formats)
+            self.assertEqual(expected, header.dataDictionary())
+            meta = header.meta[b"gender"]
+            meta.valueLabels[b"y"] = b"Unknown"
+            self.assertEqual({b"f": b"Female", b"m": b"Male"},
+                             header.meta[b"gender"].valueLabels)
+
+    def test_metadata_invalidated_by_setter(self):
+        with SavHeaderReader(self.savFileName) as header:
+            header.varLabels
+            header.varLabels = {}
+            self.assertNotIn("varLabels", header.metadata_)
+
+    def test_meta(self):
+        with SavHeaderReader(self.savFileName) as header:
+            meta = header.meta
+            self.assertEqual({1.0: b'Clerical', 2.0: b'Custodial',
+                              3.0: b'Manager', 0.0: b'0 (Missing)'},
+                             meta[b"jobcat"].valueLabels)
+            self.assertEqual(b"Current Salary", meta["salary"].varLabels)
+            self.assertEqual(b"DOLLAR8", meta["salary"].formats)
+            self.assertIsNone(meta["id"].valueLabels)
+            self.assertIn("salary", meta)
+            self.assertNotIn("nonexisting", meta)
+            with self.assertRaises(KeyError):
+                meta["nonexisting"]
+
+if __name__ == "__main__":
+    unittest.main()
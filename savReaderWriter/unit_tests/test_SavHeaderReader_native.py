@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Read the data dictionary without the I/O module: engine="native"
+##############################################################################
+
+import locale
+import shutil
+import sys
+import tempfile
+import unittest
+
+from savReaderWriter import *
+
+
+class test_SavHeaderReader_native(unittest.TestCase):
+
+    def setUp(self):
+        self.maxDiff = None
+        self.savFileName = "test_data/spssio_test.sav"
+
+    def test_same_as_spssio(self):
+        for savFileName in (self.savFileName, "test_data/Employee data.sav"):
+            with SavHeaderReader(savFileName) as header:
+                metadata_expected = header.dataDictionary()
+            with SavHeaderReader(savFileName, engine="native") as header:
+                metadata_got = header.dataDictionary()
+            self.assertEqual(metadata_expected, metadata_got)
+
+    def test_no_spssio(self):
+        locale_before = locale.setlocale(locale.LC_ALL)
+        with SavHeaderReader(self.savFileName, engine="native") as header:
+            self.assertFalse(hasattr(header, "spssio"))
+            self.assertEqual(9, header.numberofCases)
+            self.assertEqual(22, header.numberofVariables)
+            self.assertEqual("utf_8", header.fileEncoding)
+        self.assertEqual(locale_before, locale.setlocale(locale.LC_ALL))
+
+    def test_dataDictionary(self):
+        with SavHeaderReader(self.savFileName, engine="native") as header:
+            metadata = header.dataDictionary(True)
+        self.assertEqual(b"weightVar", metadata.caseWeightVar)
+        self.assertEqual(b"This is a file label", metadata.fileLabel)
+        self.assertEqual(100, metadata.varTypes[b"aLongStringVar"])
+        self.assertEqual(b"ADATE40", metadata.formats[b"someDate"])
+        self.assertEqual(b"F3", metadata.formats[b"Age"])
+        self.assertEqual({27.0: b"27 y.o. ", 34.0: b"34 y.o.",
+                          50.0: b"50 y.o."}, metadata.valueLabels[b"Age"])
+        self.assertEqual({"values": [b"x", b"y"]},
+                         metadata.missingValues[b"aShortStringVar"])
+        missing = metadata.missingValues[b"Income2"]
+        self.assertTrue(missing["lower"] < -sys.float_info.max / 2)  # LO
+        self.assertEqual((-1.0, 999.0), (missing["upper"], missing["value"]))
+        self.assertEqual((b"ratio", 14, b"right"),
+                         (metadata.measureLevels[b"Income1"],
+                          metadata.columnWidths[b"Income1"],
+                          metadata.alignments[b"Income1"]))
+        self.assertEqual(b"partition", metadata.varRoles[b"Region"])
+        self.assertEqual({b"DerivedFrom[1]": b"Income1",
+                          b"DerivedFrom[2]": b"Income2",
+                          b"DerivedFrom[3]": b"Income3",
+                          b"Formula": b"max(Income1, Income2, Income3)"},
+                         metadata.varAttributes[b"MaxIncome"])
+        self.assertEqual(b"@Notes",
+                         metadata.fileAttributes[b"$VariableView2[14]"])
+        self.assertEqual({b"setType": b"C", b"label": b"the ages",
+                          b"varNames": [b"Age", b"AGE2", b"AGE3"]},
+                         metadata.multRespDefs[b"ages"])
+        self.assertEqual({b"setType": b"D", b"label": b"",
+                          b"countedValue": b"1",
+                          b"varNames": [b"V1", b"V2", b"V3"]},
+                         metadata.multRespDefs[b"V"])
+
+    def test_short_names_and_varSets(self):
+        with SavHeaderReader("test_data/Employee data.sav",
+                             engine="native") as header:
+            self.assertEqual(b"id", header.varNames[0])
+            self.assertEqual({b"DEMOGR": [b"gender", b"minority", b"educ"],
+                              b"SALARY": [b"salbegin", b"salary"]},
+                             header.varSets)
+            self.assertEqual({b"f": b"Female", b"m": b"Male"},
+                             header.valueLabels[b"gender"])
+
+    def test_ioUtf8(self):
+        with SavHeaderReader("test_data/greetings.sav", ioUtf8=True,
+                             engine="native") as header:
+            self.assertEqual([u"line", u"Bondjo\xfb", u"greeting"],
+                             header.varNames)
+            meta = header.meta[u"Bondjo\xfb"]
+            self.assertEqual(20, meta.varTypes)
+            self.assertEqual({u"values": [u"\xa1Hola! "]}, meta.missingValues)
+            self.assertEqual({u"Thai" + 16 * u" ": u"สวัสดี"},
+                             meta.valueLabels)
+            self.assertTrue(header.textInfo.startswith(u"File 'greetings"))
+
+    def test_cache(self):
+        cacheDir = tempfile.mkdtemp()
+        try:
+            with SavHeaderReader(self.savFileName, cacheDir=cacheDir,
+                                 engine="native") as header:
+                metadata = header.dataDictionary()
+            self.assertEqual("native", header.cacheKey[3])
+            self.assertEqual(1, len(header.cacheKey[5]))  # no I/O libraries
+            with SavHeaderReader(self.savFileName, cacheDir=cacheDir,
+                                 engine="native") as header:
+                self.assertTrue(header.cacheHit)
+                self.assertEqual(metadata, header.dataDictionary())
+                self.assertEqual(9, header.numberofCases)
+        finally:
+            shutil.rmtree(cacheDir)
+
+    def test_invalid_engine(self):
+        with self.assertRaises(ValueError):
+            SavHeaderReader(self.savFileName, engine="pspp")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Read an SPSS data file into a pandas DataFrame
+##############################################################################
+
+import unittest
+import datetime
+
+try:
+    import numpy as np
+    import pandas as pd
+    pandasOK = True
+except ImportError:
+    pandasOK = False
+
+from savReaderWriter import *
+from savReaderNp import *
+from py3k import *
+
+
+@unittest.skipUnless(pandasOK and isCPython, "Requires numpy and pandas")
+class test_SavReaderNp_dataframe(unittest.TestCase):
+
+    def setUp(self):
+        self.savFileName = "test_data/Employee data.sav"
+
+    def test_to_dataframe(self):
+        with SavReaderNp(self.savFileName) as reader:
+            df = reader.to_dataframe()
+            self.assertEqual(reader.uvarNames, list(df.columns))
+        self.assertEqual((474, 10), df.shape)
+        self.assertEqual(57000.0, df["salary"][0])
+        self.assertEqual(np.datetime64(datetime.datetime(1952, 2, 3)),
+                         df["bdate"][0])
+        self.assertEqual("datetime64[us]", str(df["bdate"].dtype))
+
+    def test_to_dataframe_categoricals(self):
+        with SavReaderNp(self.savFileName) as reader:
+            df = reader.to_dataframe(usecols=["gender", "jobcat"])
+        self.assertEqual(["gender", "jobcat"], list(df.columns))
+        self.assertEqual("category", str(df["jobcat"].dtype))
+        self.assertEqual([u"Manager", u"Clerical"], list(df["jobcat"][:2]))
+        self.assertEqual(u"Male", df["gender"][0])
+
+    def test_to_dataframe_no_categoricals(self):
+        with SavReaderNp(self.savFileName) as reader:
+            df = reader.to_dataframe(usecols=["gender", "jobcat"],
+                                     categoricals=False)
+        self.assertEqual([3.0, 1.0], list(df["jobcat"][:2]))
+        self.assertEqual(u"m", df["gender"][0])
+
+    def test_to_dataframe_nrows(self):
+        with SavReaderNp(self.savFileName) as reader:
+            self.assertEqual(10, len(reader.to_dataframe(nrows=10)))
+            self.assertEqual(474, len(reader.to_dataframe(nrows=1000)))
+
+    def test_to_dataframe_native_engine(self):
+        with SavReaderNp(self.savFileName) as reader:
+            df_expected = reader.to_dataframe()
+        with SavReaderNp(self.savFileName, engine="native") as reader:
+            df_got = reader.to_dataframe()
+        pd.testing.assert_frame_equal(df_expected, df_got)
+
+    def test_to_dataframe_ioUtf8(self):
+        varName = u"Bondjo\xfb"
+        with SavReaderNp("test_data/greetings.sav", ioUtf8=True) as reader:
+            df = reader.to_dataframe()
+            # only 'Thai' has a value label, so the column stays a string
+            self.assertEqual(u"Thai", df[varName][9])
+            values = reader._read_records(reader.nrows)[varName]
+            thai = values[np.char.rstrip(values) == b"Thai"]
+            column = reader._categorical(pd, thai,
+                                         reader.valueLabels[varName], 20)
+        self.assertEqual([u"\u0e2a\u0e27\u0e31\u0e2a\u0e14\u0e35"],
+                         list(column))
+
+    def test_to_dataframe_unknown_column(self):
+        with SavReaderNp(self.savFileName) as reader:
+            with self.assertRaises(ValueError):
+                reader.to_dataframe(usecols=["nonexisting"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## The dictionary records are parsed to find the start of the case data
+##############################################################################
+
+import unittest
+
+try:
+    import numpy
+    numpyOK = True
+except ImportError:
+    numpyOK = False
+
+from savReaderWriter import *
+from savReaderWriter.nativeEngine import SavDictionary
+from py3k import *
+if numpyOK:
+    from savReaderWriter import SavReaderNp
+
+
+class test_SavReaderNp_dictionary(unittest.TestCase):
+
+    def setUp(self):
+        self.savFileName = "test_data/spssio_test.sav"
+
+    def test_records(self):
+        with open(self.savFileName, "rb") as f:
+            dictionary = SavDictionary(f)
+        records = dictionary.records
+        self.assertEqual((1, 0), (records[0].recordType, records[0].offset))
+        self.assertEqual((999, 8), (records[-1].recordType, records[-1].size))
+        # the records are contiguous, and end where the case data start
+        for record, nextRecord in zip(records, records[1:]):
+            self.assertEqual(nextRecord.offset, record.offset + record.size)
+        self.assertEqual(dictionary.dataOffset,
+                         records[-1].offset + records[-1].size)
+        self.assertEqual(set([1, 2, 3, 6, 7, 999]),
+                         set(record.recordType for record in records))
+        subtypes = [record.subtype for record in records
+                    if record.recordType == 7]
+        self.assertIn(3, subtypes)  # machine integer info
+
+    @unittest.skipUnless(numpyOK and isCPython, "Requires numpy")
+    def test_SavReaderNp_offset(self):
+        npreader = SavReaderNp("test_data/all_numeric_uncompressed.sav")
+        try:
+            self.assertEqual(623, npreader._offset)
+            self.assertTrue(npreader.dictionary.isIdentityLayout)
+        finally:
+            npreader.close()
+
+if __name__ == "__main__":
+    unittest.main()
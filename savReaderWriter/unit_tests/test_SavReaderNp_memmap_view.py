@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Memory-mapped view of the case data of uncompressed files
+##############################################################################
+
+import sys
+import unittest
+
+try:
+    import numpy as np
+    import numpy.testing
+    numpyOK = True
+except ImportError:
+    numpyOK = False
+
+from savReaderWriter import *
+from savReaderWriter import SavReaderNp
+from py3k import *
+
+
+@unittest.skipUnless(numpyOK and isCPython, "Requires numpy, not numpypy")
+class test_SavReaderNp_memmap_view(unittest.TestCase):
+
+    def setUp(self):
+        self.uncompressedfn = "test_data/all_numeric_uncompressed.sav"
+        self.uncompresseddt = ("test_data/all_numeric_datetime_" +
+                               "uncompressed.sav")
+
+    def test_memmap_view_homogeneous(self):
+        self.npreader = SavReaderNp(self.uncompressedfn)
+        view = self.npreader.memmap_view()
+        self.assertIsInstance(view, np.memmap)
+        self.assertEqual((100, 2), view.shape)
+        desired = self.npreader.to_ndarray()
+        sysmis = -sys.float_info.max
+        got = np.where(view == sysmis, np.nan, view)
+        numpy.testing.assert_array_equal(desired, got)
+
+    def test_memmap_view_structured(self):
+        self.npreader = SavReaderNp(self.uncompresseddt, rawMode=True)
+        view = self.npreader.memmap_view(mode="c")
+        self.assertEqual(self.npreader.struct_dtype, view.dtype)
+        self.assertEqual(self.npreader.nrows, len(view))
+        first = view[0].tolist()
+        view[0] = view[-1]  # copy-on-write: the file is not changed
+        self.assertEqual(first, self.npreader.memmap_view()[0].tolist())
+
+    def test_memmap_view_compressed(self):
+        self.npreader = SavReaderNp("test_data/all_numeric.sav")
+        self.assertRaises(ValueError, self.npreader.memmap_view)
+
+    def tearDown(self):
+        self.npreader.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Read a file into Apache Arrow record batches (to_arrow)
+##############################################################################
+
+import datetime
+import unittest
+
+try:
+    import pyarrow
+    pyarrowOK = True
+except ImportError:
+    pyarrowOK = False
+
+from savReaderWriter import *
+
+
+@unittest.skipUnless(pyarrowOK, "Requires pyarrow")
+class test_SavReader_arrow(unittest.TestCase):
+    """Read a file into pyarrow record batches"""
+
+    def setUp(self):
+        self.savFileName = "test_data/Employee data.sav"
+
+    def test_SavReader_to_arrow(self):
+        with SavReader(self.savFileName) as reader:
+            table = reader.to_arrow(batch_size=100)
+        self.assertEqual((474, 10), (table.num_rows, table.num_columns))
+        self.assertEqual(pyarrow.float64(), table.schema.field("id").type)
+        self.assertEqual(pyarrow.string(), table.schema.field("gender").type)
+        self.assertEqual(pyarrow.timestamp("us"),
+                         table.schema.field("bdate").type)
+        first = table.slice(0, 1).to_pylist()[0]
+        self.assertEqual(1.0, first["id"])
+        self.assertEqual("m", first["gender"])
+        self.assertEqual(datetime.datetime(1952, 2, 3), first["bdate"])
+
+    def test_SavReader_to_arrow_sysmis(self):
+        with SavReader(self.savFileName) as reader:
+            table = reader.to_arrow()
+        # one case has a missing ($sysmis) bdate
+        self.assertEqual(1, table.column("bdate").null_count)
+
+    def test_SavReader_iter_record_batches(self):
+        with SavReader(self.savFileName, selectVars=[b"id", b"jobcat"]) \
+             as reader:
+            batches = list(reader.iter_record_batches(200))
+        self.assertEqual([200, 200, 74], [b.num_rows for b in batches])
+        self.assertEqual(["id", "jobcat"], batches[0].schema.names)
+
+    def test_SavReader_to_arrow_value_labels(self):
+        with SavReader(self.savFileName) as reader:
+            table = reader.to_arrow(valueLabels=True)
+        jobcat = table.column("jobcat")
+        self.assertTrue(pyarrow.types.is_dictionary(jobcat.type))
+        self.assertEqual(u"Manager", jobcat[0].as_py())
+
+if __name__ == "__main__":
+    unittest.main()
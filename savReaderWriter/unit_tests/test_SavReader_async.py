@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Read batches of records from asyncio code: AsyncSavReader
+##############################################################################
+
+import sys
+import unittest
+
+from savReaderWriter import *
+
+if sys.version_info >= (3, 6):
+    import asyncio
+    from savReaderWriter import AsyncSavReader
+
+
+@unittest.skipIf(sys.version_info < (3, 6), "Requires Python 3.6+")
+class test_SavReader_async(unittest.TestCase):
+
+    def setUp(self):
+        self.savFileName = "test_data/Employee data.sav"
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def collect(self, batches):
+        result = []
+        while True:
+            try:
+                result.append(self.loop.run_until_complete(
+                    batches.__anext__()))
+            except StopAsyncIteration:
+                return result
+
+    def test_batches(self):
+        with SavReader(self.savFileName) as reader:
+            records_expected = reader.all()
+        reader = AsyncSavReader(self.savFileName, prefetch=3)
+        self.loop.run_until_complete(reader.open())
+        try:
+            self.assertEqual(474, len(reader))
+            batches = self.collect(reader.batches(100))
+        finally:
+            self.loop.run_until_complete(reader.close())
+        self.assertEqual([100, 100, 100, 100, 74], list(map(len, batches)))
+        self.assertEqual(records_expected, [record for batch in batches
+                                            for record in batch])
+
+    def test_batches_not_open(self):
+        reader = AsyncSavReader(self.savFileName)
+        with self.assertRaises(ValueError):
+            self.collect(reader.batches(100))
+
+    def test_invalid_prefetch(self):
+        with self.assertRaises(ValueError):
+            AsyncSavReader(self.savFileName, prefetch=0)
+
+if __name__ == "__main__":
+    unittest.main()
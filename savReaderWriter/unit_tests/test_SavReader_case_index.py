@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Seek cases in compressed files using a row-offset index (caseIndex)
+##############################################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from savReaderWriter import *
+from savReaderWriter.nativeEngine import NativeEngine, CaseIndex
+from savReaderWriter.unit_tests.test_SavReader_native_engine import \
+     bytecode_to_zsav
+
+
+class test_SavReader_case_index(unittest.TestCase):
+    """Seek cases using a case index"""
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.savFileName = os.path.join(self.tempdir, "employee.sav")
+        shutil.copy("test_data/Employee data.sav", self.savFileName)
+        with NativeEngine(self.savFileName) as engine:
+            self.cases = engine.readCases(1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def _check_seek(self, savFileName, caseIndex):
+        with NativeEngine(savFileName, caseIndex=caseIndex,
+                          indexInterval=7) as engine:
+            self.assertEqual(68, len(engine.caseIndex))
+            for case in (318, 6, 7, 8, 473, 0, 100, 99):
+                engine.seekNextCase(None, case)
+                self.assertEqual(self.cases[case], engine.readCase())
+            engine.seek(470)
+            self.assertEqual(self.cases[470:], engine.readCases(10))
+
+    def test_case_index_memory(self):
+        self._check_seek(self.savFileName, "memory")
+        self.assertFalse(os.path.exists(self.savFileName + ".caseidx"))
+
+    def test_case_index_zlib(self):
+        zsavFileName = os.path.join(self.tempdir, "employee.zsav")
+        bytecode_to_zsav(self.savFileName, zsavFileName, blockSize=300)
+        self._check_seek(zsavFileName, "memory")
+
+    def test_case_index_disk(self):
+        indexFileName = self.savFileName + ".caseidx"
+        self._check_seek(self.savFileName, "disk")
+        self.assertEqual(["employee.sav", "employee.sav.caseidx"],
+                         sorted(os.listdir(self.tempdir)))
+        index = CaseIndex.load(indexFileName, self.savFileName)
+        self.assertEqual(7, index.interval)
+        self._check_seek(self.savFileName, "disk")  # re-uses the index
+
+    def test_case_index_stale(self):
+        indexFileName = self.savFileName + ".caseidx"
+        self._check_seek(self.savFileName, "disk")
+        os.utime(self.savFileName, (0, 0))
+        self.assertIsNone(CaseIndex.load(indexFileName, self.savFileName))
+
+    def test_case_index_invalid(self):
+        with self.assertRaises(ValueError):
+            NativeEngine(self.savFileName, caseIndex="cloud")
+        with self.assertRaises(ValueError):
+            SavReader(self.savFileName, caseIndex="memory")
+
+    def test_SavReader_case_index(self):
+        with SavReader(self.savFileName) as reader:
+            records_expected = reader[::50], reader[-1], reader[3]
+        with SavReader(self.savFileName, engine="native",
+                       caseIndex="memory") as reader:
+            records_got = reader[::50], reader[-1], reader[3]
+        self.assertEqual(records_expected, records_got)
+
+if __name__ == "__main__":
+    unittest.main()
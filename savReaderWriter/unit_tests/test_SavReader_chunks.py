@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Read a file in chunks of records (iterchunks, chunksize)
+##############################################################################
+
+import unittest
+from savReaderWriter import *
+
+
+class test_SavReader_chunks(unittest.TestCase):
+    """Read a file in chunks of records"""
+
+    def setUp(self):
+        self.savFileName = "test_data/Employee data.sav"
+
+    def test_SavReader_iterchunks(self):
+        """Read a file with iterchunks, compare with regular iteration"""
+        with SavReader(self.savFileName) as reader:
+            records_expected = list(reader)
+        reader = SavReader(self.savFileName)
+        try:
+            chunks = list(reader.iterchunks(100))
+        finally:
+            reader.close()
+        self.assertEqual([100, 100, 100, 100, 74], list(map(len, chunks)))
+        records_got = [record for chunk in chunks for record in chunk]
+        self.assertEqual(records_expected, records_got)
+
+    def test_SavReader_chunksize(self):
+        """Read a file using the chunksize argument"""
+        with SavReader(self.savFileName, returnHeader=True,
+                       chunksize=3) as reader:
+            header = next(reader)
+            chunk = next(reader)
+        self.assertEqual(b'id', header[0])
+        chunk_expected = \
+        [[1.0, b'm', b'1952-02-03', 15.0, 3.0, 57000.0, 27000.0, 98.0, 144.0, 0.0],
+         [2.0, b'm', b'1958-05-23', 16.0, 1.0, 40200.0, 18750.0, 98.0, 36.0, 0.0],
+         [3.0, b'f', b'1929-07-26', 12.0, 1.0, 21450.0, 12000.0, 98.0, 381.0, 0.0]]
+        self.assertEqual(chunk_expected, chunk)
+
+    def test_SavReader_chunksize_selectVars(self):
+        """Read a selection of a file in chunks"""
+        with SavReader(self.savFileName, selectVars=[b'id', b'bdate'],
+                       chunksize=2) as reader:
+            chunk = next(reader)
+        self.assertEqual([[1.0, b'1952-02-03'], [2.0, b'1958-05-23']], chunk)
+
+    def test_SavReader_chunksize_invalid(self):
+        """Use an invalid chunksize"""
+        with self.assertRaises(ValueError):
+            SavReader(self.savFileName, chunksize=0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Check the per-column conversion plan that is used by formatValues
+##############################################################################
+
+import unittest
+from savReaderWriter import *
+
+
+class test_SavReader_conversion_plan(unittest.TestCase):
+    """Check the per-column conversion plan"""
+
+    def setUp(self):
+        self.savFileName = "test_data/Employee data.sav"
+
+    def test_conversion_plan_columns(self):
+        """Only columns that need formatting are in the plan"""
+        reader = SavReader(self.savFileName, selectVars=[b'gender', b'bdate'])
+        try:
+            columns = [i for i, converter in reader.conversionPlan]
+            record = reader.formatValues([b'm       ', 11654150400.0])
+        finally:
+            reader.close()
+        self.assertEqual([0, 1], columns)
+        self.assertEqual([b'm', b'1952-02-03'], record)
+
+    def test_conversion_plan_recodeSysmisTo(self):
+        """System missing values are recoded for numerical columns"""
+        reader = SavReader(self.savFileName, recodeSysmisTo=999)
+        try:
+            sysmis = reader.sysmis
+            record = reader.formatValues([sysmis, b'f       ', sysmis, 8.0,
+                                          1.0, 2.0, 3.0, 4.0, 5.0, 0.0])
+        finally:
+            reader.close()
+        self.assertEqual([999, b'f', 999, 8.0, 1.0, 2.0, 3.0, 4.0, 5.0, 0.0],
+                         record)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Look up records using an index of the idVar (idIndex="disk" or "hash")
+##############################################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from savReaderWriter import *
+from savReaderWriter.keyIndex import KeyIndex, HashIndex
+
+
+class test_SavReader_key_index(unittest.TestCase):
+    """Look up records using a persistent key index"""
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.savFileName = os.path.join(self.tempdir, "employee.sav")
+        shutil.copy("test_data/Employee data.sav", self.savFileName)
+        self.indexFileName = os.path.join(self.tempdir, "test.keyidx")
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_KeyIndex_numeric(self):
+        keys = [3.0, 1.0, 2.0, 1.0, -1.7976931348623157e+308]
+        index = KeyIndex.build(self.indexFileName, self.savFileName,
+                               b"id", 0, keys)
+        try:
+            self.assertEqual(5, len(index))
+            self.assertEqual([1, 3], index.positions(1))
+            self.assertEqual([0], index.positions(3.0))
+            self.assertEqual([], index.positions(4))
+            self.assertEqual([], index.positions(b"1"))
+            self.assertTrue(2 in index)
+            self.assertFalse(2.5 in index)
+        finally:
+            index.close()
+
+    def test_KeyIndex_string(self):
+        keys = [b"b       ", b"a       ", b"ab      ", b"a       "]
+        index = KeyIndex.build(self.indexFileName, self.savFileName,
+                               b"gender", 8, keys)
+        index.close()
+        index = KeyIndex.open(self.indexFileName, self.savFileName,
+                              b"gender")
+        try:
+            self.assertEqual([1, 3], index.positions(b"a"))
+            self.assertEqual([2], index.positions(b"ab  "))
+            self.assertEqual([], index.positions(b"abcdefghi"))
+            self.assertEqual([], index.positions(1.0))
+        finally:
+            index.close()
+
+    def test_KeyIndex_stale(self):
+        KeyIndex.build(self.indexFileName, self.savFileName,
+                       b"id", 0, [1.0]).close()
+        self.assertIsNone(KeyIndex.open(self.indexFileName,
+                                        self.savFileName, b"educ"))
+        os.utime(self.savFileName, (0, 0))
+        self.assertIsNone(KeyIndex.open(self.indexFileName,
+                                        self.savFileName, b"id"))
+
+    def test_KeyIndex_rebuild_while_open(self):
+        """Rebuilding an index does not touch a mapped older version"""
+        index1 = KeyIndex.build(self.indexFileName, self.savFileName,
+                                b"id", 0, [3.0, 1.0, 2.0])
+        index2 = KeyIndex.build(self.indexFileName, self.savFileName,
+                                b"id", 0, [5.0, 4.0])
+        try:
+            self.assertEqual([1], index1.positions(1.0))
+            self.assertEqual(3, len(index1))
+            self.assertEqual([1], index2.positions(4.0))
+            self.assertEqual([], index2.positions(1.0))
+        finally:
+            index1.close()
+            index2.close()
+        self.assertEqual(["employee.sav", "test.keyidx"],
+                         sorted(os.listdir(self.tempdir)))
+
+    def test_HashIndex(self):
+        index = HashIndex(0, [3.0, 1.0, 2.0, 1.0])
+        self.assertEqual(4, len(index))
+        self.assertEqual([1, 3], index.positions(1))
+        self.assertEqual([], index.positions(b"1"))
+        self.assertTrue(2 in index)
+        index = HashIndex(8, [b"b       ", b"a       ", b"a       "])
+        self.assertEqual([1, 2], index.positions(b"a "))
+        self.assertEqual([], index.positions(1.0))
+
+    def test_SavReader_get_idIndex(self):
+        with SavReader(self.savFileName, idVar=b"id",
+                       idIndex="disk") as reader:
+            record = reader.get(4, "not found")
+            self.assertEqual(4.0, record[0])
+            self.assertEqual("not found", reader.get(475, "not found"))
+            self.assertTrue(474 in reader)
+        self.assertTrue(os.path.exists(self.savFileName + ".keyidx"))
+        with SavReader(self.savFileName, idVar=b"id") as reader:
+            records_expected = reader.get(4, full=True)
+        with SavReader(self.savFileName, idVar=b"id",
+                       idIndex="disk") as reader:
+            self.assertEqual(records_expected, reader.get(4, full=True))
+
+    def test_SavReader_get_many(self):
+        with SavReader(self.savFileName, idVar=b"id") as reader:
+            records_expected = [reader.get(key, "not found") for key
+                                in (474, 4, 999, 4, 1)]
+        for idIndex in (None, "hash", "disk"):
+            with SavReader(self.savFileName, idVar=b"id",
+                           idIndex=idIndex) as reader:
+                records_got = reader.get_many([474, 4, 999, 4, 1],
+                                              "not found")
+                self.assertEqual(idIndex, reader.idIndex)
+            self.assertEqual(records_expected, records_got)
+
+    def test_SavReader_get_many_full(self):
+        with SavReader(self.savFileName, idVar=b"gender",
+                       idIndex="hash") as reader:
+            females, males, other = reader.get_many([b"f", b"m", b"x"],
+                                                    full=True)
+        self.assertEqual(216, len(females))
+        self.assertEqual(258, len(males))
+        self.assertIsNone(other)
+
+    def test_SavReader_idIndex_invalid(self):
+        with self.assertRaises(ValueError):
+            SavReader(self.savFileName, idVar=b"id", idIndex="btree")
+
+if __name__ == "__main__":
+    unittest.main()
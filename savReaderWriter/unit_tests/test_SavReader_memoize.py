@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Per-instance, bounded memoization of methods
+##############################################################################
+
+import gc
+import unittest
+import weakref
+
+from savReaderWriter import *
+from helpers import memoize
+
+
+class Doubler(object):
+
+    def __init__(self):
+        self.calls = 0
+
+    @memoize(maxsize=2)
+    def double(self, value):
+        self.calls += 1
+        return 2 * value
+
+
+class test_SavReader_memoize(unittest.TestCase):
+
+    def test_memoize_lru(self):
+        doubler = Doubler()
+        results = [doubler.double(value) for value in (1, 2, 1, 3, 2)]
+        self.assertEqual([2, 4, 2, 6, 4], results)
+        self.assertEqual(4, doubler.calls)  # 2 was evicted by 3
+        info = doubler._caches["double"].info()
+        self.assertEqual((1, 4, 2, 2, 2), tuple(info))
+
+    def test_memoize_per_instance(self):
+        doubler1, doubler2 = Doubler(), Doubler()
+        doubler1.double(1)
+        doubler2.double(1)
+        self.assertEqual((1, 1), (doubler1.calls, doubler2.calls))
+        ref = weakref.ref(doubler1)
+        del doubler1
+        gc.collect()
+        self.assertIsNone(ref())  # the cache does not pin the instance
+
+    def test_memoize_unhashable(self):
+        doubler = Doubler()
+        self.assertEqual([1, 1], doubler.double([1]))
+
+    def test_SavReader_cacheInfo(self):
+        reader = SavReader("test_data/Employee data.sav")
+        try:
+            reader.all()
+            info = reader.cacheInfo()["spss2strDate"]
+            self.assertEqual(474, info.hits + info.misses)
+        finally:
+            reader.close()
+        self.assertEqual({}, reader.cacheInfo())
+
+if __name__ == "__main__":
+    unittest.main()
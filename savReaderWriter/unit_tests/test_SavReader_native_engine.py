@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Read case data without the I/O module (engine="native")
+##############################################################################
+
+import os
+import glob
+import struct
+import tempfile
+import unittest
+import zlib
+from ctypes import create_string_buffer, byref
+
+from savReaderWriter import *
+from savReaderWriter.nativeEngine import NativeEngine, segmentWidths
+
+
+def bytecode_to_zsav(savFileName, zsavFileName, blockSize=512):
+    """Helper function that rewrites a bytecode compressed .sav file as a
+    zlib compressed .zsav file, using small blocks"""
+    with NativeEngine(savFileName) as engine:
+        dataOffset = engine.dictionary.dataOffset
+    with open(savFileName, "rb") as f:
+        raw = f.read()
+    header, data = raw[:dataOffset], raw[dataOffset:]
+    header = b"$FL3" + header[4:72] + struct.pack("<i", 2) + header[76:]
+    blocks = [data[i:i + blockSize] for i in range(0, len(data), blockSize)]
+    compressed = [zlib.compress(block) for block in blocks]
+    uofs, cofs, entries = dataOffset, dataOffset + 24, []
+    for block, cblock in zip(blocks, compressed):
+        entries.append(struct.pack("<qqii", uofs, cofs, len(block),
+                                   len(cblock)))
+        uofs, cofs = uofs + len(block), cofs + len(cblock)
+    trailer = struct.pack("<qqii", -100, 0, blockSize, len(blocks))
+    trailer += b"".join(entries)
+    zheader = struct.pack("<qqq", dataOffset, cofs, len(trailer))
+    with open(zsavFileName, "wb") as f:
+        f.write(header + zheader + b"".join(compressed) + trailer)
+
+
+class test_SavReader_native_engine(unittest.TestCase):
+    """Decode case data with the native engine"""
+
+    def setUp(self):
+        self.savFileName = "test_data/Employee data.sav"
+        self.zsavFileName = tempfile.mkstemp(suffix=".zsav")[1]
+
+    def tearDown(self):
+        os.remove(self.zsavFileName)
+
+    def test_native_engine_bytecode(self):
+        with NativeEngine(self.savFileName) as engine:
+            cases = engine.readCases(1000)
+        self.assertEqual(474, len(cases))
+        record_expected = (1.0, b'm       ', 11654150400.0, 15.0, 3.0,
+                           57000.0, 27000.0, 98.0, 144.0, 0.0)
+        self.assertEqual(record_expected, struct.unpack("<d8s8d", cases[0]))
+
+    def test_native_engine_uncompressed(self):
+        with NativeEngine("test_data/all_numeric.sav") as engine:
+            cases_expected = engine.readCases(1000)
+        savFileName = "test_data/all_numeric_uncompressed.sav"
+        with NativeEngine(savFileName) as engine:
+            self.assertEqual(0, engine.compression)
+            cases_got = engine.readCases(1000)
+        self.assertEqual(100, len(cases_got))
+        self.assertEqual(cases_expected, cases_got)
+
+    def test_native_engine_zlib(self):
+        bytecode_to_zsav(self.savFileName, self.zsavFileName)
+        with NativeEngine(self.savFileName) as engine:
+            cases_expected = engine.readCases(1000)
+        with NativeEngine(self.zsavFileName) as engine:
+            self.assertEqual(2, engine.compression)
+            cases_got = engine.readCases(1000)
+            engine.seek(400)
+            self.assertEqual(cases_expected[400], engine.readCase())
+        self.assertEqual(cases_expected, cases_got)
+
+    def test_native_engine_seek(self):
+        with NativeEngine(self.savFileName) as engine:
+            cases = engine.readCases(1000)
+            for case in (400, 3, 473, 0):
+                engine.seekNextCase(None, case)
+                self.assertEqual(cases[case], engine.readCase())
+            self.assertEqual(cases[1], engine.readCase())
+
+    def test_native_engine_wholeCaseIn(self):
+        with NativeEngine(self.savFileName) as engine:
+            last_case = engine.readCases(1000)[-1]
+            caseBuffer = create_string_buffer(engine.caseSize)
+            engine.seek(473)
+            self.assertEqual(0, engine.wholeCaseIn(None, byref(caseBuffer)))
+            self.assertEqual(last_case, caseBuffer.raw)
+            self.assertEqual(-5, engine.wholeCaseIn(None, caseBuffer))
+
+    def test_segmentWidths(self):
+        widths_expected = [(255, 255), (255, 255), (255, 255), (244, 235)]
+        self.assertEqual(widths_expected, segmentWidths(1000))
+        self.assertEqual([(20, 20)], segmentWidths(20))
+
+    def test_SavReader_native_invalid_engine(self):
+        with self.assertRaises(ValueError):
+            SavReader(self.savFileName, engine="pyreadstat")
+
+    def test_SavReader_native_vs_spssio(self):
+        """The native engine yields the same records as the I/O module"""
+        for savFileName in glob.glob("test_data/*.*sav"):
+            for rawMode in (True, False):
+                kwargs = dict(rawMode=rawMode, returnHeader=True)
+                with SavReader(savFileName, **kwargs) as reader:
+                    records_expected = list(reader)
+                with SavReader(savFileName, engine="native",
+                               **kwargs) as reader:
+                    records_got = list(reader)
+                self.assertEqual(records_expected, records_got)
+
+    def test_SavReader_native_getitem(self):
+        with SavReader(self.savFileName) as reader:
+            records_expected = reader[470:], reader[10:20:3], reader[-1]
+        with SavReader(self.savFileName, engine="native") as reader:
+            records_got = reader[470:], reader[10:20:3], reader[-1]
+        self.assertEqual(records_expected, records_got)
+
+    def test_SavReader_native_chunks(self):
+        with SavReader(self.savFileName, chunksize=100) as reader:
+            chunks_expected = list(reader)
+        with SavReader(self.savFileName, chunksize=100,
+                       engine="native") as reader:
+            chunks_got = list(reader)
+        self.assertEqual(chunks_expected, chunks_got)
+
+if __name__ == "__main__":
+    unittest.main()
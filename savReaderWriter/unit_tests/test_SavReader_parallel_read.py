@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Read a file with several processes (parallel_read)
+##############################################################################
+
+import unittest
+
+from savReaderWriter import *
+from savReaderWriter.parallelReader import _splitRange
+
+
+def count_records(records):
+    return len(records)
+
+
+class test_SavReader_parallel_read(unittest.TestCase):
+    """Read a file with several processes"""
+
+    def setUp(self):
+        self.savFileName = "test_data/Employee data.sav"
+
+    def test_splitRange(self):
+        ranges_expected = [(0, 100), (100, 200), (200, 300), (300, 400),
+                           (400, 474)]
+        self.assertEqual(ranges_expected, _splitRange(474, 8, 100))
+        self.assertEqual([(0, 474)], _splitRange(474, 1, 1000))
+        self.assertEqual([], _splitRange(0, 4, 10))
+
+    def test_parallel_read_batches(self):
+        with SavReader(self.savFileName) as reader:
+            records_expected = list(reader)
+        batches = list(parallel_read(self.savFileName, 3, chunksize=25))
+        self.assertEqual(19, len(batches))
+        records_got = [record for batch in batches for record in batch]
+        self.assertEqual(records_expected, records_got)
+
+    def test_parallel_read_func(self):
+        counts = parallel_read(self.savFileName, 2, count_records,
+                               chunksize=100, selectVars=[b"id"])
+        self.assertEqual([100, 100, 100, 100, 74], list(counts))
+
+    def test_parallel_read_invalid(self):
+        with self.assertRaises(ValueError):
+            parallel_read(self.savFileName, 2, returnHeader=True)
+
+if __name__ == "__main__":
+    unittest.main()
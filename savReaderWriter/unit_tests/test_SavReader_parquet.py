@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Convert a file into a Parquet file (sav2parquet)
+##############################################################################
+
+import os
+import json
+import tempfile
+import unittest
+
+try:
+    import pyarrow.parquet as pq
+    pyarrowOK = True
+except ImportError:
+    pyarrowOK = False
+
+from savReaderWriter import *
+from savReaderWriter.parquetExport import sav2parquet, main
+
+
+@unittest.skipUnless(pyarrowOK, "Requires pyarrow")
+class test_SavReader_parquet(unittest.TestCase):
+    """Convert a file into a Parquet file"""
+
+    def setUp(self):
+        self.savFileName = "test_data/Employee data.sav"
+        self.parquetFileName = tempfile.mkstemp(suffix=".parquet")[1]
+
+    def tearDown(self):
+        os.remove(self.parquetFileName)
+
+    def test_sav2parquet_row_groups(self):
+        sav2parquet(self.savFileName, self.parquetFileName, rowGroupSize=100)
+        parquetFile = pq.ParquetFile(self.parquetFileName)
+        self.assertEqual(5, parquetFile.metadata.num_row_groups)
+        self.assertEqual(474, parquetFile.metadata.num_rows)
+        table = parquetFile.read()
+        self.assertEqual(1.0, table.column("id")[0].as_py())
+        self.assertEqual(u"m", table.column("gender")[0].as_py())
+
+    def test_sav2parquet_metadata(self):
+        sav2parquet(self.savFileName, self.parquetFileName,
+                    selectVars=[b"id", b"jobcat"])
+        metadata = pq.read_schema(self.parquetFileName).metadata
+        dictionary = json.loads(metadata[b"spss.dictionary"].decode("utf-8"))
+        self.assertEqual(["formats", "missingValues", "valueLabels",
+                          "varLabels"], sorted(dictionary))
+        self.assertEqual(u"Employee Code", dictionary["varLabels"]["id"])
+        self.assertEqual(u"Manager",
+                         dictionary["valueLabels"]["jobcat"]["3.0"])
+        self.assertEqual(["id", "jobcat"], sorted(dictionary["formats"]))
+
+    def test_sav2parquet_command_line(self):
+        main([self.savFileName, self.parquetFileName, "--value-labels",
+              "--engine", "native"])
+        table = pq.read_table(self.parquetFileName)
+        self.assertEqual(u"Manager", table.column("jobcat")[0].as_py())
+
+if __name__ == "__main__":
+    unittest.main()
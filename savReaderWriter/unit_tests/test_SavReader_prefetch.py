@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Read cases ahead on a producer thread: SavReader(prefetch=...)
+##############################################################################
+
+import threading
+import unittest
+
+from savReaderWriter import *
+
+
+class test_SavReader_prefetch(unittest.TestCase):
+
+    def setUp(self):
+        self.savFileName = "test_data/Employee data.sav"
+        with SavReader(self.savFileName) as reader:
+            self.records = reader.all()
+
+    def test_prefetch_iter(self):
+        with SavReader(self.savFileName, prefetch=2) as reader:
+            self.assertEqual(self.records, list(reader))
+
+    def test_prefetch_chunks_where(self):
+        expected = [record for record in self.records if record[4] == 3]
+        with SavReader(self.savFileName, prefetch=1, chunksize=50,
+                       where="jobcat == 3") as reader:
+            chunks = list(reader)
+        self.assertEqual(expected, [record for chunk in chunks
+                                    for record in chunk])
+
+    def test_prefetch_abandoned(self):
+        """An abandoned iteration does not leave the producer running"""
+        reader = SavReader(self.savFileName, prefetch=1)
+        try:
+            records = iter(reader)
+            self.assertEqual(self.records[0], next(records))
+            self.assertIsNotNone(reader.producer)
+        finally:
+            reader.close()
+        self.assertIsNone(reader.producer)
+        names = [thread.name for thread in threading.enumerate()]
+        self.assertNotIn("SavReader.prefetch", names)
+
+    def test_prefetch_interleaved(self):
+        """Random access while a prefetching iteration is suspended stops
+        the producer first, so the file handle is never shared"""
+        with SavReader(self.savFileName, prefetch=2, idVar=b"id") as reader:
+            records = iter(reader)
+            self.assertEqual(self.records[0], next(records))
+            self.assertEqual(self.records[5], reader[5])
+            self.assertIsNone(reader.producer)
+            records = iter(reader)
+            self.assertEqual(self.records[0], next(records))
+            self.assertIsNotNone(reader.producer)
+            keys = [self.records[400][0], self.records[3][0]]
+            self.assertEqual([self.records[400], self.records[3]],
+                             reader.get_many(keys))
+            self.assertIsNone(reader.producer)
+            self.assertEqual(self.records[10:13], reader[10:13])
+
+    def test_prefetch_invalid(self):
+        with self.assertRaises(ValueError):
+            SavReader(self.savFileName, prefetch=0)
+        with self.assertRaises(ValueError):
+            SavReader(self.savFileName, prefetch=2, engine="native")
+
+if __name__ == "__main__":
+    unittest.main()
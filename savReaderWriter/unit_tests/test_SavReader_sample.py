@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Random and stratified samples of records
+##############################################################################
+
+import unittest
+from collections import Counter
+
+from savReaderWriter import *
+
+
+class test_SavReader_sample(unittest.TestCase):
+
+    def setUp(self):
+        self.savFileName = "test_data/Employee data.sav"
+
+    def test_sample(self):
+        with SavReader(self.savFileName) as reader:
+            records = reader.all()
+            sample = reader.sample(50, seed=1)
+            self.assertEqual(sample, reader.sample(50, seed=1))
+        positions = [records.index(record) for record in sample]
+        self.assertEqual(50, len(set(positions)))
+        self.assertEqual(sorted(positions), positions)  # file order
+
+    def test_sample_stratified(self):
+        with SavReader(self.savFileName) as reader:
+            records = reader.all()
+            sample = reader.sample(47, seed=1, strata=b"jobcat")
+        self.assertEqual(47, len(sample))
+        # 363 clerical, 27 custodial and 84 managers out of 474
+        self.assertEqual({1: 36, 2: 3, 3: 8},
+                         Counter(record[4] for record in sample))
+
+    def test_sample_too_large(self):
+        with SavReader(self.savFileName) as reader:
+            self.assertRaises(ValueError, reader.sample, 475)
+            self.assertRaises(ValueError, reader.sample, 1, strata=b"x")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -42,5 +42,17 @@ class test_SavReader_selectVars(unittest.TestCase):
                             [3.0, b'1929-07-26']]
         self.assertEqual(records_expected, records_got)
 
+    def test_SavReader_selectVars_projection(self):
+        """Unselected variables are skipped when unpacking a record"""
+        reader = SavReader(self.savFileName, selectVars=[b'bdate', b'educ'])
+        try:
+            record = reader.record
+            unpack_format = reader.getStruct(reader.varTypes, reader.varNames,
+                                             selectVars=reader.header).format
+        finally:
+            reader.close()
+        self.assertEqual([11654150400.0, 15.0], record)
+        self.assertTrue(unpack_format.endswith("16xdd"))
+
 if __name__ == "__main__":
     unittest.main()
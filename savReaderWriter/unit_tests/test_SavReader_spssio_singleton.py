@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## The I/O libraries are loaded, and their prototypes declared, only once
+##############################################################################
+
+import unittest
+from ctypes import c_char_p, c_int
+
+from savReaderWriter import *
+from generic import spssioPrototypes
+
+
+class test_SavReader_spssio_singleton(unittest.TestCase):
+
+    def setUp(self):
+        self.savFileName = "test_data/Employee data.sav"
+
+    def test_spssio_shared(self):
+        with SavReader(self.savFileName) as reader1:
+            with SavHeaderReader(self.savFileName) as reader2:
+                self.assertIs(reader1.spssio, reader2.spssio)
+
+    def test_spssio_prototypes(self):
+        with SavReader(self.savFileName) as reader:
+            func = reader.spssio.spssWholeCaseOut
+            self.assertEqual([c_int, c_char_p], list(func.argtypes))
+            self.assertIs(c_char_p, reader.spssio.spssSetLocale.restype)
+
+    def test_header_private_funcs(self):
+        """The getters whose argtypes depend on the file (e.g. on the
+        number of variables or value labels) do not change the shared
+        library"""
+        with SavHeaderReader(self.savFileName) as header:
+            header.valueLabels, header.varAttributes, header.caseWeightVar
+            for funcName in ("spssGetVarNames", "spssGetVarNValueLabels",
+                             "spssGetVarCValueLabels", "spssGetCaseWeightVar",
+                             "spssGetVarAttributes"):
+                func = getattr(header.spssio, funcName)
+                self.assertIsNone(func.argtypes, funcName)
+
+    def test_SavReaderNp_private_funcs(self):
+        """The argtypes that depend on the file are not set on the
+        shared library"""
+        with SavReaderNp(self.savFileName) as reader:
+            self.assertIsNot(reader.wholeCaseIn,
+                             reader.spssio.spssWholeCaseIn)
+            self.assertNotIn("spssWholeCaseIn", spssioPrototypes)
+
+if __name__ == "__main__":
+    unittest.main()
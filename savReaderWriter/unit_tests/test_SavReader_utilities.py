@@ -99,6 +99,28 @@ class test_SavReader_utilities(unittest.TestCase):
        records_got = self.data[::2]
        self.assertEqual(records_expected, records_got[:3])
 
+    def test_SavReader_contiguous_slice_seeks_once(self):
+        """A contiguous slice needs one seek, a strided slice one per case"""
+        seeks = []
+        seekNextCase = self.data.seekNextCase
+        def countingSeekNextCase(fh, case):
+            seeks.append(case.value)
+            return seekNextCase(fh, case)
+        self.data.seekNextCase = countingSeekNextCase
+        records = self.data[100:110]
+        self.assertEqual([101.0, 110.0], [records[0][0], records[-1][0]])
+        self.assertEqual([100], seeks)
+        del seeks[:]
+        self.assertEqual([474.0], [record[0] for record in self.data.tail(1)])
+        self.assertEqual([473], seeks)
+        del seeks[:]
+        self.data[100:110:3]
+        self.assertEqual([100, 103, 106, 109], seeks)
+
+    def test_SavReader_tail_zero(self):
+        self.assertEqual([], self.data.tail(0))
+        self.assertEqual(474, len(self.data.tail(1000)))
+
     @unittest.skipUnless(numpyOK and isCPython, "Requires numpy, not numpypy")
     def test_SavReader_array_slicing_slicing_1(self):
         records_expected = [[5.0, b'm', b'1955-02-09'],
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Convert whole columns of SPSS dates at once
+##############################################################################
+
+import sys
+import unittest
+import datetime
+
+try:
+    import numpy as np
+    numpyOK = True
+except ImportError:
+    numpyOK = False
+
+from savReaderWriter import *
+from savReaderWriter import supportedDates
+from py3k import *
+if numpyOK:
+    from savReaderWriter.spssDates import (formatDates, spss2datetime64,
+                                           spss2timedelta64)
+
+
+@unittest.skipUnless(numpyOK, "Requires numpy")
+class test_SavReader_vectorized_dates(unittest.TestCase):
+    """Vectorized conversion of SPSS dates"""
+
+    def setUp(self):
+        self.sysmis = -sys.float_info.max
+        self.values = [11654150400.0, 13500000000.5, self.sysmis, 0.0]
+
+    def test_formatDates(self):
+        strings, done = formatDates(self.values, supportedDates[b"DATETIME"])
+        self.assertEqual([b"1952-02-03 00:00:00", b"2010-08-01 00:00:00",
+                          b"1582-10-14 00:00:00"],
+                         strings[done].tolist())
+        self.assertEqual([True, True, False, True], done.tolist())
+
+    def test_formatDates_names(self):
+        strings, done = formatDates(self.values[:1], "%A %B %W WK %Y")
+        expected = datetime.date(1952, 2, 3).strftime("%A %B %W WK %Y")
+        self.assertEqual([bytez(expected)], strings.tolist())
+
+    def test_formatDates_quarter(self):
+        strings, done = formatDates(self.values, supportedDates[b"QYR"],
+                                    isQuarter=True)
+        self.assertEqual([b"1 Q 1952", b"3 Q 2010", b"4 Q 1582"],
+                         strings[done].tolist())
+
+    def test_formatDates_time(self):
+        values = [3723.0, 3723.5, 90000.25]
+        strings, done = formatDates(values, supportedDates[b"TIME"])
+        self.assertEqual([True, False, True], done.tolist())
+        self.assertEqual([b"01:02:03", b"01:00:00.250000"],
+                         strings[done].tolist())
+        strings, done = formatDates([90061.0], supportedDates[b"DTIME"])
+        self.assertEqual([b"01 01:01:01"], strings.tolist())
+
+    def test_spss2datetime64(self):
+        result = spss2datetime64(self.values)
+        expected = np.array(["1952-02-03", "2010-08-01T00:00:00.5", "NaT",
+                             "1582-10-14"], "datetime64[us]")
+        np.testing.assert_array_equal(expected, result)
+
+    def test_spss2timedelta64(self):
+        result = spss2timedelta64([3723.5, self.sysmis])
+        expected = np.array([3723500000, "NaT"], "timedelta64[us]")
+        np.testing.assert_array_equal(expected, result)
+
+    def test_SavReader_chunks_dates(self):
+        """Whole columns of dates are formatted in the same way as
+        individual values"""
+        savFileName = "test_data/Employee data.sav"
+        with SavReader(savFileName) as reader:
+            records_expected = list(reader)
+            records_got = [record for chunk in reader.iterchunks(100)
+                           for record in chunk]
+        self.assertEqual(records_expected, records_got)
+
+if __name__ == "__main__":
+    unittest.main()
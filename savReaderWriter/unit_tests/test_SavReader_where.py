@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## Filter the records on their raw values: SavReader(where=...)
+##############################################################################
+
+import unittest
+
+from savReaderWriter import *
+
+
+class test_SavReader_where(unittest.TestCase):
+
+    def setUp(self):
+        self.savFileName = "test_data/Employee data.sav"
+        with SavReader(self.savFileName) as reader:
+            self.records = reader.all()
+
+    def test_where_expression(self):
+        expected = [record for record in self.records
+                    if record[5] > 50000 and record[1] == b"m"]
+        where = "salary > 50000 and gender == b'm'"
+        with SavReader(self.savFileName, where=where) as reader:
+            records_got = list(reader)
+            self.assertEqual(len(self.records), len(reader))
+        self.assertEqual(expected, records_got)
+        self.assertTrue(0 < len(records_got) < len(self.records))
+
+    def test_where_callable(self):
+        expected = [record for record in self.records if record[4] == 3]
+        where = lambda record: record[4] == 3
+        with SavReader(self.savFileName, where=where) as reader:
+            self.assertEqual(expected, reader.all())
+            chunks = list(reader.iterchunks(10))
+        self.assertEqual(expected, [record for chunk in chunks
+                                    for record in chunk])
+
+    def test_where_selectVars(self):
+        """<where> may use variables that are not selected"""
+        with SavReader(self.savFileName, selectVars=[b"id"],
+                       where="jobcat == 3") as reader:
+            ids_got = [record[0] for record in reader]
+        ids_expected = [record[0] for record in self.records
+                        if record[4] == 3]
+        self.assertEqual(ids_expected, ids_got)
+
+    def test_where_native_engine(self):
+        expected = [record for record in self.records if record[0] < 10]
+        with SavReader(self.savFileName, engine="native", chunksize=4,
+                       where="id < 10") as reader:
+            chunks = list(reader)
+        self.assertEqual(expected, [record for chunk in chunks
+                                    for record in chunk])
+
+    def test_where_invalid(self):
+        with self.assertRaises(ValueError):
+            SavReader(self.savFileName, where=1)
+
+if __name__ == "__main__":
+    unittest.main()
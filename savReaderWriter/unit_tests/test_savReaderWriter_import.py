@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+##############################################################################
+## "import savReaderWriter" is fast: heavy modules are loaded on first use
+##############################################################################
+
+import os
+import sys
+import subprocess
+import unittest
+
+import savReaderWriter
+
+# modules that "import savReaderWriter" should not load
+heavyModules = ["numpy", "multiprocessing", "savReaderNp", "parallelReader",
+                "spssDates", "arrowExport", "subprocess", "asyncio",
+                "asyncReader"]
+
+script = """
+import sys, time
+start = time.time()
+import savReaderWriter
+duration = time.time() - start
+print(repr((duration, sorted(set(sys.modules) & set(%r)))))
+"""
+
+
+@unittest.skipIf(sys.version_info < (3, 7), "Requires PEP 562")
+class test_savReaderWriter_import(unittest.TestCase):
+
+    def run_script(self, script):
+        root = os.path.dirname(os.path.dirname(savReaderWriter.__file__))
+        env = dict(os.environ, PYTHONPATH=root)
+        output = subprocess.check_output([sys.executable, "-c", script],
+                                         env=env)
+        return [eval(line) for line in output.decode().splitlines()]
+
+    def test_import_is_lazy(self):
+        [(duration, loaded)] = self.run_script(script % heavyModules)
+        self.assertEqual([], loaded)
+        self.assertLess(duration, 1.0)  # numpy alone takes ~0.1 s
+
+    def test_lazy_attributes(self):
+        script_ = script + "savReaderWriter.SavReaderNp\n" + \
+                  "savReaderWriter.parallel_read\n" + \
+                  "print(repr(sorted(set(sys.modules) & set(%r))))\n"
+        loaded = self.run_script(script_ % (heavyModules, heavyModules))[-1]
+        self.assertIn("savReaderNp", loaded)
+        self.assertIn("parallelReader", loaded)
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            savReaderWriter.nonexisting
+
+if __name__ == "__main__":
+    unittest.main()
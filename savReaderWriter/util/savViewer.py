@@ -318,8 +318,8 @@ class SavIter(ExtIterBase):
     def init_seekNextCase(self):
         self.spssio = self.records.spssio
         self.fh = self.records.fh
+        # the prototype is declared in spssioPrototypes
         self.seekNextCase = self.spssio.spssSeekNextCase
-        self.seekNextCase.argtypes = [c_int, c_long]
 
     def close(self):
         return self.records.close()
@@ -99,7 +99,10 @@ setup(name='savReaderWriter',
       url='https://bitbucket.org/fomcl/savreaderwriter',
       download_url='https://bitbucket.org/fomcl/savreaderwriter/downloads',
       extras_require={'numpy': ["numpy"],
-                      'Cython': ["Cython"],},
+                      'Cython': ["Cython"],
+                      'arrow': ["pyarrow"],},
+      entry_points={'console_scripts':
+                    ['sav2parquet = savReaderWriter.parquetExport:main']},
       packages=['savReaderWriter'],
       package_data=package_data,
       classifiers=['Development Status :: 4 - Beta',